@@ -0,0 +1,85 @@
+"""
+bench_aggregation.py — Scaling benchmark for the webapp aggregation stage
+
+Usage:
+    python benchmarks/bench_aggregation.py [--sizes 100000 200000 400000 800000]
+
+Times aggregate_reviews() on synthetic review tables of growing size
+(products grow with reviews, 1 product per 400 reviews) and, for the
+smaller sizes, the old per-product boolean-mask loop for comparison.
+A flat "us/review" column means runtime is linear in the number of reviews.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp"))
+from aggregate import aggregate_reviews  # noqa: E402
+
+LABELS = np.array(["POSITIVE", "NEUTRAL", "NEGATIVE"])
+CLUSTERS = np.array(["Fire Tablets", "Batteries & Household", "E-Readers",
+                     "Smart Speakers", "Accessories", "Media & Home"])
+
+
+def make_reviews(n_reviews, reviews_per_product=400, seed=42):
+    """Synthetic review table with a heavy-head product distribution."""
+    rng = np.random.default_rng(seed)
+    n_products = max(1, n_reviews // reviews_per_product)
+    weights = 1.0 / np.arange(1, n_products + 1)
+    product = rng.choice(n_products, size=n_reviews, p=weights / weights.sum())
+    return pd.DataFrame({
+        "name": pd.Series(product).map(lambda i: f"Product {i}").to_numpy(),
+        "cluster_name": CLUSTERS[product % len(CLUSTERS)],
+        "reviews.rating": rng.choice([1, 2, 3, 4, 5], size=n_reviews, p=[.03, .03, .04, .2, .7]),
+        "reviews.text": "review text",
+        "predicted_label": rng.choice(LABELS, size=n_reviews, p=[.9, .04, .06]),
+    })
+
+
+def legacy_products(df, sentiment_col, cluster_col):
+    """The old O(products x reviews) loop from generate_webapp.py."""
+    out = []
+    for product_name in df["name"].unique():
+        product_df = df[df["name"] == product_name]
+        out.append({
+            "name": product_name,
+            "cluster": product_df[cluster_col].iloc[0],
+            "review_count": len(product_df),
+            "avg_rating": round(float(product_df["reviews.rating"].mean()), 2),
+            "sentiment": {str(k).upper(): int(v)
+                          for k, v in product_df[sentiment_col].value_counts().items()},
+        })
+    return out
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[100_000, 200_000, 400_000, 800_000, 1_600_000])
+    parser.add_argument("--legacy-max", type=int, default=200_000,
+                        help="skip the legacy loop above this many reviews")
+    args = parser.parse_args()
+
+    print(f"{'reviews':>10} {'products':>9} {'groupby (s)':>12} {'us/review':>10} {'legacy (s)':>11}")
+    for n in args.sizes:
+        df = make_reviews(n)
+        t_new = timed(aggregate_reviews, df, "predicted_label", "cluster_name")
+        t_old = (timed(legacy_products, df, "predicted_label", "cluster_name")
+                 if n <= args.legacy_max else float("nan"))
+        print(f"{n:>10,} {df['name'].nunique():>9,} {t_new:>12.3f} "
+              f"{t_new / n * 1e6:>10.3f} {t_old:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
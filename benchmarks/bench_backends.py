@@ -0,0 +1,98 @@
+"""
+bench_backends.py — CPU latency, memory and output agreement per generation backend
+
+Usage:
+    python benchmarks/bench_backends.py [--backends pytorch pytorch-int8 onnx] [--repeats 2]
+
+Each backend in summarizer.BACKENDS runs in a fresh interpreter with
+GEN_BACKEND set, so load time and peak RSS are not shared between them.
+Every brief in data/category_blog_posts.csv is generated one at a time
+(the "Generate Summary" path) with greedy decoding, and outputs are compared
+with the pytorch fp32 baseline. The onnx backend needs
+`python webapp/export_quantized.py` first.
+"""
+
+import argparse
+import difflib
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+WEBAPP = os.path.join(ROOT, "webapp")
+
+CHILD = """
+import json, sys, time
+import pandas as pd
+import summarizer
+from ingest import peak_memory_mb
+
+briefs = pd.read_csv(sys.argv[1])["brief"].astype(str).tolist()
+repeats = int(sys.argv[2])
+prompts = [summarizer.build_facts_prompt(b) for b in briefs]
+gen_kwargs = summarizer.decoding_kwargs("fast-greedy")
+
+start = time.perf_counter()
+summarizer.get_model()
+load_s = time.perf_counter() - start
+
+summarizer._generate_uncached(prompts[:1], 1, gen_kwargs)  # warm-up
+latencies = []
+for _ in range(repeats):
+    outputs = []
+    for prompt in prompts:
+        start = time.perf_counter()
+        outputs += summarizer._generate_uncached([prompt], 1, gen_kwargs)
+        latencies.append(time.perf_counter() - start)
+
+print(json.dumps({
+    "load_s": load_s,
+    "latency_s": sum(latencies) / len(latencies),
+    "p95_s": sorted(latencies)[int(0.95 * (len(latencies) - 1))],
+    "peak_mb": peak_memory_mb(),
+    "outputs": outputs,
+}))
+"""
+
+
+def run_backend(backend, csv_path, repeats):
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, csv_path, str(repeats)],
+        cwd=WEBAPP, capture_output=True, text=True,
+        env={**os.environ, "GEN_BACKEND": backend, "GEN_WARMUP": "0"},
+    )
+    if proc.returncode != 0:
+        print(f"{backend}: failed\n{proc.stderr.strip().splitlines()[-1]}")
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--backends", nargs="+", default=["pytorch", "pytorch-int8", "onnx"])
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--csv", default=os.path.join(ROOT, "data", "category_blog_posts.csv"))
+    args = parser.parse_args()
+
+    backends = ["pytorch"] + [b for b in args.backends if b != "pytorch"]  # baseline first
+    results = {b: run_backend(b, os.path.abspath(args.csv), args.repeats) for b in backends}
+    baseline = results["pytorch"]
+    if baseline is None:
+        sys.exit("The pytorch baseline failed; nothing to compare against.")
+
+    print(f"{'backend':<14} {'load (s)':>9} {'latency (ms)':>13} {'p95 (ms)':>9} {'speedup':>8} "
+          f"{'peak RSS (MB)':>14} {'exact':>7} {'similarity':>11}")
+    for name, r in results.items():
+        if r is None:
+            continue
+        pairs = list(zip(baseline["outputs"], r["outputs"]))
+        exact = sum(a == b for a, b in pairs) / len(pairs)
+        similarity = sum(difflib.SequenceMatcher(None, a, b).ratio() for a, b in pairs) / len(pairs)
+        peak = f"{r['peak_mb']:.0f}" if r["peak_mb"] is not None else "n/a"
+        print(f"{name:<14} {r['load_s']:>9.1f} {r['latency_s'] * 1000:>13.1f} {r['p95_s'] * 1000:>9.1f} "
+              f"{baseline['latency_s'] / r['latency_s']:>7.2f}x {peak:>14} {exact:>7.1%} {similarity:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+bench_batch_generation.py — Throughput of batched summary generation
+
+Usage:
+    python benchmarks/bench_batch_generation.py [--prompts 64] [--batch-sizes 1 8 32]
+
+Generates summaries for the briefs in data/category_blog_posts.csv, repeated
+until there are --prompts of them, with summarizer.generate_summaries() at
+each batch size and reports prompts/sec. The summary cache is bypassed so
+every prompt is actually generated. Run it on the CPU box to compare
+against batch size 1, which is what export used to do.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "webapp"))
+import summarizer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--prompts", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--csv", default=os.path.join(ROOT, "data", "category_blog_posts.csv"))
+    args = parser.parse_args()
+
+    briefs = pd.read_csv(args.csv)["brief"].astype(str).tolist()
+    briefs = (briefs * (args.prompts // len(briefs) + 1))[:args.prompts]
+
+    # Load the model up front so the first timed run doesn't pay for it
+    _, _, device = summarizer.get_model()
+
+    print(f"device={device}  model={summarizer.GEN_MODEL_NAME}  prompts={len(briefs)}")
+    print(f"{'batch':>6} {'seconds':>9} {'prompts/sec':>12} {'speedup':>8}")
+    baseline = None
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        summarizer.generate_summaries(briefs, batch_size=batch_size, use_summary_cache=False)
+        elapsed = time.perf_counter() - start
+        rate = len(briefs) / elapsed
+        baseline = baseline or rate
+        print(f"{batch_size:>6} {elapsed:>9.2f} {rate:>12.2f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+bench_brief_parser.py — Regex vs single-pass brief parsing on a synthetic corpus
+
+Usage:
+    python benchmarks/bench_brief_parser.py [--briefs 100000] [--seed 0]
+
+Builds briefs in the layout of data/category_blog_posts.csv with random
+names, ratings and complaints, checks that parse_brief and the original
+regex parser agree on every one, then times:
+    regex            parse_brief_regex, once per brief
+    single pass      the line parser without the memo cache
+    export pattern   parse_brief called 3x per brief (prompt, markdown,
+                     product stats), as export_json does; cache sized to fit
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "webapp"))
+import brief_parser  # noqa: E402
+from brief_parser import parse_brief, parse_brief_regex  # noqa: E402
+
+WORDS = ["Amazon", "Kindle", "Fire", "Echo", "AmazonBasics", "Tablet", "Charger", "Battery",
+         "Cover", "Paperwhite", "Case", "Speaker", "Alkaline", "Laptop", "Stand", "HD", "8", "10"]
+COMPLAINTS = ["batteries", "long", "don", "battery", "screen", "charge", "slow", "broke", "buy", "ads"]
+
+
+def product_line(rng, i):
+    name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 9)))
+    return f"{i}) {name} | rating={rng.uniform(1, 5):.2f} | reviews={rng.randint(1, 9000)}"
+
+
+def complaints(rng):
+    if rng.random() < 0.4:
+        return "(not enough negative reviews)"
+    return "; ".join(rng.sample(COMPLAINTS, rng.randint(1, 6)))
+
+
+def make_brief(rng):
+    lines = [f"CATEGORY: {rng.choice(WORDS)} {rng.choice(WORDS)}", "", "TOP 3 PRODUCTS:"]
+    for i in range(1, 4):
+        lines.append(product_line(rng, i))
+        lines.append(f"   complaints: {complaints(rng)}")
+    worst = product_line(rng, 0).split(") ", 1)[1]
+    lines += ["", f"WORST PRODUCT: {worst}", f"avoid because: {complaints(rng)}"]
+    return "\n".join(lines)
+
+
+def timed(fn, briefs, calls=1):
+    start = time.perf_counter()
+    for b in briefs:
+        for _ in range(calls):
+            fn(b)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--briefs", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    briefs = [make_brief(rng) for _ in range(args.briefs)]
+
+    mismatches = sum(parse_brief(b) != parse_brief_regex(b) for b in briefs)
+    print(f"{len(briefs):,} briefs, {mismatches} mismatches against the regex parser")
+
+    line_parser = lambda b: brief_parser._parse_lines(b.strip())  # noqa: E731
+    regex = timed(parse_brief_regex, briefs)
+    single = timed(line_parser, briefs)
+
+    # One export touches each brief three times; the memo cache absorbs the repeats
+    brief_parser._parse_cached.cache_clear()
+    chunk = brief_parser.PARSE_CACHE_SIZE
+    regex_export = timed(parse_brief_regex, briefs, calls=3)
+    memo_export = sum(timed(parse_brief, briefs[i:i + chunk], calls=3) for i in range(0, len(briefs), chunk))
+
+    print(f"{'parser':<28} {'total (s)':>10} {'us/brief':>9} {'speedup':>8}")
+    rows = {
+        "regex": (regex, regex),
+        "single pass": (single, regex),
+        "export: regex x3": (regex_export, regex_export),
+        "export: parse_brief x3": (memo_export, regex_export),
+    }
+    for name, (t, base) in rows.items():
+        print(f"{name:<28} {t:>10.3f} {t / len(briefs) * 1e6:>9.1f} {base / t:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+bench_briefs.py — Notebook per-category brief building vs pipeline/briefs.py
+
+Usage:
+    python benchmarks/bench_briefs.py [--categories 100 1000 10000] [--reviews-per-category 30] [--reference-max 1000]
+
+Builds a synthetic review table (products, ratings, predicted labels and
+Zipf-distributed texts) with the given number of categories, then times
+the notebook's build_category_brief loop (per-category filtering and a
+TfidfVectorizer per product) and the one-pass module, and checks that the
+brief strings are identical. The notebook loop is skipped above
+--reference-max categories because it grows with categories x reviews.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "pipeline"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import briefs  # noqa: E402
+from bench_complaints import notebook_top_complaints  # noqa: E402
+
+CAT_COL, PROD_COL, TEXT_COL = "cluster_name", "name", "reviews.text"
+
+
+def make_reviews(n_categories, per_category, seed):
+    rng = np.random.default_rng(seed)
+    n = n_categories * per_category
+    vocab = np.array([f"w{i}" for i in range(3000)] + "battery charge screen broke slow price".split())
+    p = 1 / np.arange(1, len(vocab) + 1) ** 1.1
+    category = rng.integers(0, n_categories, n)
+    product = category * 10 + rng.zipf(1.5, n) % 10
+    rating = rng.choice([1, 2, 3, 4, 5], n, p=[.08, .07, .1, .25, .5])
+    return pd.DataFrame({
+        CAT_COL: [f"category {c}" for c in category],
+        PROD_COL: [f"product {q}" for q in product],
+        "reviews.rating": rating,
+        TEXT_COL: [" ".join(rng.choice(vocab, rng.integers(2, 30), p=p / p.sum())) for _ in range(n)],
+        "predicted_label": np.where(rating <= 2, "NEGATIVE", np.where(rating == 3, "NEUTRAL", "POSITIVE")),
+        "score_negative": rng.random(n),
+        "score_positive": rng.random(n),
+    })
+
+
+def notebook_briefs(df):
+    """build_category_brief from 04_summarization_local.ipynb, for every category."""
+    stats = briefs.product_stats(df)
+    top3, worst = briefs.rank_products(stats)
+
+    def complaints(category, product, topn):
+        neg_texts = df[(df[CAT_COL] == category) & (df[PROD_COL] == product)
+                       & (df["predicted_label"] == "NEGATIVE")][TEXT_COL].tolist()
+        return notebook_top_complaints(neg_texts, topn)
+
+    out = {}
+    for category in sorted(df[CAT_COL].dropna().unique().tolist()):
+        t3 = top3[top3[CAT_COL] == category]
+        w = worst[worst[CAT_COL] == category]
+        lines = [f"CATEGORY: {category}", "", "TOP 3 PRODUCTS:"]
+        for i, row in enumerate(t3.itertuples(index=False), 1):
+            c = complaints(category, getattr(row, PROD_COL), 5)
+            lines.append(f"{i}) {getattr(row, PROD_COL)} | rating={row.avg_rating:.2f} | reviews={int(row.review_count)}")
+            lines.append("   complaints: " + ("; ".join(c) if c else "(not enough negative reviews)"))
+        if len(w):
+            wr = w.iloc[0]
+            c = complaints(category, wr[PROD_COL], 6)
+            lines.append("")
+            lines.append(f"WORST PRODUCT: {wr[PROD_COL]} | rating={wr.avg_rating:.2f} | reviews={int(wr.review_count)}")
+            lines.append("avoid because: " + ("; ".join(c) if c else "low ratings / frequent negatives"))
+        out[category] = "\n".join(lines)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--categories", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--reviews-per-category", type=int, default=30)
+    parser.add_argument("--reference-max", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'categories':>10} {'reviews':>9} {'notebook (s)':>13} {'module (s)':>11} {'speedup':>8} {'mismatches':>11}")
+    for n_categories in args.categories:
+        df = make_reviews(n_categories, args.reviews_per_category, args.seed)
+
+        start = time.perf_counter()
+        built = briefs.build_briefs(df)
+        t_module = time.perf_counter() - start
+
+        if n_categories <= args.reference_max:
+            start = time.perf_counter()
+            reference = notebook_briefs(df)
+            t_ref = time.perf_counter() - start
+            mismatches = sum(reference[c] != b for c, b in zip(built["category"], built["brief"]))
+            print(f"{n_categories:>10,} {len(df):>9,} {t_ref:>13.2f} {t_module:>11.2f} "
+                  f"{t_ref / t_module:>7.1f}x {mismatches:>11}")
+        else:
+            print(f"{n_categories:>10,} {len(df):>9,} {'skipped':>13} {t_module:>11.2f} {'':>8} {'':>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+bench_cluster_assign.py — Assigning new products to saved clusters vs refitting K-Means
+
+Usage:
+    python benchmarks/bench_cluster_assign.py [--new 100000] [--k 6]
+
+Fits pipeline/cluster_model.py's ClusterModel on the 65 real products (names
+from data/product_clusters.csv, categories from pipeline/synthetic.py), as
+03_clustering.ipynb would, then brings in --new synthetic products and times:
+
+    refit     TF-IDF + KMeans over old and new products, what adding SKUs
+              used to take (rerunning the notebook); cluster ids can change
+    assign    nearest saved centroid for every new product
+    update    assign + absorb the non-outliers into the centroids
+
+It also reports how often a new product lands in the cluster of the real
+product it was generated from, the outlier share, and whether the 65
+original products kept their labels after the update and after a refit
+that maps the new clusters onto the old ids. Last, products with no word
+in the vocabulary must come out as outliers and be left out by update().
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "pipeline"))
+from cluster_model import ClusterModel  # noqa: E402
+from synthetic import make_catalog  # noqa: E402
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def purity(labels, truth):
+    """Share of products whose cluster's majority source category is their own."""
+    table = pd.crosstab(labels, truth)
+    return table.max(axis=1).sum() / table.values.sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--new", type=int, default=100_000, help="new products to assign")
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base = make_catalog(65, args.k, seed=args.seed)
+    new = make_catalog(args.new, args.k, seed=args.seed + 1)
+    new = new[~new["name"].isin(base["name"])].reset_index(drop=True)  # only the "#k" copies are new
+    model, fit_s = timed(ClusterModel.fit, base["name"], base["categories"], args.k)
+    before = model.assign(base["name"], base["categories"])["cluster"].to_numpy()
+    print(f"fit on {len(base)} products: {fit_s:.2f}s, outlier threshold {model.threshold:.3f}")
+
+    names = pd.concat([base["name"], new["name"]], ignore_index=True)
+    categories = pd.concat([base["categories"], new["categories"]], ignore_index=True)
+    refit, refit_s = timed(ClusterModel.fit, names, categories, args.k)
+    assigned, assign_s = timed(model.assign, new["name"], new["categories"])
+    _, update_s = timed(model.update, new["name"], new["categories"])
+    after = model.assign(base["name"], base["categories"])["cluster"].to_numpy()
+    mapped, mapped_s = timed(model.refit, names, categories)
+    remapped = mapped.assign(base["name"], base["categories"])["cluster"].to_numpy()
+
+    print(f"\n{len(new):,} new products")
+    print(f"  {'refit (old way)':<18} {refit_s:>7.2f}s")
+    print(f"  {'assign':<18} {assign_s:>7.2f}s  {len(new) / assign_s:>9,.0f} products/s  "
+          f"{refit_s / assign_s:>5.1f}x faster")
+    print(f"  {'update':<18} {update_s:>7.2f}s  absorbed {model.meta['absorbed']:,}")
+    print(f"\n  purity of assignments  {purity(assigned['cluster'], new['base_cluster']):.1%}"
+          f"  (refit: {purity(refit.assign(new['name'], new['categories'])['cluster'], new['base_cluster']):.1%})")
+    print(f"  outliers               {assigned['outlier'].mean():.2%}")
+    print(f"  original labels kept   after update {np.mean(after == before):.0%}, "
+          f"after refit {np.mean(remapped == before):.0%} (refit + id mapping: {mapped_s:.2f}s)")
+
+    unknown = pd.DataFrame({"name": ["qqq xyz", "zzzz 12345"], "categories": ["garden hose", "qwerty"]})
+    absorbed = model.meta["absorbed"]
+    flagged = model.update(unknown["name"], unknown["categories"])["outlier"]
+    print(f"  no-vocabulary products flagged {flagged.sum()}/{len(flagged)}, "
+          f"absorbed {model.meta['absorbed'] - absorbed}")
+    if not flagged.all() or model.meta["absorbed"] != absorbed:
+        raise SystemExit("products with no word in the vocabulary must be outliers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+bench_clustering.py — Dense notebook clustering vs pipeline/clustering.py (time and memory)
+
+Usage:
+    python benchmarks/bench_clustering.py [--sizes 2000 20000 200000] [--k 2 10] [--jobs -1]
+                                          [--features 1000] [--notebook-max 20000]
+
+Each size is a number of products with synthetic name + category texts
+(Zipf-distributed words), turned into the notebook's TF-IDF matrix. Times:
+    notebook sweep    KMeans(n_init=10) + exact silhouette_score for every K
+    sparse sweep      clustering.k_sweep (MiniBatchKMeans above EXACT_MAX rows,
+                      sampled silhouette above SILHOUETTE_SAMPLE), --jobs workers
+    notebook project  PCA(2).fit_transform(X.toarray())
+    sparse project    clustering.project (TruncatedSVD on X)
+Memory is tracemalloc's peak for this process during each step (joblib
+workers are not counted; run with --jobs 1 to include the sweep's fits).
+The notebook steps are skipped above --notebook-max products.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import silhouette_score
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "pipeline"))
+import clustering  # noqa: E402
+
+
+def make_matrix(n_products, max_features, seed=0):
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(20_000)])
+    p = 1 / np.arange(1, len(vocab) + 1) ** 1.05
+    lengths = rng.integers(6, 30, n_products)
+    words = rng.choice(vocab, size=lengths.sum(), p=p / p.sum())
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    texts = [" ".join(words[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+    tfidf = TfidfVectorizer(max_features=max_features, ngram_range=(1, 2), stop_words="english")
+    return tfidf.fit_transform(texts)
+
+
+def notebook_sweep(X, k_values):
+    for k in k_values:
+        labels = KMeans(n_clusters=k, random_state=42, n_init=10).fit_predict(X)
+        silhouette_score(X, labels)
+
+
+def notebook_project(X):
+    PCA(n_components=2, random_state=42).fit_transform(X.toarray())
+
+
+def timed(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20_000, 200_000])
+    parser.add_argument("--k", type=int, nargs=2, default=[2, 10], metavar=("MIN", "MAX"))
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--features", type=int, default=1000)
+    parser.add_argument("--notebook-max", type=int, default=20_000)
+    args = parser.parse_args()
+    k_values = range(args.k[0], args.k[1] + 1)
+
+    print(f"{'products':>9} {'nnz':>10} {'matrix':>8}  {'step':<17} {'time':>9} {'peak':>10}")
+    for n in args.sizes:
+        X = make_matrix(n, args.features)
+        matrix_mb = (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 1e6
+        steps = {
+            "sparse sweep": (lambda: clustering.k_sweep(X, k_values, n_jobs=args.jobs)),
+            "sparse project": (lambda: clustering.project(X)),
+        }
+        if n <= args.notebook_max:
+            steps = {"notebook sweep": (lambda: notebook_sweep(X, k_values)),
+                     "notebook project": (lambda: notebook_project(X)), **steps}
+        for name, fn in steps.items():
+            seconds, peak_mb = timed(fn)
+            print(f"{n:>9,} {X.nnz:>10,} {matrix_mb:>6.1f}MB  {name:<17} {seconds:>8.2f}s {peak_mb:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+bench_complaints.py — Per-product TfidfVectorizer vs one shared sparse pass
+
+Usage:
+    python benchmarks/bench_complaints.py [--sizes 20000:200 20000:2000 100000:2000] [--seed 0]
+
+Each size is reviews:products. Builds a synthetic catalog (Zipf-distributed
+words and product popularity, a third of reviews negative), then times:
+    per-product   the notebook: boolean scan + TfidfVectorizer per product
+    shared        pipeline/complaints.py: one CountVectorizer, sparse group means
+and checks both give the same top-6 terms for every product.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "pipeline"))
+import complaints  # noqa: E402
+
+TOPN = 6
+
+
+def make_catalog(n_reviews, n_products, seed):
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(5000)] + "battery charge screen broke slow price".split())
+    p = 1 / np.arange(1, len(vocab) + 1) ** 1.1
+    texts = [" ".join(rng.choice(vocab, rng.integers(2, 40), p=p / p.sum())) for _ in range(n_reviews)]
+    product = rng.zipf(1.3, n_reviews) % n_products
+    return pd.DataFrame({
+        "cluster_name": [f"cat {q % 8}" for q in product],
+        "name": [f"product {q}" for q in product],
+        "reviews.text": texts,
+        "predicted_label": rng.choice(["NEGATIVE", "NEUTRAL", "POSITIVE"], n_reviews),
+    })
+
+
+def notebook_top_complaints(texts, topn):
+    """top_complaints_for_product from 04_summarization_local.ipynb."""
+    texts = [t for t in texts if isinstance(t, str) and t.strip()]
+    if len(texts) < 5:
+        return []
+    vec = TfidfVectorizer(lowercase=True, stop_words="english", ngram_range=(1, 2), min_df=2, max_df=0.95)
+    X = vec.fit_transform(texts)
+    scores = X.mean(axis=0).A1
+    terms = np.array(vec.get_feature_names_out())
+    return terms[scores.argsort()[::-1][:topn]].tolist()
+
+
+def per_product(df):
+    out = {}
+    for cat, prod in df[["cluster_name", "name"]].drop_duplicates().itertuples(index=False):
+        neg_texts = df[
+            (df["cluster_name"] == cat) & (df["name"] == prod) & (df["predicted_label"] == "NEGATIVE")
+        ]["reviews.text"].tolist()
+        out[(cat, prod)] = notebook_top_complaints(neg_texts, TOPN)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", nargs="+", default=["20000:200", "20000:2000", "100000:2000"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'reviews':>8} {'products':>9} {'per-product (s)':>16} {'shared (s)':>11} {'speedup':>8} {'mismatches':>11}")
+    for size in args.sizes:
+        n_reviews, n_products = map(int, size.split(":"))
+        df = make_catalog(n_reviews, n_products, args.seed)
+
+        start = time.perf_counter()
+        reference = per_product(df)
+        t_ref = time.perf_counter() - start
+
+        start = time.perf_counter()
+        shared = complaints.top_complaints(df, topn=TOPN)
+        t_shared = time.perf_counter() - start
+
+        mismatches = sum(shared.get(k, []) != v for k, v in reference.items())
+        print(f"{n_reviews:>8,} {df['name'].nunique():>9,} {t_ref:>16.2f} {t_shared:>11.2f} "
+              f"{t_ref / t_shared:>7.1f}x {mismatches:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+bench_concurrency.py — Load test of concurrent "Generate Summary" requests
+
+Usage:
+    python benchmarks/bench_concurrency.py [--users 1 4 8 16] [--requests 3] [--window-ms 25] [--max-batch 8]
+
+Simulates N analysts clicking "Generate Summary" at the same time: each
+user is a thread that sends --requests briefs from data/category_blog_posts.csv
+back to back through an InferenceWorker, exactly as the Gradio handler does.
+Every user count runs twice, unbatched (max_batch=1, one generate call
+per request, the old behaviour) and micro-batched, and reports p50/p95
+request latency, throughput and the average batch size. The summary cache
+is off so every request reaches the model.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "webapp"))
+import summarizer  # noqa: E402
+from inference_worker import InferenceWorker  # noqa: E402
+
+
+def load_test(worker, briefs, users, requests, profile):
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(users)
+
+    def user(uid):
+        barrier.wait()  # everyone starts together
+        for r in range(requests):
+            brief = briefs[(uid + r) % len(briefs)]
+            start = time.perf_counter()
+            worker.summarize(brief, profile=profile)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=user, args=(u,)) for u in range(users)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    return np.array(latencies), wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=3, help="requests per user")
+    parser.add_argument("--window-ms", type=float, default=25)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--profile", default="fast-greedy", choices=list(summarizer.DECODING_PROFILES))
+    parser.add_argument("--csv", default=os.path.join(ROOT, "data", "category_blog_posts.csv"))
+    args = parser.parse_args()
+
+    briefs = pd.read_csv(args.csv)["brief"].astype(str).tolist()
+    summarizer.get_model()
+    summarizer.generate_summaries(briefs[:1], profile=args.profile, use_summary_cache=False)  # warm-up
+
+    modes = {
+        "unbatched": dict(window_ms=0, max_batch=1),
+        "micro-batched": dict(window_ms=args.window_ms, max_batch=args.max_batch),
+    }
+    print(f"device={summarizer.runtime_device()}  backend={summarizer.GEN_BACKEND}  "
+          f"profile={args.profile}  requests/user={args.requests}")
+    print(f"{'users':>5} {'mode':<14} {'p50 (ms)':>9} {'p95 (ms)':>9} {'req/s':>7} {'avg batch':>10}")
+    for users in args.users:
+        for mode, cfg in modes.items():
+            worker = InferenceWorker(**cfg, use_summary_cache=False).start()
+            latencies, wall = load_test(worker, briefs, users, args.requests, args.profile)
+            p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+            print(f"{users:>5} {mode:<14} {p50:>9.1f} {p95:>9.1f} {len(latencies) / wall:>7.2f} "
+                  f"{worker.stats()['avg_batch']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+bench_dataset.py — Review loading: the CSVs vs the Parquet dataset (time and memory)
+
+Usage:
+    python benchmarks/bench_dataset.py [--sizes 200000 1000000] [--products 2000] [--repeats 3]
+
+Writes a synthetic data_with_clusters.csv and data_with_predictions_v2.csv
+(the notebooks' full-width layout, predictions repeating every review
+column) to a temporary folder, builds pipeline/dataset.py's dataset from
+them and times each way of loading the reviews in a fresh interpreter:
+
+    csv, as notebooks     pd.read_csv of both files, predictions joined by position
+    csv, projected        the CSV fallback: usecols + categoricals
+    parquet, all          load_reviews()
+    parquet, projected    load_reviews(the generator's columns)
+    ..., filtered         one cluster's negative reviews (predicate pushdown
+                          on parquet, a mask after reading on CSV)
+    parquet, streamed     iter_batches() over the projected columns, 50,000
+                          rows at a time (frame: the largest batch)
+
+Reports the best wall time, the frame's in-memory size (deep) and the
+process's peak RSS above the imports (Linux only), plus file sizes and build time.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "pipeline"))
+from dataset import DATASET_NAME, build_dataset, read_meta  # noqa: E402
+
+CLUSTERS = np.array(["Fire Tablets", "Batteries & Household", "E-Readers",
+                     "Smart Speakers", "Accessories", "Media & Home"])
+WORDS = np.array(("the this it tablet battery screen kindle great love works fine easy price "
+                  "kids charge bought would not very good slow broke return product amazon "
+                  "echo alexa sound quality reading light weight use gift recommend").split())
+LABELS = np.array(["NEGATIVE", "NEUTRAL", "POSITIVE"])
+WEBAPP_COLS = ["name", "cluster_name", "reviews.rating", "reviews.text", "sentiment",
+               "predicted_label", "predicted_score"]
+FILTER = [("cluster_name", "==", "E-Readers"), ("predicted_label", "==", "NEGATIVE")]
+
+SCENARIOS = {
+    "csv, as notebooks": """
+df = pd.read_csv(os.path.join(D, "data_with_clusters.csv"))
+pred = pd.read_csv(os.path.join(D, "data_with_predictions_v2.csv"))
+for col in PRED_COLS:
+    df[col] = pred[col]
+del pred""",
+    "csv, projected": "df = read_csv_reviews(D, COLS)",
+    "csv, projected + filtered": "df = read_csv_reviews(D, COLS, FILTER)",
+    "parquet, all": "df = load_reviews(data_dir=D)",
+    "parquet, projected": "df = load_reviews(COLS, data_dir=D)",
+    "parquet, projected + filtered": "df = load_reviews(COLS, FILTER, data_dir=D)",
+    "parquet, streamed": """
+df = None
+for chunk in iter_batches(COLS, batch_rows=50_000, data_dir=D):
+    n = chunk.memory_usage(deep=True).sum()
+    size = n if df is None else max(size, n)
+    df = chunk
+df = chunk""",
+}
+
+# Peak RSS is reset after the imports (Linux: clear_refs), so it counts the load alone
+TEMPLATE = """
+import gc, os, sys, time
+import pandas as pd
+sys.path.insert(0, {pipeline!r})
+from dataset import PRED_COLS, iter_batches, load_reviews, read_csv_reviews
+D, COLS, FILTER = {data_dir!r}, {cols!r}, {filters!r}
+def status(key):
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(key))
+gc.collect()
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")
+base = status("VmRSS")
+start = time.perf_counter()
+{code}
+seconds = time.perf_counter() - start
+peak = status("VmHWM")
+size = locals().get("size") or df.memory_usage(deep=True).sum()
+print(seconds, (peak - base) / 1024, size / 1e6, len(df))
+"""
+
+
+def make_csvs(data_dir, n_reviews, n_products, seed=0):
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, n_products + 1)
+    product = rng.choice(n_products, size=n_reviews, p=weights / weights.sum())
+    rating = rng.choice([1, 2, 3, 4, 5], size=n_reviews, p=[.05, .04, .06, .2, .65])
+    lengths = rng.integers(5, 80, n_reviews)
+    words = rng.choice(WORDS, size=lengths.sum())
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    sentiment = np.where(rating <= 2, "Negative", np.where(rating == 3, "Neutral", "Positive"))
+    df = pd.DataFrame({
+        "id": rng.integers(0, 10 ** 9, n_reviews),
+        "name": [f"Product {i} – {CLUSTERS[i % len(CLUSTERS)]} edition" for i in product],
+        "categories": np.array(["Electronics,Tablets", "Health & Beauty,Household Batteries",
+                                "Electronics,eBook Readers"])[product % 3],
+        "reviews.date": pd.Timestamp("2017-01-01") + pd.to_timedelta(rng.integers(0, 900, n_reviews), "D"),
+        "reviews.username": [f"user{u}" for u in rng.integers(0, n_reviews // 3 + 1, n_reviews)],
+        "reviews.rating": rating,
+        "reviews.text": [" ".join(words[a:b]).capitalize() + "." for a, b in zip(bounds[:-1], bounds[1:])],
+        "sentiment": sentiment,
+    })
+    preds = df.copy()
+    scores = rng.dirichlet([1, 1, 6], n_reviews)
+    preds["predicted_label"] = LABELS[scores.argmax(axis=1)]
+    preds["predicted_score"] = scores.max(axis=1)
+    for i, label in enumerate(LABELS):
+        preds[f"score_{label.lower()}"] = scores[:, i]
+    preds.to_csv(os.path.join(data_dir, "data_with_predictions_v2.csv"), index=False)
+    df["cluster"] = product % len(CLUSTERS)
+    df["cluster_name"] = CLUSTERS[df["cluster"]]
+    df.to_csv(os.path.join(data_dir, "data_with_clusters.csv"), index=False)
+
+
+def measure(data_dir, code, repeats):
+    script = TEMPLATE.format(pipeline=os.path.join(ROOT, "pipeline"), data_dir=str(data_dir),
+                             cols=WEBAPP_COLS, filters=FILTER, code=code)
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+        runs.append([float(x) for x in out.stdout.split()])
+    best = min(runs, key=lambda r: r[0])
+    return best[0], max(r[1] for r in runs), best[2], int(best[3])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200_000, 1_000_000])
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            make_csvs(tmp, n, args.products)
+            csv_mb = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)) / 1e6
+            t = time.perf_counter()
+            build_dataset(tmp)
+            t_build = time.perf_counter() - t
+            path = os.path.join(tmp, DATASET_NAME)
+            parquet_mb = sum(os.path.getsize(os.path.join(path, rel)) for rel in read_meta(path)["files"]) / 1e6
+
+            print(f"\n{n:,} reviews — CSVs {csv_mb:,.0f}MB, dataset {parquet_mb:,.0f}MB "
+                  f"({len(read_meta(path)['files'])} files, built in {t_build:.1f}s)")
+            print(f"  {'load':<30} {'time':>8} {'rows':>10} {'frame':>10} {'peak RSS':>10}")
+            results = {}
+            for name, code in SCENARIOS.items():
+                seconds, peak_mb, frame_mb, rows = results[name] = measure(tmp, code, args.repeats)
+                print(f"  {name:<30} {seconds:>7.2f}s {rows:>10,} {frame_mb:>8,.0f}MB {peak_mb:>8,.0f}MB")
+            base = results["csv, as notebooks"][0]
+            print("  speedup vs csv, as notebooks: " + json.dumps(
+                {k: round(base / v[0], 1) for k, v in results.items() if k.startswith("parquet")}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+bench_decoding_profiles.py — Latency and tokens/sec per decoding profile
+
+Usage:
+    python benchmarks/bench_decoding_profiles.py [--repeats 3]
+
+Runs every profile in summarizer.DECODING_PROFILES on each brief in
+data/category_blog_posts.csv, one brief at a time (the "Generate Summary"
+path), and reports mean latency and generated tokens/sec. The old setting
+(sampling with use_cache=False) is included as a reference row.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+import torch
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "webapp"))
+import summarizer  # noqa: E402
+
+
+@torch.inference_mode()
+def run(prompts, gen_kwargs, repeats):
+    tokenizer, model, device = summarizer.get_model()
+    latencies, tokens = [], 0
+    for _ in range(repeats):
+        for prompt in prompts:
+            inputs = tokenizer(
+                prompt, return_tensors="pt", truncation=True, max_length=summarizer.MAX_INPUT_TOKENS
+            ).to(device)
+            start = time.perf_counter()
+            out = model.generate(**inputs, **gen_kwargs)
+            latencies.append(time.perf_counter() - start)
+            tokens += out.shape[1] - 1  # minus the decoder start token
+    return sum(latencies) / len(latencies), tokens / sum(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--csv", default=os.path.join(ROOT, "data", "category_blog_posts.csv"))
+    args = parser.parse_args()
+
+    briefs = pd.read_csv(args.csv)["brief"].astype(str).tolist()
+    prompts = [summarizer.build_facts_prompt(b) for b in briefs]
+
+    runs = {name: summarizer.decoding_kwargs(name) for name in summarizer.DECODING_PROFILES}
+    runs["sampling, no cache (old)"] = {**summarizer.decoding_kwargs("cached-sampling"), "use_cache": False}
+
+    run(prompts[:1], runs["fast-greedy"], 1)  # warm-up
+    print(f"device={summarizer.runtime_device()}  model={summarizer.GEN_MODEL_NAME}  "
+          f"briefs={len(prompts)}  repeats={args.repeats}")
+    print(f"{'profile':<26} {'latency (ms)':>13} {'tokens/sec':>11}")
+    for name, gen_kwargs in runs.items():
+        latency, tps = run(prompts, gen_kwargs, args.repeats)
+        print(f"{name:<26} {latency * 1000:>13.1f} {tps:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+bench_export_workers.py — Wall time and memory of the export against worker processes
+
+Usage:
+    python benchmarks/bench_export_workers.py [--prompts 96] [--workers 1 2 4 8] [--profile fast-greedy]
+                                              [--threads N] [--model google/flan-t5-base]
+
+Generates summaries for the briefs in data/category_blog_posts.csv, repeated
+until there are --prompts of them, with summarizer.generate_summaries() and
+each --workers count (export_pool.py; 1 is the single-process export). Each
+count runs in a fresh interpreter that loads the model and forks its pool
+before generating anything, as app_gradio.py does at launch. One small
+untimed batch warms up the parent first. The summary cache is bypassed so
+every prompt is generated. For each count:
+
+    seconds, prompts/sec, speedup    against 1 worker
+    threads                          torch threads per worker (--threads to force)
+    RSS sum                          parent + workers' peak RSS, what `top` adds up
+                                     (counts the shared model once per process)
+    PSS                              parent + workers' proportional set size, the
+                                     real footprint with copy-on-write pages shared
+
+With a greedy profile the summaries must match the 1-worker run.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "webapp"))
+import export_pool  # noqa: E402
+import summarizer  # noqa: E402
+
+
+def mb(kb):
+    return kb / 1024 if kb else float("nan")
+
+
+def run_one(args):
+    """One worker count, in this process; prints a JSON line."""
+    import torch
+
+    if args.model:
+        summarizer.GEN_MODEL_NAME = args.model
+    briefs = pd.read_csv(args.csv)["brief"].astype(str).tolist()
+    briefs = (briefs * (args.prompts // len(briefs) + 1))[:args.prompts]
+    n = args.child
+    if n > 1:
+        export_pool.start_pool(n, threads=args.threads or None)
+    summarizer.generate_summaries(briefs[:2], batch_size=2, profile=args.profile, use_summary_cache=False)
+
+    start = time.perf_counter()
+    texts = summarizer.generate_summaries(briefs, batch_size=args.batch_size, profile=args.profile,
+                                          use_summary_cache=False, workers=n)
+    elapsed = time.perf_counter() - start
+
+    run = export_pool.LAST_RUN
+    if run:
+        procs = [run["parent_memory"], *run["worker_memory"].values()]
+        rss = sum(m.get("peak_rss_kb", 0) for m in procs)
+        pss = sum(m.get("pss_kb", 0) for m in procs)
+        threads = run["threads"]
+    else:  # one worker: generated in this process
+        memory = export_pool.memory_kb()
+        rss, pss = memory.get("peak_rss_kb"), memory.get("pss_kb")
+        threads = torch.get_num_threads()
+    print(json.dumps({"seconds": elapsed, "threads": threads, "rss_kb": rss, "pss_kb": pss, "texts": texts}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--prompts", type=int, default=96)
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="worker counts (default: 1, 2, 4, ... up to the CPU count)")
+    parser.add_argument("--threads", type=int, default=0, help="torch threads per worker (default: CPUs // workers)")
+    parser.add_argument("--batch-size", type=int, default=summarizer.GEN_BATCH_SIZE)
+    parser.add_argument("--profile", default="fast-greedy", choices=list(summarizer.DECODING_PROFILES))
+    parser.add_argument("--model", default=None, help=f"model name or path (default: {summarizer.GEN_MODEL_NAME})")
+    parser.add_argument("--csv", default=os.path.join(ROOT, "data", "category_blog_posts.csv"))
+    parser.add_argument("--child", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        return run_one(args)
+
+    cpus = export_pool.cpu_count()
+    workers = args.workers or sorted({min(2 ** k, cpus) for k in range(cpus.bit_length() + 1)})
+    print(f"backend={summarizer.GEN_BACKEND}  cpus={cpus}  model={args.model or summarizer.GEN_MODEL_NAME}  "
+          f"prompts={args.prompts}  batch={args.batch_size}  profile={args.profile}")
+    print(f"{'workers':>7} {'threads':>7} {'seconds':>8} {'prompts/s':>9} {'speedup':>7} "
+          f"{'RSS sum':>9} {'PSS':>8}  output")
+    baseline = reference = None
+    for n in workers:
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", str(n), "--prompts", str(args.prompts),
+               "--threads", str(args.threads), "--batch-size", str(args.batch_size), "--profile", args.profile,
+               "--csv", args.csv] + (["--model", args.model] if args.model else [])
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        rate = args.prompts / r["seconds"]
+        baseline = baseline or rate
+        reference = reference or r["texts"]
+        if r["texts"] == reference:
+            same = "identical"
+        else:
+            same = "sampled" if args.profile == "cached-sampling" else "DIFFERS"
+        print(f"{n:>7} {r['threads']:>7} {r['seconds']:>8.2f} {rate:>9.2f} {rate / baseline:>6.2f}x "
+              f"{mb(r['rss_kb']):>7,.0f}MB {mb(r['pss_kb']):>6,.0f}MB  {same}")
+
+
+if __name__ == "__main__":
+    main()
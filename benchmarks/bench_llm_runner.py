@@ -0,0 +1,139 @@
+"""
+bench_llm_runner.py — Notebook-style sequential API calls vs the async runner, against the local stub
+
+Usage:
+    python benchmarks/bench_llm_runner.py [--jobs 39] [--concurrency 1 4 16] [--rpm 30]
+                                          [--latency 0.4] [--tokens-per-sec 200] [--error-rate 0.05]
+
+Starts pipeline/llm_stub.py in-process (simulated latency and 529s, no
+network) and sends --jobs synthetic prompts shaped like the notebook's
+(one in seven a 6,000-character cluster prompt with max_tokens 1500, the
+rest 2,500-character product prompts with 600):
+
+    sequential       04_summarization_api.ipynb: one call at a time, no
+                     retries, the notebook's 1s / 0.5s courtesy sleeps
+    runner, c=N      pipeline/llm_runner.py with N requests in flight
+    runner, rpm=R    the same at the highest N, capped at R requests per minute
+    resume           interrupted after half the answers, then rerun: the
+                     second run only requests the missing ones
+
+Reports wall time, answers per second, requests sent, retries and failures.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "pipeline"))
+import llm_stub  # noqa: E402
+from llm_runner import Journal, Runner, build_request  # noqa: E402
+
+MODEL = "stub-model"
+NO_LIMIT = 1e6  # requests per minute, effectively unlimited
+
+
+def make_jobs(n):
+    jobs = []
+    for i in range(n):
+        cluster = i % 7 == 0
+        body = " ".join(f"review{i}-{w}" for w in range(600 if cluster else 250))
+        jobs.append({"id": f"{'cluster' if cluster else 'product'}:{i}", "system": "You are a product analyst.",
+                     "prompt": f"Summarize item {i}.\n{body}", "max_tokens": 1500 if cluster else 600})
+    return jobs
+
+
+def sequential(url, jobs):
+    """The notebook's loop: errors are recorded, not retried."""
+    failed = 0
+    with httpx.Client(base_url=url, timeout=120) as client:
+        for job in jobs:
+            path, headers, body = build_request("anthropic", MODEL, "stub", job)
+            if client.post(path, headers=headers, json=body).status_code != 200:
+                failed += 1
+            time.sleep(1 if job["id"].startswith("cluster") else 0.5)
+    return {"requests": len(jobs), "retries": 0, "failed": failed, "done": len(jobs) - failed}
+
+
+def run_runner(url, jobs, journal_path, concurrency, rpm, stop_after=None):
+    runner = Runner("anthropic", MODEL, "stub", base_url=url, concurrency=concurrency, rpm=rpm, backoff_base=0.25)
+    journal = Journal(journal_path)
+    tasks = []
+
+    def stop(job, entry):
+        if stop_after is not None and runner.stats["done"] >= stop_after:
+            tasks[0].cancel()  # like Ctrl+C: requests in flight are dropped
+
+    async def main():
+        tasks.append(asyncio.ensure_future(runner.run(jobs, journal, on_done=stop)))
+        try:
+            await tasks[0]
+        except asyncio.CancelledError:
+            pass
+
+    try:
+        asyncio.run(main())
+    finally:
+        journal.close()
+    s = runner.stats
+    return {"requests": s["attempts"], "retries": s["retries"], "failed": s["failed"], "done": s["done"],
+            "resumed": s["resumed"]}
+
+
+def report(name, seconds, result):
+    rate = result["done"] / seconds if seconds else 0.0
+    extra = f" ({result['resumed']} resumed)" if result.get("resumed") else ""
+    print(f"  {name:<22} {seconds:>8.1f}s {rate:>9.2f}/s {result['requests']:>9} {result['retries']:>8} "
+          f"{result['failed']:>7}{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--jobs", type=int, default=39)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--rpm", type=float, default=30)
+    parser.add_argument("--latency", type=float, default=0.4)
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    server = llm_stub.start(latency=args.latency, tokens_per_sec=args.tokens_per_sec, error_rate=args.error_rate)
+    jobs = make_jobs(args.jobs)
+    print(f"{len(jobs)} prompts, stub latency {args.latency}s + tokens at {args.tokens_per_sec:g}/s, "
+          f"{args.error_rate:.0%} overloaded")
+    print(f"  {'run':<22} {'time':>9} {'answers':>10} {'requests':>9} {'retries':>8} {'failed':>7}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.skip_sequential:
+            start = time.perf_counter()
+            result = sequential(server.url, jobs)
+            report("sequential", time.perf_counter() - start, result)
+
+        runs = [(f"runner, c={c}", c, NO_LIMIT) for c in args.concurrency]
+        runs.append((f"runner, rpm={args.rpm:g}", max(args.concurrency), args.rpm))
+        for i, (name, concurrency, rpm) in enumerate(runs):
+            start = time.perf_counter()
+            result = run_runner(server.url, jobs, os.path.join(tmp, f"run{i}.jsonl"), concurrency, rpm)
+            report(name, time.perf_counter() - start, result)
+
+        path = os.path.join(tmp, "resume.jsonl")
+        concurrency = max(args.concurrency)
+        start = time.perf_counter()
+        result = run_runner(server.url, jobs, path, concurrency, NO_LIMIT, stop_after=len(jobs) // 2)
+        report("resume: interrupted", time.perf_counter() - start, result)
+        start = time.perf_counter()
+        result = run_runner(server.url, jobs, path, concurrency, NO_LIMIT)
+        report("resume: rerun", time.perf_counter() - start, result)
+
+    server.shutdown()
+    print(f"stub: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+bench_payload.py — First-load bytes and latency, single JSON files vs sharded, precompressed pages
+
+Usage:
+    python benchmarks/bench_payload.py [--sizes 50000:200 500000:2000] [--reviews-per-group 500]
+
+Each size is reviews:products. Writes a synthetic catalog to a temporary
+folder, runs webapp/generate_webapp.py on it, and compares:
+    before   what index.html used to fetch at load: stats, clusters,
+             clusters_local, products and reviews_sample (500 reviews),
+             all pretty-printed, uncompressed or gzipped on the fly
+    after    index.json + stats.json, minified, served as .gz / .br
+Also lists the bytes of the first Reviews and Products page, and models
+load time per network as one round trip plus transfer time (requests run
+in parallel).
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+GENERATOR = os.path.join(ROOT, "webapp", "generate_webapp.py")
+
+CLUSTERS = np.array(["Fire Tablets", "Batteries & Household", "E-Readers",
+                     "Smart Speakers", "Accessories", "Media & Home"])
+WORDS = np.array(("the this it tablet battery screen kindle great love works fine easy price "
+                  "kids charge bought would not very good slow broke return product amazon "
+                  "echo alexa sound quality reading light weight use gift recommend").split())
+# name, downlink Mbit/s, round trip ms
+NETWORKS = [("slow 3G", 0.4, 400), ("fast 3G", 1.6, 150), ("4G", 9.0, 60), ("broadband", 50.0, 20)]
+
+
+def make_catalog(data_dir, n_reviews, n_products, seed):
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, n_products + 1)
+    product = rng.choice(n_products, size=n_reviews, p=weights / weights.sum())
+    rating = rng.choice([1, 2, 3, 4, 5], size=n_reviews, p=[.05, .04, .06, .2, .65])
+    lengths = rng.integers(5, 80, n_reviews)
+    words = rng.choice(WORDS, size=lengths.sum())
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    pd.DataFrame({
+        "name": [f"Product {i} – {CLUSTERS[i % len(CLUSTERS)]} edition" for i in product],
+        "cluster_name": CLUSTERS[product % len(CLUSTERS)],
+        "reviews.rating": rating,
+        "reviews.text": [" ".join(words[a:b]).capitalize() + "." for a, b in zip(bounds[:-1], bounds[1:])],
+        "sentiment": np.where(rating <= 2, "NEGATIVE", np.where(rating == 3, "NEUTRAL", "POSITIVE")),
+    }).to_csv(os.path.join(data_dir, "data_with_clusters.csv"), index=False)
+    for name in ["summaries_api.json", "summaries_local_full.json"]:
+        src = os.path.join(ROOT, "data", name)
+        if os.path.exists(src):
+            shutil.copy(src, data_dir)
+
+
+def read_pages(out, kind, shard):
+    records = []
+    for page in range(shard["pages"]):
+        records += json.loads((out / kind / shard["id"] / f"{page}.json").read_text(encoding="utf-8"))
+    return records
+
+
+def legacy_payload(out, index):
+    """The five files the old generator wrote, rebuilt from the new output."""
+    load = lambda name: json.loads((out / name).read_text(encoding="utf-8"))
+    products = read_pages(out, "products", index["products"]["shards"][0])
+    # Old sample: 20 reviews per (cluster, sentiment), 500 at most
+    reviews = [r for s in index["reviews"]["shards"] for r in read_pages(out, "reviews", s)[:20]][:500]
+    return {
+        "stats.json": json.dumps(load("stats.json"), indent=2).encode(),
+        "clusters.json": json.dumps(load("clusters.json"), indent=2, ensure_ascii=False).encode(),
+        "clusters_local.json": json.dumps(load("clusters_local.json"), indent=2, ensure_ascii=False).encode(),
+        "products.json": json.dumps(products, indent=2, ensure_ascii=False).encode(),
+        "reviews_sample.json": json.dumps(reviews, indent=2, ensure_ascii=False).encode(),
+    }
+
+
+def file_sizes(out, rel_paths):
+    return {enc: sum((out / (rel + suffix)).stat().st_size for rel in rel_paths)
+            if all((out / (rel + suffix)).exists() for rel in rel_paths) else None
+            for enc, suffix in [("raw", ""), ("gzip", ".gz"), ("brotli", ".br")]}
+
+
+def load_ms(n_bytes, mbit, rtt_ms):
+    return rtt_ms + n_bytes * 8 / (mbit * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", nargs="+", default=["50000:200", "500000:2000"])
+    parser.add_argument("--reviews-per-group", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        n_reviews, n_products = map(int, size.split(":"))
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            (tmp / "data").mkdir()
+            make_catalog(tmp / "data", n_reviews, n_products, args.seed)
+            subprocess.run([sys.executable, GENERATOR, "--force", "--data-dir", str(tmp / "data"),
+                            "--output-dir", str(tmp / "out"), "--cache-dir", str(tmp / "cache"),
+                            "--reviews-per-group", str(args.reviews_per_group)],
+                           check=True, stdout=subprocess.DEVNULL)
+            out = tmp / "out"
+            index = json.loads((out / "index.json").read_text(encoding="utf-8"))
+
+            legacy = legacy_payload(out, index)
+            before = {"raw": sum(map(len, legacy.values())),
+                      "gzip": sum(len(gzip.compress(b, 6)) for b in legacy.values())}
+            after = file_sizes(out, ["index.json", "stats.json"])
+            first_reviews = file_sizes(out, [f"reviews/{index['reviews']['shards'][0]['id']}/0.json"])
+            first_products = file_sizes(out, ["products/all/0.json"])
+
+        print(f"\n{n_reviews:,} reviews, {n_products:,} products — explorer covers "
+              f"{min(500, index['reviews']['total']):,} reviews before, {index['reviews']['total']:,} after")
+        print(f"  {'first load':<34} {'raw':>10} {'gzip':>10} {'brotli':>10}")
+        rows = [("before: 5 files, indented", before),
+                ("after: index + stats, minified", after),
+                ("after: first Reviews page", first_reviews),
+                ("after: first Products page", first_products)]
+        for label, sizes in rows:
+            cells = [f"{sizes[e] / 1024:>8.1f}KB" if sizes.get(e) is not None else f"{'-':>10}"
+                     for e in ["raw", "gzip", "brotli"]]
+            print(f"  {label:<34} {' '.join(cells)}")
+
+        best_after = after["brotli"] if after["brotli"] is not None else after["gzip"]
+        print(f"  {'modeled first load (ms)':<34} {'before raw':>10} {'before gz':>10} {'after':>10}")
+        for name, mbit, rtt in NETWORKS:
+            print(f"  {name:<34} {load_ms(before['raw'], mbit, rtt):>10.0f} "
+                  f"{load_ms(before['gzip'], mbit, rtt):>10.0f} {load_ms(best_after, mbit, rtt):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
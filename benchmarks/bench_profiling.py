@@ -0,0 +1,101 @@
+"""
+bench_profiling.py — Cost of webapp/profiling.py: per stage, and on a full generate_webapp.py build
+
+Usage:
+    python benchmarks/bench_profiling.py [--reviews 200000] [--products 2000] [--repeats 3]
+
+Two measurements:
+
+    per stage     an empty `with stage(...)` a million times, with profiling
+                  off (the shared no-op) and on (timers, RSS reads, records)
+    full build    generate_webapp.py --force on bench_dataset.py's synthetic
+                  CSVs, in a fresh interpreter per run, with PROFILE_STAGES
+                  unset, =1 and =tracemalloc; the site files must come out
+                  byte-identical
+
+Reports the best wall time of each and the overhead against profiling off.
+"""
+
+import argparse
+import filecmp
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+from bench_dataset import make_csvs  # noqa: E402
+
+MODES = {"off": None, "on": "1", "tracemalloc": "tracemalloc"}
+STAGE_LOOP = """
+import sys, time
+sys.path.insert(0, {webapp!r})
+from profiling import stage
+start = time.perf_counter()
+for _ in range({n}):
+    with stage("bench"):
+        pass
+print((time.perf_counter() - start) / {n} * 1e9)
+"""
+
+
+def env_for(mode, report=None):
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PROFILE_")}
+    if MODES[mode] is not None:
+        env["PROFILE_STAGES"] = MODES[mode]
+        env["PROFILE_REPORT"] = report or os.devnull
+    return env
+
+
+def per_stage_ns(mode, n=1_000_000):
+    script = STAGE_LOOP.format(webapp=os.path.join(ROOT, "webapp"), n=n)
+    out = subprocess.run([sys.executable, "-c", script], env=env_for(mode), capture_output=True, text=True,
+                         check=True)
+    return float(out.stdout.split()[0])
+
+
+def build(data_dir, out_dir, mode, report=None):
+    cmd = [sys.executable, os.path.join(ROOT, "webapp", "generate_webapp.py"), "--force", "--data-dir", data_dir,
+           "--output-dir", out_dir, "--cache-dir", out_dir + "-cache"]
+    start = time.perf_counter()
+    subprocess.run(cmd, env=env_for(mode, report), capture_output=True, text=True, check=True)
+    return time.perf_counter() - start
+
+
+def same_tree(a, b):
+    cmp = filecmp.dircmp(a, b)
+    if cmp.left_only or cmp.right_only or cmp.diff_files or cmp.funny_files:
+        return False
+    return all(same_tree(os.path.join(a, d), os.path.join(b, d)) for d in cmp.common_dirs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--reviews", type=int, default=200_000)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print("per stage (empty body)")
+    for mode in ("off", "on"):
+        print(f"  {mode:<12} {per_stage_ns(mode):>9,.0f} ns")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, "data")
+        os.makedirs(data_dir)
+        make_csvs(data_dir, args.reviews, args.products)
+        print(f"\ngenerate_webapp.py --force, {args.reviews:,} reviews (best of {args.repeats})")
+        print(f"  {'PROFILE_STAGES':<14} {'time':>8} {'overhead':>9}  output")
+        base = None
+        for mode in MODES:
+            out_dir = os.path.join(tmp, f"out-{mode}")
+            report = os.path.join(tmp, f"report-{mode}.json")
+            seconds = min(build(data_dir, out_dir, mode, report) for _ in range(args.repeats))
+            base = base or seconds
+            same = "identical" if mode == "off" or same_tree(os.path.join(tmp, "out-off"), out_dir) else "DIFFERS"
+            print(f"  {mode:<14} {seconds:>7.2f}s {seconds / base - 1:>+8.1%}  {same}")
+
+
+if __name__ == "__main__":
+    main()
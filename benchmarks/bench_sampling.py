@@ -0,0 +1,107 @@
+"""
+bench_sampling.py — Explorer sample stage: per-group loop vs vectorized stratified sample
+
+Usage:
+    python benchmarks/bench_sampling.py [--sizes 100000 1000000] [--per-label 500] [--chunksize 200000]
+
+Times, on synthetic review tables, the old generate_webapp.py loop (per
+cluster and label: uppercase + mask, DataFrame.sample, iterrows into
+dicts) against sampling.stratified_sample, and ReservoirSampler fed the
+same table in chunks. Checks that the chunked sample equals the in-memory
+one and reports how many rows the reservoir held at most.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp"))
+from sampling import ReservoirSampler, stratified_sample  # noqa: E402
+
+LABELS = np.array(["Positive", "Neutral", "Negative"])
+CLUSTERS = np.array(["Fire Tablets", "Batteries & Household", "E-Readers",
+                     "Smart Speakers", "Accessories", "Media & Home"])
+WORDS = np.array("good great battery tablet screen bad broke slow love kids price charge works fine".split())
+
+
+def make_reviews(n_reviews, seed=42):
+    rng = np.random.default_rng(seed)
+    product = rng.integers(0, max(1, n_reviews // 400), n_reviews)
+    lengths = rng.integers(0, 40, n_reviews)
+    words = rng.choice(WORDS, size=lengths.sum())
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    return pd.DataFrame({
+        "name": [f"Product {i}" for i in product],
+        "cluster_name": CLUSTERS[product % len(CLUSTERS)],
+        "reviews.rating": rng.choice([1, 2, 3, 4, 5], size=n_reviews, p=[.03, .03, .04, .2, .7]),
+        "reviews.text": [" ".join(words[a:b]) for a, b in zip(bounds[:-1], bounds[1:])],
+        "predicted_label": rng.choice(LABELS, size=n_reviews, p=[.9, .04, .06]),
+        "predicted_score": rng.random(n_reviews),
+    })
+
+
+def legacy_sample(df, sentiment_col, cluster_col, per_label):
+    """The old loop from generate_webapp.py."""
+    samples = {}
+    for cluster_name, group in df.groupby(cluster_col):
+        records = samples[str(cluster_name)] = []
+        for label in ["POSITIVE", "NEGATIVE", "NEUTRAL"]:
+            label_df = group[group[sentiment_col].str.upper() == label]
+            if len(label_df) == 0:
+                continue
+            sampled = label_df.sample(n=min(per_label, len(label_df)), random_state=42)
+            for _, row in sampled.iterrows():
+                text = str(row.get("reviews.text", ""))
+                if len(text.strip()) < 5:
+                    continue
+                records.append({
+                    "text": text[:500],
+                    "rating": int(row.get("reviews.rating", 0)),
+                    "sentiment": label,
+                    "product": str(row.get("name", "Unknown"))[:80],
+                    "cluster": str(cluster_name),
+                    "confidence": round(float(row.get("predicted_score", 0.0)), 3),
+                })
+    return samples
+
+
+def chunked_sample(df, per_label, chunksize):
+    sampler = ReservoirSampler("predicted_label", "cluster_name", per_label)
+    peak = 0
+    for start in range(0, len(df), chunksize):
+        sampler.update(df.iloc[start:start + chunksize])
+        peak = max(peak, len(sampler._kept))
+    return sampler.result(), peak
+
+
+def timed(fn, *args):
+    t = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--per-label", type=int, default=500)
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{'reviews':>10} {'loop':>9} {'vectorized':>11} {'speedup':>8} {'chunked':>9} "
+          f"{'same':>5} {'held':>7} {'sampled':>8}")
+    for n in args.sizes:
+        df = make_reviews(n)
+        _, t_loop = timed(legacy_sample, df, "predicted_label", "cluster_name", args.per_label)
+        fast, t_fast = timed(stratified_sample, df, "predicted_label", "cluster_name", args.per_label)
+        (chunked, peak), t_chunked = timed(chunked_sample, df, args.per_label, args.chunksize)
+        n_sampled = sum(map(len, fast.values()))
+        print(f"{n:>10,} {t_loop:>8.2f}s {t_fast:>10.2f}s {t_loop / t_fast:>7.1f}x {t_chunked:>8.2f}s "
+              f"{str(chunked == fast):>5} {peak:>7,} {n_sampled:>8,}")
+
+
+if __name__ == "__main__":
+    main()
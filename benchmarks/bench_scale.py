@@ -0,0 +1,294 @@
+"""
+bench_scale.py — The data pipeline at 10k / 1M / 10M synthetic reviews, with stored results to compare against
+
+Usage:
+    python benchmarks/bench_scale.py [--scales 10k 1m 10m] [--tasks webapp briefs complaints markdown]
+                                     [--corpus-dir /tmp/review-corpora] [--repeats 1] [--seed 0]
+                                     [--baseline benchmarks/results/scale-....json] [--tolerance 0.25]
+
+For each scale, writes (once, then reuses) a pipeline/synthetic.py corpus
+in --corpus-dir/<scale>/ and runs each task in a fresh interpreter:
+
+    webapp       webapp/generate_webapp.py --force on the corpus CSVs
+                 (--chunksize 500000 above 2M rows), with PROFILE_STAGES=1
+                 so the result keeps its per-stage times
+    briefs       pipeline/briefs.py build_briefs() on the loaded reviews
+    complaints   pipeline/complaints.py top_complaints() on the loaded reviews
+    markdown     parse_brief() + app_gradio.build_full_markdown() over the
+                 corpus' briefs, cold parse cache, >= 20,000 calls
+
+Loading the CSVs and importing are not timed; peak RSS (Linux) is the
+process high-water mark above its size when the timed part starts, except
+for webapp, which is timed whole. The best of --repeats is kept.
+
+Results go to benchmarks/results/scale-<time>.json with the commit and
+machine, and are compared with --baseline (default: the newest earlier
+file): a task more than --tolerance slower (if it took >= 0.2s) or larger
+(if it used >= 20MB) is flagged, and the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pipeline"))
+from synthetic import SCALES, read_meta, write_corpus  # noqa: E402
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+TASKS = ["webapp", "briefs", "complaints", "markdown"]
+STREAM_ABOVE = 2_000_000  # rows; generate_webapp.py streams larger corpora
+CHUNKSIZE = 500_000
+MARKDOWN_CALLS = 20_000
+MIN_SECONDS, MIN_MB = 0.2, 20.0  # below these, differences are noise
+SUMMARY = "A synthetic summary paragraph standing in for the model's output. " * 3
+
+PRELUDE = """
+import gc, io, json, os, sys, time, contextlib
+ROOT = {root!r}
+D = {data_dir!r}
+sys.path.insert(0, os.path.join(ROOT, "pipeline"))
+sys.path.insert(0, os.path.join(ROOT, "webapp"))
+
+def status(key):
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith(key))
+    except OSError:
+        return None
+
+def reset_peak():
+    gc.collect()
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+    return status("VmRSS")
+
+extra = {{}}
+"""
+# Each task: setup (not timed), then the timed code
+SETUP = {
+    "webapp": """
+import runpy
+sys.argv = ["generate_webapp.py", "--force", "--data-dir", D, "--output-dir", OUT, "--cache-dir", OUT + "-cache"]
+if ROWS > STREAM_ABOVE:
+    sys.argv += ["--chunksize", str(CHUNKSIZE)]
+""",
+    "briefs": """
+import pandas as pd
+import briefs
+from dataset import read_csv_reviews
+df = read_csv_reviews(D, ["cluster_name", "name", "reviews.rating", "reviews.text", "predicted_label",
+                          "score_negative", "score_positive"])
+""",
+    "complaints": """
+import complaints
+from dataset import read_csv_reviews
+df = read_csv_reviews(D, ["cluster_name", "name", "reviews.text", "predicted_label"])
+""",
+    "markdown": """
+import pandas as pd
+try:
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app_gradio
+except ImportError as e:
+    print(json.dumps({"skipped": str(e)}))
+    raise SystemExit(0)
+from brief_parser import _parse_cached, parse_brief
+if not os.path.exists(BRIEFS):
+    import briefs
+    from dataset import read_csv_reviews
+    briefs.build_briefs(read_csv_reviews(D, ["cluster_name", "name", "reviews.rating", "reviews.text",
+                                            "predicted_label", "score_negative", "score_positive"])).to_csv(BRIEFS, index=False)
+texts = pd.read_csv(BRIEFS)["brief"].astype(str).tolist()
+passes = max(1, CALLS // len(texts))
+""",
+}
+TIMED = {
+    "webapp": """
+with contextlib.redirect_stdout(io.StringIO()):
+    runpy.run_path(os.path.join(ROOT, "webapp", "generate_webapp.py"), run_name="__main__")
+""",
+    "briefs": """
+out = briefs.build_briefs(df)
+""",
+    "complaints": """
+out = complaints.top_complaints(df)
+""",
+    "markdown": """
+for _ in range(passes):
+    _parse_cached.cache_clear()
+    for b in texts:
+        parse_brief(b)
+        app_gradio.build_full_markdown(b, SUMMARY)
+""",
+}
+AFTER = {
+    "webapp": "",
+    "briefs": """
+out.to_csv(BRIEFS, index=False)
+extra["briefs"] = len(out)
+""",
+    "complaints": """
+extra["products"] = len(out)
+""",
+    "markdown": """
+extra["calls"] = passes * len(texts)
+extra["us_per_call"] = round(seconds / (passes * len(texts)) * 1e6, 2)
+""",
+}
+TEMPLATE = """{prelude}
+{setup}
+base = reset_peak()
+start = time.perf_counter()
+{timed}
+seconds = time.perf_counter() - start
+peak = status("VmHWM")
+{after}
+print(json.dumps({{"seconds": seconds, "peak_mb": (peak - base) / 1024 if peak and base else None, **extra}}))
+"""
+
+
+def corpus(corpus_dir, scale, seed):
+    rows, products, clusters = SCALES[scale]
+    data_dir = Path(corpus_dir) / scale
+    meta = read_meta(data_dir)
+    if meta is None or (meta["rows"], meta["products"], meta["seed"]) != (rows, products, seed):
+        print(f"  writing the {scale} corpus to {data_dir}/ ...")
+        meta = write_corpus(data_dir, rows, products, clusters, seed, verbose=False)
+    return data_dir, meta
+
+
+def run_task(task, data_dir, rows, work_dir):
+    out_dir = os.path.join(work_dir, "site")
+    report = os.path.join(work_dir, "profile.json")
+    script = TEMPLATE.format(
+        prelude=PRELUDE.format(root=str(ROOT), data_dir=str(data_dir)),
+        setup=f"OUT = {out_dir!r}\nROWS = {rows}\nSTREAM_ABOVE = {STREAM_ABOVE}\nCHUNKSIZE = {CHUNKSIZE}\n"
+              f"BRIEFS = {str(Path(data_dir) / 'category_briefs.csv')!r}\nCALLS = {MARKDOWN_CALLS}\n"
+              f"SUMMARY = {SUMMARY!r}\n" + SETUP[task],
+        timed=TIMED[task], after=AFTER[task])
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PROFILE_")}
+    if task == "webapp":
+        env.update(PROFILE_STAGES="1", PROFILE_REPORT=report)
+    out = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"{task} failed:\n{out.stderr[-2000:]}")
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    if task == "webapp" and os.path.exists(report):
+        totals = json.loads(Path(report).read_text(encoding="utf-8"))["totals"]
+        result["stages"] = {name: round(t["seconds"], 3) for name, t in totals.items()}
+    return result
+
+
+def best_of(runs):
+    best = dict(min(runs, key=lambda r: r.get("seconds", 0.0)))
+    peaks = [r["peak_mb"] for r in runs if r.get("peak_mb") is not None]
+    if peaks:
+        best["peak_mb"] = round(max(peaks), 1)
+    if "seconds" in best:
+        best["seconds"] = round(best["seconds"], 3)
+    return best
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def latest_results(results_dir):
+    files = sorted(Path(results_dir).glob("scale-*.json"))
+    return files[-1] if files else None
+
+
+def compare(current, baseline, tolerance):
+    """Print current vs baseline per (scale, task); returns the regressions."""
+    regressions = []
+    print(f"\n{'scale':<6} {'task':<11} {'seconds':>9} {'was':>9} {'change':>8} {'peak MB':>9} {'was':>9} {'change':>8}")
+    for scale, res in current["results"].items():
+        for task, now in res["tasks"].items():
+            was = baseline["results"].get(scale, {}).get("tasks", {}).get(task)
+            if not was or "seconds" not in now or "seconds" not in was:
+                continue
+            flags = []
+            dt = now["seconds"] / was["seconds"] - 1 if was["seconds"] else 0.0
+            if was["seconds"] >= MIN_SECONDS and dt > tolerance:
+                flags.append("slower")
+            dm = None
+            if now.get("peak_mb") is not None and was.get("peak_mb"):
+                dm = now["peak_mb"] / was["peak_mb"] - 1
+                if was["peak_mb"] >= MIN_MB and dm > tolerance:
+                    flags.append("more memory")
+            if flags:
+                regressions.append((scale, task, flags))
+            dm_text = f"{dm:>+8.0%}" if dm is not None else f"{'-':>8}"
+            print(f"{scale:<6} {task:<11} {now['seconds']:>8.2f}s {was['seconds']:>8.2f}s {dt:>+8.0%} "
+                  f"{now.get('peak_mb') or 0:>9,.0f} {was.get('peak_mb') or 0:>9,.0f} {dm_text}"
+                  + (f"  <- {', '.join(flags)}" if flags else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=list(SCALES))
+    parser.add_argument("--tasks", nargs="+", choices=TASKS, default=TASKS)
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "review-corpora"))
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results-dir", default=str(RESULTS_DIR))
+    parser.add_argument("--baseline", default=None, help="results file to compare with (default: the newest)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown / growth (0.25: 25%%)")
+    args = parser.parse_args()
+
+    baseline_path = args.baseline or latest_results(args.results_dir)
+    current = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": git_commit(),
+               "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+               "results": {}}
+
+    for scale in args.scales:
+        print(f"\n{scale}:")
+        data_dir, meta = corpus(args.corpus_dir, scale, args.seed)
+        print(f"  {meta['rows']:,} reviews, {meta['reviewed_products']:,} products, {meta['clusters']} clusters, "
+              f"{meta['sentiment_share']['Positive']:.1%} positive, top product {meta['top_product_share']:.1%}")
+        res = current["results"][scale] = {"corpus": meta, "tasks": {}}
+        for task in args.tasks:
+            with tempfile.TemporaryDirectory() as work_dir:
+                runs = [run_task(task, data_dir, meta["rows"], work_dir) for _ in range(args.repeats)]
+            result = res["tasks"][task] = best_of(runs)
+            if "skipped" in result:
+                print(f"  {task:<11} skipped: {result['skipped']}")
+                continue
+            peak = f"{result['peak_mb']:>8,.0f}MB" if result.get("peak_mb") is not None else f"{'-':>10}"
+            detail = {k: v for k, v in result.items() if k not in ("seconds", "peak_mb", "stages")}
+            print(f"  {task:<11} {result['seconds']:>8.2f}s {peak}  {json.dumps(detail) if detail else ''}")
+            if "stages" in result:
+                slowest = sorted(result["stages"].items(), key=lambda kv: -kv[1])[:4]
+                print("  " + " " * 11 + ", ".join(f"{name} {s:.2f}s" for name, s in slowest))
+
+    Path(args.results_dir).mkdir(parents=True, exist_ok=True)
+    path = Path(args.results_dir) / f"scale-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.write_text(json.dumps(current, indent=2), encoding="utf-8")
+    print(f"\nSaved {path}")
+
+    if baseline_path:
+        baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+        print(f"Compared with {baseline_path} (commit {baseline.get('commit')}, {baseline.get('created')})")
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+bench_search_index.py — Build cost and size of the explorer's inverted search index
+
+Usage:
+    python benchmarks/bench_search_index.py [--docs 1000000] [--vocab 40000] [--compress]
+
+Generates a synthetic review corpus (Zipf-distributed vocabulary, 5-80 words
+per review, common English filler words mixed in), builds the index with
+webapp/search_index.py and reports, per phase, time and size: postings
+build, JSON encoding, and (with --compress) the .gz/.br siblings the
+generator writes. Then lists, for a few queries, the shards and bytes the
+browser would fetch and the ids it would decode.
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "webapp"))
+
+from publish import brotli, encode_json  # noqa: E402
+from search_index import (MIN_PREFIX, STOPWORDS, build_postings, search_files,  # noqa: E402
+                          tokenize)
+
+SYLLABLES = ["ba", "ter", "ry", "ta", "blet", "kin", "dle", "scre", "en", "char", "ge", "so",
+             "und", "qua", "li", "ty", "pri", "ce", "wo", "rk", "lo", "ve", "ea", "sy", "fi",
+             "re", "ho", "me", "al", "ex", "pro", "duct", "ret", "urn", "sl", "ow", "fa", "st"]
+QUERIES = ["ba", "bat", "ter ba", "rek not", "kindle screen"]
+
+
+def make_corpus(n_docs, vocab_size, seed=0):
+    rng = np.random.default_rng(seed)
+    n_syll = rng.integers(1, 4, vocab_size)
+    parts = rng.choice(SYLLABLES, size=n_syll.sum())
+    bounds = np.concatenate([[0], np.cumsum(n_syll)])
+    vocab = np.array(["".join(parts[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+                     + STOPWORDS + ["not", "great", "kindle", "screen"], dtype=object)
+    weights = rng.permutation(1.0 / np.arange(1, len(vocab) + 1) ** 1.1)
+    # Filler words make up about 40% of the tokens, as in English text
+    n_filler = len(STOPWORDS) + 4
+    weights[-n_filler:] = weights[:-n_filler].sum() * 0.4 / 0.6 / n_filler
+    lengths = rng.integers(5, 80, n_docs)
+    words = rng.choice(vocab, size=lengths.sum(), p=weights / weights.sum())
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    return [" ".join(words[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def shards_for(meta, query):
+    """Shards a query loads: exact terms, plus the prefix range of the last word."""
+    words = tokenize(query)
+    hits = set()
+    for i, w in enumerate(words):
+        prefix = i == len(words) - 1 and not query.endswith(" ") and len(w) >= MIN_PREFIX
+        hi = w + "\uffff" if prefix else w
+        hits |= {s["id"] for s in meta["shards"] if s["first"] <= hi and s["last"] >= w}
+    return sorted(hits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--vocab", type=int, default=40_000)
+    parser.add_argument("--compress", action="store_true",
+                        help="also time gzip -9 and brotli -q11 on every file (slow)")
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    texts = make_corpus(args.docs, args.vocab)
+    n_chars = sum(map(len, texts))
+    print(f"Corpus: {len(texts):,} reviews, {n_chars / 1e6:,.0f}M characters "
+          f"({time.perf_counter() - t:.1f}s to generate)")
+
+    t = time.perf_counter()
+    terms, counts, docs = postings = build_postings(texts)
+    t_build = time.perf_counter() - t
+    t = time.perf_counter()
+    files = search_files(postings, len(texts))
+    t_files = time.perf_counter() - t
+    t = time.perf_counter()
+    encoded = {rel: encode_json(obj) for rel, obj in files.items()}
+    t_encode = time.perf_counter() - t
+
+    meta = files["search/shards.json"]
+    raw = sum(map(len, encoded.values()))
+    print(f"\n{'phase':<24} {'time':>8}")
+    print(f"{'tokenize + postings':<24} {t_build:>7.1f}s   {len(terms):,} terms, {len(docs):,} postings")
+    print(f"{'delta encode + shard':<24} {t_files:>7.1f}s   {len(meta['shards']):,} shards")
+    print(f"{'JSON encode':<24} {t_encode:>7.1f}s   {raw / 1e6:,.1f}MB "
+          f"({raw / len(docs):.2f} bytes per posting)")
+
+    sizes = {"raw": {rel: len(b) for rel, b in encoded.items()}}
+    if args.compress:
+        t = time.perf_counter()
+        sizes["gzip"] = {rel: len(gzip.compress(b, 9, mtime=0)) for rel, b in encoded.items()}
+        print(f"{'gzip -9':<24} {time.perf_counter() - t:>7.1f}s   {sum(sizes['gzip'].values()) / 1e6:,.1f}MB")
+        if brotli is not None:
+            t = time.perf_counter()
+            sizes["brotli"] = {rel: len(brotli.compress(b, quality=11)) for rel, b in encoded.items()}
+            print(f"{'brotli -q11':<24} {time.perf_counter() - t:>7.1f}s   "
+                  f"{sum(sizes['brotli'].values()) / 1e6:,.1f}MB")
+
+    encoding = list(sizes)[-1]
+    shard_sizes = sorted(sizes[encoding][f"search/{s['id']}.json"] for s in meta["shards"])
+    print(f"\nShard size ({encoding}): median {shard_sizes[len(shard_sizes) // 2] / 1024:,.0f}KB, "
+          f"max {shard_sizes[-1] / 1024:,.0f}KB; shards.json {sizes[encoding]['search/shards.json'] / 1024:,.0f}KB")
+
+    print(f"\n{'query':<16} {'shards':>7} {'bytes (' + encoding + ')':>16} {'ids decoded':>12}")
+    by_id = {s["id"]: s for s in meta["shards"]}
+    for query in QUERIES:
+        hit = shards_for(meta, query)
+        n_bytes = sizes[encoding]["search/shards.json"] + sum(sizes[encoding][f"search/{i}.json"] for i in hit)
+        print(f"{query:<16} {len(hit):>7} {n_bytes / 1024:>14,.0f}KB {sum(by_id[i]['postings'] for i in hit):>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+bench_startup.py — Cold-start timings for the Gradio app
+
+Usage:
+    python benchmarks/bench_startup.py [--repeats 3] [--with-model]
+
+Each measurement runs in a fresh interpreter:
+    brief_parser  import of the parsing helpers alone
+    app_gradio    import of the app, i.e. time until the UI is built and
+                  demo.launch() could be called
+    torch+transformers  what every import used to pay before lazy loading
+    model load    summarizer.get_model() (only with --with-model)
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+WEBAPP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "webapp")
+
+SNIPPETS = {
+    "brief_parser": "import brief_parser",
+    "app_gradio (UI ready)": "import app_gradio",
+    "torch+transformers": "import torch, transformers",
+}
+MODEL_SNIPPET = "import summarizer; summarizer.get_model()"
+
+TEMPLATE = """
+import sys, time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start, "torch" in sys.modules)
+"""
+
+
+def measure(code):
+    out = subprocess.run(
+        [sys.executable, "-c", TEMPLATE.format(code=code)],
+        cwd=WEBAPP, capture_output=True, text=True, check=True,
+        env={**os.environ, "GEN_WARMUP": "0"},
+    ).stdout.strip().splitlines()[-1]
+    seconds, torch_loaded = out.split()
+    return float(seconds), torch_loaded == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--with-model", action="store_true", help="also time the model load")
+    args = parser.parse_args()
+
+    snippets = dict(SNIPPETS)
+    if args.with_model:
+        snippets["model load"] = MODEL_SNIPPET
+
+    print(f"{'step':<24} {'best (s)':>9} {'mean (s)':>9} {'torch imported':>15}")
+    for name, code in snippets.items():
+        runs = [measure(code) for _ in range(args.repeats)]
+        times = [t for t, _ in runs]
+        print(f"{name:<24} {min(times):>9.3f} {sum(times) / len(times):>9.3f} {str(runs[0][1]):>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+bench_streaming.py — Time-to-first-content of streamed vs full-response generation
+
+Usage:
+    python benchmarks/bench_streaming.py [--repeats 3] [--profile cached-sampling]
+
+For every brief in data/category_blog_posts.csv, measures what the user
+sees after clicking "Generate Summary":
+    full response     old handler: nothing until the whole article is built
+    first content     streamed handler: Top Picks / Avoid sections, no model call
+    first summary     streamed handler: first decoded words of the summary
+    stream complete   streamed handler: last update
+The summary cache is bypassed so every run reaches the model.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "webapp"))
+os.environ.setdefault("GEN_WARMUP", "0")
+import summarizer  # noqa: E402
+from app_gradio import render_markdown, stream_full_markdown  # noqa: E402
+from brief_parser import parse_brief  # noqa: E402
+
+
+def full_response(brief, profile):
+    start = time.perf_counter()
+    summary = summarizer.generate_summaries([brief], batch_size=1, profile=profile, use_summary_cache=False)[0]
+    render_markdown(parse_brief(brief), summary)
+    return time.perf_counter() - start
+
+
+def streamed(brief, profile):
+    start = time.perf_counter()
+    stamps = []
+    for _ in stream_full_markdown(brief, profile=profile, use_summary_cache=False):
+        stamps.append(time.perf_counter() - start)
+    first_summary = stamps[1] if len(stamps) > 1 else stamps[-1]
+    return stamps[0], first_summary, stamps[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--profile", default=summarizer.DEFAULT_PROFILE, choices=list(summarizer.DECODING_PROFILES))
+    parser.add_argument("--csv", default=os.path.join(ROOT, "data", "category_blog_posts.csv"))
+    args = parser.parse_args()
+
+    briefs = pd.read_csv(args.csv)["brief"].astype(str).tolist()
+    summarizer.get_model()
+    full_response(briefs[0], args.profile)  # warm-up
+
+    full, first, first_summary, complete = [], [], [], []
+    for _ in range(args.repeats):
+        for brief in briefs:
+            full.append(full_response(brief, args.profile))
+            a, b, c = streamed(brief, args.profile)
+            first.append(a)
+            first_summary.append(b)
+            complete.append(c)
+
+    print(f"device={summarizer.runtime_device()}  backend={summarizer.GEN_BACKEND}  "
+          f"profile={args.profile}  briefs={len(briefs)}  repeats={args.repeats}")
+    print(f"{'measure':<34} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+    rows = {
+        "full response (old)": full,
+        "streamed: first content": first,
+        "streamed: first summary words": first_summary,
+        "streamed: complete": complete,
+    }
+    for name, values in rows.items():
+        p50, p95 = np.percentile(values, [50, 95]) * 1000
+        print(f"{name:<34} {p50:>9.2f} {p95:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+briefs.py — Category briefs for the summarizer, built in one pass
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Usage:
+    python pipeline/briefs.py --clusters data/data_with_clusters.csv \\
+        --predictions data/data_with_predictions_v2.csv --output data/category_briefs.csv [--json out.json]
+
+The brief logic of 04_summarization_local.ipynb as a module:
+    product_stats   one groupby over (category, product)
+    top 3           rank_score = avg_rating * log1p(review_count), best 3 per category
+    worst           lowest avg_rating among products with >= 20 reviews
+    complaints      complaints.py, every product in one sparse pass
+Categories are filled from the ranked frames in a single walk, with no
+per-category filtering, and rendered in the notebook's brief format. The
+CSV output has the category and brief columns app_gradio.py reads.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from complaints import CAT_COL, PROD_COL, TEXT_COL, top_complaints
+from dataset import join_predictions
+
+MIN_REVIEWS = 20  # worst product needs at least this many reviews
+TOP_COMPLAINTS = 5
+WORST_COMPLAINTS = 6
+
+
+def merge_predictions(clusters_df, preds_df):
+    """Join the classifier output onto the clustered reviews by row position, as the notebook's load_reviews() does."""
+    df = join_predictions(clusters_df.copy(), preds_df)
+    df["predicted_label"] = df["predicted_label"].str.upper().str.strip()
+    return df
+
+
+def label_column(df):
+    """Model predictions when present, else the rating-derived sentiment."""
+    return "predicted_label" if "predicted_label" in df.columns else "sentiment"
+
+
+def product_stats(df):
+    """Per (category, product) counts, ratings and ranking score."""
+    aggs = dict(review_count=(TEXT_COL, "count"), avg_rating=("reviews.rating", "mean"))
+    if "score_negative" in df.columns:
+        aggs.update(neg_rate=("score_negative", "mean"), pos_rate=("score_positive", "mean"))
+    stats = df.groupby([CAT_COL, PROD_COL]).agg(**aggs).reset_index()
+    # ranking score: rating plus confidence, weighted by volume
+    stats["rank_score"] = stats["avg_rating"] * np.log1p(stats["review_count"])
+    return stats
+
+
+def rank_products(stats, min_reviews=MIN_REVIEWS):
+    """(top3, worst) frames: 3 best-ranked and 1 lowest-rated product per category."""
+    top3 = (
+        stats.sort_values([CAT_COL, "rank_score"], ascending=[True, False])
+        .groupby(CAT_COL).head(3)
+    )
+    worst = (
+        stats[stats["review_count"] >= min_reviews]
+        .sort_values([CAT_COL, "avg_rating"], ascending=[True, True])
+        .groupby(CAT_COL).head(1)
+    )
+    return top3, worst
+
+
+def build_structured(df, min_reviews=MIN_REVIEWS):
+    """{category: {"category", "top3": [...], "worst": {...} or None}} for every category."""
+    label_col = label_column(df)
+    stats = product_stats(df)
+    top3, worst = rank_products(stats, min_reviews)
+    complaints = top_complaints(df, topn=max(TOP_COMPLAINTS, WORST_COMPLAINTS), label_col=label_col)
+
+    categories = sorted(df[CAT_COL].dropna().unique().tolist())
+    out = {cat: {"category": cat, "top3": [], "worst": None} for cat in categories}
+    for cat, name, rating, reviews in top3[[CAT_COL, PROD_COL, "avg_rating", "review_count"]].itertuples(index=False):
+        out[cat]["top3"].append({
+            "name": name, "rating": rating, "reviews": int(reviews),
+            "complaints": complaints.get((cat, name), [])[:TOP_COMPLAINTS],
+        })
+    for cat, name, rating, reviews in worst[[CAT_COL, PROD_COL, "avg_rating", "review_count"]].itertuples(index=False):
+        out[cat]["worst"] = {
+            "name": name, "rating": rating, "reviews": int(reviews),
+            "complaints": complaints.get((cat, name), [])[:WORST_COMPLAINTS],
+        }
+    return out
+
+
+def render_brief(entry):
+    """The notebook's brief text for one structured category."""
+    lines = [f"CATEGORY: {entry['category']}", "", "TOP 3 PRODUCTS:"]
+    for i, p in enumerate(entry["top3"], 1):
+        lines.append(f"{i}) {p['name']} | rating={p['rating']:.2f} | reviews={p['reviews']}")
+        if p["complaints"]:
+            lines.append("   complaints: " + "; ".join(p["complaints"]))
+        else:
+            lines.append("   complaints: (not enough negative reviews)")
+
+    w = entry["worst"]
+    if w is not None:
+        lines.append("")
+        lines.append(f"WORST PRODUCT: {w['name']} | rating={w['rating']:.2f} | reviews={w['reviews']}")
+        lines.append("avoid because: " + ("; ".join(w["complaints"]) if w["complaints"] else "low ratings / frequent negatives"))
+
+    return "\n".join(lines)
+
+
+def briefs_frame(structured):
+    """DataFrame with category and brief columns, one row per category."""
+    return pd.DataFrame({
+        "category": list(structured),
+        "brief": [render_brief(e) for e in structured.values()],
+    })
+
+
+def build_briefs(df, min_reviews=MIN_REVIEWS):
+    return briefs_frame(build_structured(df, min_reviews))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build category briefs from clustered, scored reviews")
+    parser.add_argument("--clusters", required=True, help="data_with_clusters.csv")
+    parser.add_argument("--predictions", default=None, help="data_with_predictions_v2.csv (optional)")
+    parser.add_argument("--output", required=True, help="CSV with category and brief columns")
+    parser.add_argument("--json", default=None, help="also write the structured briefs here")
+    parser.add_argument("--min-reviews", type=int, default=MIN_REVIEWS)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.clusters)
+    if args.predictions:
+        df = merge_predictions(df, pd.read_csv(args.predictions))
+    print(f"Reviews: {len(df):,}, categories: {df[CAT_COL].nunique():,}")
+
+    structured = build_structured(df, args.min_reviews)
+    out = briefs_frame(structured)
+    out.to_csv(args.output, index=False)
+    print(f"Saved {len(out):,} briefs to {args.output}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(structured, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Saved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
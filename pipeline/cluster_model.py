@@ -0,0 +1,339 @@
+"""
+cluster_model.py — Saved product clustering: assign new products without refitting
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Usage:
+    python pipeline/cluster_model.py info   [--model data/cluster_model.joblib]
+    python pipeline/cluster_model.py assign --input new_products.csv [--output assigned.csv] [--update]
+    python pipeline/cluster_model.py refit  --input products.csv
+
+03_clustering.ipynb fits TF-IDF + KMeans on every product and hand-names
+the clusters. It finishes by saving a ClusterModel to data/cluster_model.joblib:
+the fitted vectorizer, the centroids, the cluster id -> name map, the
+product -> cluster labels of the fit and an outlier distance threshold.
+
+    assign    new products (name + categories) get the nearest centroid, as
+              one sparse transform (in parallel chunks on several cores) and
+              one chunked distance pass; products the model already knows keep
+              their label. A distance above the threshold, or no word in the
+              vocabulary at all, flags the product as an outlier: no cluster
+              fits it well, refit when they pile up
+    update    assign, then absorb the non-outliers: their labels are kept
+              and each centroid moves to the running mean of its products
+              (MiniBatchKMeans' per-center 1/count step). Cluster ids never
+              change, so the names stay valid
+    refit     full KMeans on the given products, with the new clusters
+              renumbered to the old ids they share most products with
+
+The input CSV needs the raw name and categories columns; review-level rows
+are reduced to one per product.
+"""
+
+import argparse
+import time
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
+
+import joblib
+from joblib import Parallel, delayed, effective_n_jobs
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import linear_sum_assignment
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import pairwise_distances_argmin_min
+from sklearn.preprocessing import normalize
+
+from clustering import RANDOM_STATE, fit_kmeans
+
+MODEL_PATH = Path(__file__).resolve().parent.parent / "data" / "cluster_model.joblib"
+# Products per parallel transform chunk; smaller batches are vectorized in process
+PARALLEL_CHUNK = 20_000
+# The training distance quantile above which a product counts as an outlier
+OUTLIER_QUANTILE = 0.99
+# Labels in the categories column that say nothing about the product
+NOISE_LABELS = ["robot check", "frys", "top rated", "featured brands",
+                "walmart for business", "amazon", "see more", "college",
+                "back to college", "electronics deals", "digital device 3"]
+
+
+@lru_cache(maxsize=65536)
+def _is_noise(label):
+    return any(n in label for n in NOISE_LABELS)
+
+
+def clean_categories(cat_string):
+    """Clean and deduplicate category labels."""
+    cats = [c.strip().lower() for c in str(cat_string).split(',')]
+    # Remove generic/noisy labels (the same few hundred labels recur, so each is checked once)
+    cats = [c for c in cats if not _is_noise(c)]
+    return ' '.join(dict.fromkeys(cats))  # deduplicate, first occurrence order
+
+
+def cluster_text(names, categories):
+    """Lowercased name + cleaned categories, per product; each distinct categories string is cleaned once."""
+    categories = pd.Series(categories, dtype=object).astype(str).reset_index(drop=True)
+    unique = categories.unique()
+    cleaned = categories.map(dict(zip(unique, map(clean_categories, unique))))
+    return pd.Series(names, dtype=object).astype(str).str.lower().reset_index(drop=True) + ' ' + cleaned
+
+
+def make_vectorizer():
+    """The notebook's TF-IDF settings."""
+    return TfidfVectorizer(max_features=200, stop_words='english', ngram_range=(1, 2), min_df=1)
+
+
+class ClusterModel:
+    """Fitted vectorizer + centroids + names; assigns and absorbs products by nearest centroid."""
+
+    def __init__(self, vectorizer, centers, cluster_names, known, counts, threshold, meta=None):
+        self.vectorizer = vectorizer
+        self.centers = np.asarray(centers, dtype=np.float64)
+        self.cluster_names = {int(k): v for k, v in cluster_names.items()}
+        self.known = dict(known)  # product name -> cluster id
+        self.counts = np.asarray(counts, dtype=np.float64)  # products behind each centroid
+        self.threshold = float(threshold)
+        self.meta = meta or {}
+
+    @classmethod
+    def from_fit(cls, vectorizer, kmeans, X, names, cluster_names, quantile=OUTLIER_QUANTILE):
+        """Wrap a fitted vectorizer and (MiniBatch)KMeans; X is the matrix it was fitted on, names its rows."""
+        labels = np.asarray(kmeans.labels_)
+        centers = kmeans.cluster_centers_
+        distance = np.sqrt(np.maximum(_sq_distance(X, centers, labels), 0))
+        return cls(
+            vectorizer, centers, cluster_names,
+            known=dict(zip(names, labels.tolist())),
+            counts=np.bincount(labels, minlength=len(centers)),
+            threshold=np.quantile(distance, quantile),
+            meta={"fitted_at": time.strftime("%Y-%m-%d %H:%M:%S"), "fitted_products": len(labels),
+                  "updates": 0, "absorbed": 0},
+        )
+
+    @classmethod
+    def fit(cls, names, categories, k, cluster_names=None, random_state=RANDOM_STATE, n_init=20):
+        """TF-IDF + KMeans as 03_clustering.ipynb fits them."""
+        vectorizer = make_vectorizer()
+        X = vectorizer.fit_transform(cluster_text(names, categories))
+        kmeans = fit_kmeans(X, k, random_state=random_state, n_init=n_init)
+        names = [str(n) for n in names]
+        cluster_names = cluster_names or {c: f'Cluster {c}' for c in range(k)}
+        return cls.from_fit(vectorizer, kmeans, X, names, cluster_names)
+
+    # ---------------- Assignment ----------------
+    def transform(self, names, categories, n_jobs=-1):
+        """TF-IDF rows of the products; large batches are split into chunks vectorized in parallel."""
+        names = pd.Series(names, dtype=object).reset_index(drop=True)
+        categories = pd.Series(categories, dtype=object).reset_index(drop=True)
+        n_chunks = min(effective_n_jobs(n_jobs), -(-len(names) // PARALLEL_CHUNK))
+        if n_chunks <= 1:
+            return _vectorize(self.vectorizer, names, categories)
+        bounds = np.linspace(0, len(names), n_chunks + 1).astype(int)
+        parts = Parallel(n_jobs=n_chunks)(
+            delayed(_vectorize)(self.vectorizer, names[a:b], categories[a:b]) for a, b in zip(bounds, bounds[1:])
+        )
+        return sparse.vstack(parts, format="csr")
+
+    def assign(self, names, categories):
+        """One row per product: cluster, cluster_name, distance to that centroid, outlier, known."""
+        return self._assign(names, categories)[0]
+
+    def _assign(self, names, categories):
+        names = pd.Series(names, dtype=object).astype(str).reset_index(drop=True)
+        if len(names):
+            X = self.transform(names, categories)
+            nearest, distance = pairwise_distances_argmin_min(X, self.centers)
+        else:  # cluster_text cannot concatenate empty Series; same columns, no rows
+            X = sparse.csr_matrix((0, self.centers.shape[1]))
+            nearest, distance = np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Products from the fit (or absorbed since) keep their label
+        stored = names.map(self.known)
+        known = stored.notna().to_numpy()
+        cluster = np.where(known, stored.fillna(-1).to_numpy(dtype=np.int64), nearest)
+        if known.any():
+            distance = distance.copy()
+            distance[known] = np.sqrt(np.maximum(_sq_distance(X[known], self.centers, cluster[known]), 0))
+        # No term in the vocabulary: the row is all zeros, and its distance is just
+        # the nearest centroid's norm, which can sit under the threshold
+        empty = X.getnnz(axis=1) == 0
+        assigned = pd.DataFrame({
+            "name": names,
+            "cluster": cluster,
+            "cluster_name": pd.Series(cluster).map(self.cluster_names),
+            "distance": distance,
+            "outlier": ~known & ((distance > self.threshold) | empty),
+            "known": known,
+        })
+        return assigned, X
+
+    def update(self, names, categories):
+        """assign(), then absorb the new non-outlier products: store their labels, move their centroids."""
+        assigned, X = self._assign(names, categories)
+        new = (~assigned["known"] & ~assigned["outlier"] & ~assigned["name"].duplicated()).to_numpy()
+        if new.any():
+            X = X[new]
+            labels = assigned["cluster"].to_numpy()[new]
+            k = len(self.centers)
+            members = sparse.csr_matrix((np.ones(len(labels)), (labels, np.arange(len(labels)))),
+                                        shape=(k, len(labels)))
+            sums = np.asarray((members @ X).todense())  # per-cluster sum of the new rows
+            n = np.bincount(labels, minlength=k).astype(np.float64)
+            self.counts += n
+            moved = n > 0
+            # Running mean: each product pulls its centroid by 1 / (products behind it)
+            self.centers[moved] += (sums[moved] - n[moved, None] * self.centers[moved]) / self.counts[moved, None]
+            self.known.update(zip(assigned["name"][new], labels.tolist()))
+        self.meta["updates"] = self.meta.get("updates", 0) + 1
+        self.meta["absorbed"] = self.meta.get("absorbed", 0) + int(new.sum())
+        return assigned
+
+    def refit(self, names, categories, k=None, n_init=20):
+        """A fresh fit on these products, clusters renumbered to the old ids they overlap most."""
+        k = k or len(self.centers)
+        if k < len(self.centers):
+            raise ValueError(f"refit with K={k} would drop cluster ids (current K={len(self.centers)})")
+        model = ClusterModel.fit(names, categories, k, n_init=n_init)
+        old = pd.Series(list(model.known)).map(self.known)
+        new = np.fromiter(model.known.values(), dtype=np.int64)
+        seen = old.notna().to_numpy()
+        overlap = np.zeros((k, len(self.centers)))
+        np.add.at(overlap, (new[seen], old[seen].to_numpy(dtype=np.int64)), 1)
+        rows, cols = linear_sum_assignment(-overlap)
+        # Clusters beyond the old K take the next free ids
+        mapping = dict(zip(rows.tolist(), cols.tolist()))
+        spare = iter(range(len(self.centers), len(self.centers) + k))
+        for c in range(k):
+            mapping.setdefault(c, next(spare))
+
+        order = np.argsort([mapping[c] for c in range(k)])
+        model.centers = model.centers[order]
+        model.counts = model.counts[order]
+        model.known = {name: mapping[c] for name, c in model.known.items()}
+        model.cluster_names = {mapping[c]: self.cluster_names.get(mapping[c], f'Cluster {mapping[c]}')
+                               for c in range(k)}
+        return model
+
+    # ---------------- Persistence ----------------
+    def save(self, path=MODEL_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self.__dict__, path)
+        return path
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        state = joblib.load(path)
+        model = cls.__new__(cls)
+        model.__dict__.update(state)
+        return model
+
+
+def _vectorize(vectorizer, names, categories):
+    return tfidf_transform(vectorizer, cluster_text(names, categories))
+
+
+def tfidf_transform(vectorizer, texts):
+    """vectorizer.transform(texts), with the n-grams of the whole batch counted at once.
+
+    sklearn builds every n-gram string of every document and looks it up in
+    the vocabulary. Here the tokens are factorized first, so stop words,
+    vocabulary lookups and bigram strings are handled once per distinct token
+    or token pair. Same matrix for word uni/bigrams (the notebook's settings);
+    any other configuration goes through sklearn.
+    """
+    v = vectorizer
+    if not (v.analyzer == "word" and v.preprocessor is None and v.tokenizer is None and v.strip_accents is None
+            and v.lowercase and tuple(v.ngram_range) in ((1, 1), (1, 2)) and not v.binary):
+        return v.transform(texts)
+
+    tokens = pd.Series(texts, dtype=object).str.lower().str.findall(v.token_pattern)
+    doc = np.repeat(np.arange(len(tokens)), tokens.str.len().to_numpy())
+    codes, uniques = pd.factorize(np.array(list(chain.from_iterable(tokens)), dtype=object))
+    stop = v.get_stop_words()
+    if stop:
+        keep = ~pd.Index(uniques).isin(list(stop))[codes]
+        codes, doc = codes[keep], doc[keep]
+    vocab = v.vocabulary_
+    rows = [doc]
+    cols = [np.array([vocab.get(t, -1) for t in uniques], dtype=np.int64)[codes]]
+    if v.ngram_range[1] == 2:
+        same = doc[1:] == doc[:-1]  # adjacent tokens of one document
+        pair_codes, pairs = pd.factorize(codes[:-1][same].astype(np.int64) * len(uniques) + codes[1:][same])
+        bigrams = [f"{uniques[p // len(uniques)]} {uniques[p % len(uniques)]}" for p in pairs]
+        rows.append(doc[:-1][same])
+        cols.append(np.array([vocab.get(b, -1) for b in bigrams], dtype=np.int64)[pair_codes])
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    hit = cols >= 0
+    X = sparse.csr_matrix((np.ones(hit.sum()), (rows[hit], cols[hit])), shape=(len(tokens), len(vocab)))
+
+    if v.sublinear_tf:
+        np.log(X.data, X.data)
+        X.data += 1
+    if v.use_idf:
+        X = X @ sparse.diags(v.idf_)
+    return normalize(X, norm=v.norm, copy=False) if v.norm else X
+
+
+def _sq_distance(X, centers, labels):
+    """Squared distance of each row of sparse X to its own centroid."""
+    X = sparse.csr_matrix(X)
+    x_sq = np.asarray(X.multiply(X).sum(axis=1)).ravel()
+    c = centers[labels]
+    dot = np.asarray(X.multiply(c).sum(axis=1)).ravel()
+    return x_sq - 2 * dot + (c * c).sum(axis=1)
+
+
+def read_products(path):
+    """One row per product name from a product- or review-level CSV with name and categories."""
+    df = pd.read_csv(path, usecols=["name", "categories"])
+    return df.drop_duplicates("name", ignore_index=True)
+
+
+def describe(model, path):
+    meta = model.meta
+    print(f"{path}: {len(model.centers)} clusters, {len(model.vectorizer.vocabulary_)} terms, "
+          f"{len(model.known):,} known products, outlier threshold {model.threshold:.3f}")
+    print(f"  fitted {meta.get('fitted_at', '?')} on {meta.get('fitted_products', 0):,} products, "
+          f"{meta.get('absorbed', 0):,} absorbed since (updates: {meta.get('updates', 0)})")
+    for c, name in sorted(model.cluster_names.items()):
+        print(f"  {c:>3}  {name:<28} {int(model.counts[c]):>8,} products")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign new products to the saved product clusters")
+    parser.add_argument("command", choices=["info", "assign", "refit"])
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--input", default=None, help="CSV with name and categories columns")
+    parser.add_argument("--output", default=None, help="assign: CSV for the assignments")
+    parser.add_argument("--update", action="store_true", help="assign: absorb non-outliers and save the model")
+    parser.add_argument("--clusters", type=int, default=None, help="refit: K (default: the current K)")
+    args = parser.parse_args()
+
+    if not Path(args.model).exists():
+        raise SystemExit(f"No model at {args.model} (run 03_clustering.ipynb)")
+    model = ClusterModel.load(args.model)
+    if args.command != "info":
+        if args.input is None:
+            raise SystemExit(f"{args.command} needs --input")
+        products = read_products(args.input)
+        start = time.perf_counter()
+        if args.command == "refit":
+            model = model.refit(products["name"], products["categories"], args.clusters)
+            model.save(args.model)
+            print(f"Refitted on {len(products):,} products in {time.perf_counter() - start:.1f}s")
+        else:
+            method = model.update if args.update else model.assign
+            assigned = method(products["name"], products["categories"])
+            print(f"Assigned {len(assigned):,} products in {time.perf_counter() - start:.2f}s: "
+                  f"{int(assigned['known'].sum()):,} known, {int(assigned['outlier'].sum()):,} outliers")
+            if args.output:
+                assigned.to_csv(args.output, index=False)
+            if args.update:
+                model.save(args.model)
+    describe(model, args.model)
+
+
+if __name__ == "__main__":
+    main()
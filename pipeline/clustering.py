@@ -0,0 +1,90 @@
+"""
+clustering.py — Sparse product clustering: K sweep, fit and 2-D projection
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+03_clustering.ipynb and the extras/ scatter scripts cluster a TF-IDF matrix
+of product texts. They fit KMeans with an exact silhouette (all pairwise
+distances) for every candidate K, and project with PCA(X.toarray()), which
+densifies the matrix. Fine for 65 products, not for hundreds of thousands.
+Everything here takes the sparse matrix as is, so memory follows its
+non-zeros plus a few floats per row:
+
+    project       TruncatedSVD (randomized), no centering and no dense copy
+    fit_kmeans    the notebook's KMeans up to EXACT_MAX rows, MiniBatchKMeans above
+    silhouette    exact up to SILHOUETTE_SAMPLE rows, else averaged over random samples
+    k_sweep       one joblib worker per candidate K; workers map the matrix's
+                  arrays (copy-on-write) instead of each holding a copy
+
+Up to EXACT_MAX rows a sweep or fit gives the notebook's numbers exactly.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn import config_context
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.metrics import silhouette_score
+
+RANDOM_STATE = 42
+EXACT_MAX = 10_000  # rows up to which full-batch KMeans is used
+BATCH_SIZE = 4096  # MiniBatchKMeans rows per step
+SILHOUETTE_SAMPLE = 5000  # rows per silhouette sample
+SILHOUETTE_DRAWS = 3
+WORKING_MEMORY = 64  # MB per chunk of the sample's pairwise distances (sklearn's default: 1024)
+
+
+def project(X, n_components=2, random_state=RANDOM_STATE):
+    """(rows x n_components coordinates, explained variance ratio per component)."""
+    svd = TruncatedSVD(n_components=n_components, algorithm="randomized", random_state=random_state)
+    coords = svd.fit_transform(X)
+    return coords, svd.explained_variance_ratio_
+
+
+def fit_kmeans(X, k, random_state=RANDOM_STATE, n_init=10, batch_size=BATCH_SIZE):
+    """Fitted KMeans (small inputs) or MiniBatchKMeans; both have labels_, inertia_, cluster_centers_."""
+    if X.shape[0] <= EXACT_MAX:
+        model = KMeans(n_clusters=k, random_state=random_state, n_init=n_init)
+    else:
+        model = MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=min(n_init, 3),
+                                batch_size=batch_size)
+    return model.fit(X)
+
+
+def silhouette(X, labels, sample_size=SILHOUETTE_SAMPLE, draws=SILHOUETTE_DRAWS, random_state=RANDOM_STATE):
+    """Mean silhouette coefficient: exact for small inputs, else the mean over `draws` random samples.
+
+    NaN when the labels (or every sample's labels) form fewer than two clusters.
+    """
+    labels = np.asarray(labels)
+    n = X.shape[0]
+    with config_context(working_memory=WORKING_MEMORY):
+        if n <= sample_size:
+            return float(silhouette_score(X, labels)) if 1 < len(np.unique(labels)) < n else np.nan
+        rng = np.random.default_rng(random_state)
+        scores = []
+        for _ in range(draws):
+            idx = np.sort(rng.choice(n, size=sample_size, replace=False))
+            if 1 < len(np.unique(labels[idx])) < sample_size:
+                scores.append(silhouette_score(X[idx], labels[idx]))
+    return float(np.mean(scores)) if scores else np.nan
+
+
+def _score_k(X, k, random_state, n_init, sample_size):
+    start = time.perf_counter()
+    model = fit_kmeans(X, k, random_state=random_state, n_init=n_init)
+    score = silhouette(X, model.labels_, sample_size=sample_size, random_state=random_state)
+    return {"k": k, "inertia": float(model.inertia_), "silhouette": score,
+            "seconds": time.perf_counter() - start}
+
+
+def k_sweep(X, k_values, n_jobs=-1, random_state=RANDOM_STATE, n_init=10, sample_size=SILHOUETTE_SAMPLE):
+    """Inertia and silhouette for each candidate K, fitted in parallel; one row per K, in K order."""
+    # Copy-on-write maps: shared pages like read-only ones, but sklearn's sparse
+    # Lloyd step refuses read-only buffers
+    rows = Parallel(n_jobs=n_jobs, mmap_mode="c")(
+        delayed(_score_k)(X, k, random_state, n_init, sample_size) for k in k_values
+    )
+    return pd.DataFrame(rows, columns=["k", "inertia", "silhouette", "seconds"]).sort_values("k", ignore_index=True)
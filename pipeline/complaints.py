@@ -0,0 +1,130 @@
+"""
+complaints.py — Top complaint terms for every product in one sparse pass
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+04_summarization_local.ipynb fits a new TfidfVectorizer on each product's
+negative reviews, and finds those reviews with a boolean scan of the whole
+frame per product. Here all negative reviews are tokenized once into
+(review, term, count) entries, and every product's TF-IDF is derived from them:
+
+    per-product document frequency   np.unique over (product, term) pairs
+    min_df / max_df pruning, idf      elementwise on the matrix entries
+    L2 row normalization              bincount per review, in sklearn's summation order
+    mean TF-IDF per product           G @ X, G = sparse product indicator / n
+
+The arithmetic follows TfidfVectorizer step by step, so each product's
+scores, and therefore its top terms, match the notebook's per-product fit.
+Runtime grows with the number of negative reviews, not products x reviews.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+
+CAT_COL = "cluster_name"
+PROD_COL = "name"
+TEXT_COL = "reviews.text"
+LABEL_COL = "predicted_label"
+
+# Same settings as the notebook's per-product TfidfVectorizer
+ANALYZER = dict(lowercase=True, stop_words="english", ngram_range=(1, 2))
+MIN_DF = 2
+MAX_DF = 0.95
+MIN_TEXTS = 5  # products with fewer negative texts get no complaint terms
+
+
+def negative_reviews(df, cat_col=CAT_COL, prod_col=PROD_COL, text_col=TEXT_COL, label_col=LABEL_COL):
+    """Negative reviews with usable text, in their original order."""
+    labels = df[label_col].astype(str).str.upper().str.strip()
+    texts = df[text_col]
+    usable = texts.map(lambda t: isinstance(t, str) and bool(t.strip()))
+    return df.loc[(labels == "NEGATIVE") & usable, [cat_col, prod_col, text_col]]
+
+
+def count_terms(texts):
+    """(review, term, count) triples plus the alphabetical vocabulary, one analyzer pass.
+
+    Like CountVectorizer, but each review's terms stay in the order they
+    first appear in it, which the per-product normalization needs.
+    """
+    analyze = CountVectorizer(**ANALYZER).build_analyzer()
+    vocabulary = {}
+    term_ids, counts, indptr = [], [], [0]
+    for text in texts:
+        counter = {}
+        for feature in analyze(text):
+            idx = vocabulary.setdefault(feature, len(vocabulary))
+            counter[idx] = counter.get(idx, 0) + 1
+        term_ids.extend(counter)
+        counts.extend(counter.values())
+        indptr.append(len(term_ids))
+
+    terms = np.array(sorted(vocabulary), dtype=object)
+    alphabetical = np.empty(len(vocabulary), dtype=np.int64)
+    alphabetical[[vocabulary[t] for t in terms]] = np.arange(len(terms))
+    doc = np.repeat(np.arange(len(texts)), np.diff(indptr))
+    return doc, alphabetical[np.asarray(term_ids, dtype=np.int64)], np.asarray(counts, dtype=np.int64), terms
+
+
+def top_complaints(df, topn=6, cat_col=CAT_COL, prod_col=PROD_COL, text_col=TEXT_COL,
+                   label_col=LABEL_COL):
+    """{(category, product): top-N complaint terms} for every product with negative reviews."""
+    neg = negative_reviews(df, cat_col, prod_col, text_col, label_col)
+    if neg.empty:
+        return {}
+    group_keys = neg.groupby([cat_col, prod_col], sort=False).ngroup().to_numpy()
+    products = list(neg.groupby([cat_col, prod_col], sort=False).groups)
+    n_docs = np.bincount(group_keys, minlength=len(products))
+
+    doc, term, count, terms = count_terms(neg[text_col].tolist())
+    n_terms = len(terms)
+    prod = group_keys[doc]
+    n = n_docs[prod]
+
+    # Document frequency of each term within its product, then the pruning
+    _, first, inverse, df_counts = np.unique(
+        prod * n_terms + term, return_index=True, return_inverse=True, return_counts=True
+    )
+    inverse = inverse.ravel()
+    dfreq = df_counts[inverse]
+    keep = (dfreq >= MIN_DF) & (dfreq <= MAX_DF * n) & (n >= MIN_TEXTS)
+
+    # A per-product vectorizer stores each review's terms in the order the
+    # product first used them, and sums squares in that order when
+    # normalizing; do the same so the floats (and near-tie rankings) agree
+    order = np.lexsort((first[inverse], doc))
+    order = order[keep[order]]
+    doc, term, count, n, dfreq = doc[order], term[order], count[order], n[order], dfreq[order]
+
+    # Smoothed idf and L2-normalized rows, over each product's kept terms only
+    idf = np.log((n + 1) / (dfreq + 1)) + 1
+    tfidf = count.astype(np.float64) * idf
+    n_reviews = len(group_keys)
+    norms = np.sqrt(np.bincount(doc, weights=tfidf * tfidf, minlength=n_reviews))
+    tfidf /= norms[doc]
+    X = sp.csr_matrix((tfidf, (doc, term)), shape=(n_reviews, n_terms))
+
+    # Mean over each product's reviews: sparse indicator (scaled by 1/n) times X
+    G = sp.csr_matrix(
+        (1.0 / n_docs[group_keys], (group_keys, np.arange(len(group_keys)))),
+        shape=(len(products), n_reviews),
+    )
+    scores = (G @ X).tocsr()
+    scores.sort_indices()
+
+    out = {}
+    for p, key in enumerate(products):
+        row = slice(scores.indptr[p], scores.indptr[p + 1])
+        if n_docs[p] < MIN_TEXTS or row.start == row.stop:
+            out[key] = []
+            continue
+        # Same argsort as the notebook over the product's own (alphabetical) vocabulary,
+        # so ties come out in the same order
+        order = scores.data[row].argsort()[::-1][:topn]
+        out[key] = terms[scores.indices[row][order]].tolist()
+    return out
+
+
+def complaints_lookup(complaints, category, product, topn):
+    """Top terms for one product; [] when it had too few negative reviews."""
+    return complaints.get((category, product), [])[:topn]
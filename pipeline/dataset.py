@@ -0,0 +1,452 @@
+"""
+dataset.py — Columnar review store: one Parquet dataset instead of three CSVs
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Usage:
+    python pipeline/dataset.py build [--data-dir data]   # after 03_clustering.ipynb
+    python pipeline/dataset.py info  [--data-dir data]
+
+data_with_clusters.csv (or data_cleaned.csv before clustering) and the
+prediction columns of data_with_predictions_v2.csv, joined by row position,
+are written once to data/reviews_dataset/:
+
+    cluster_name=<name>/part-0.parquet   one folder per cluster (hive style),
+                                         rows in source order, zstd, row
+                                         groups of ROW_GROUP_ROWS rows
+    _dataset.json                        row count, column order, rows per
+                                         cluster, size / mtime / SHA-256 of
+                                         the source CSVs and of every part file
+
+Product names, categories and labels are stored dictionary-encoded and come
+back as pandas categoricals. Every row keeps its position in the source
+files as row_id, which the loaders use as the index, so positional joins
+against the CSVs still line up and filtered frames keep their original ids.
+
+load_reviews() and iter_batches() read only the requested columns, and
+push filters (pyarrow's list-of-tuples form, e.g. [("cluster_name", "==",
+"E-Readers"), ("reviews.rating", "<=", 2)]) down to the partition folders
+and the row-group statistics. When the dataset is missing, pyarrow is not
+installed, or a source CSV changed since the build, both read the CSVs
+instead and apply the same projection and filters in pandas.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # CSV only
+    pa = None
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DATASET_NAME = "reviews_dataset"
+META_NAME = "_dataset.json"  # the leading underscore keeps the Parquet reader off it
+REVIEW_FILES = ["data_with_clusters.csv", "data_cleaned.csv"]  # first one present
+PRED_FILE = "data_with_predictions_v2.csv"
+PRED_COLS = ["predicted_label", "predicted_score", "score_negative", "score_neutral", "score_positive"]
+PARTITION_COL = "cluster_name"
+ROW_ID = "row_id"
+# Few distinct values, repeated on every row
+DICT_COLS = ["name", "brand", "manufacturer", "categories", "primaryCategories",
+             "cluster_name", "sentiment", "predicted_label"]
+ROW_GROUP_ROWS = 100_000
+BATCH_ROWS = 200_000
+READ_ROWS = 10_000  # per partition, while streaming
+
+
+def file_hash(path):
+    """SHA-256 of a file's content, read in 1 MB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_paths(data_dir=DATA_DIR):
+    """(reviews CSV, predictions CSV or None) the dataset is built from."""
+    data_dir = Path(data_dir)
+    reviews = next((data_dir / name for name in REVIEW_FILES if (data_dir / name).exists()), None)
+    if reviews is None:
+        raise FileNotFoundError("No data file found. Expected one of:\n"
+                                + "\n".join(f"  {data_dir / name}" for name in REVIEW_FILES))
+    preds = data_dir / PRED_FILE
+    return reviews, preds if preds.exists() else None
+
+
+def _read_header(path):
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _pred_cols(pred_path, wanted=None):
+    """Prediction columns to take from the predictions CSV (none unless it has labels)."""
+    if pred_path is None:
+        return []
+    header = _read_header(pred_path)
+    if "predicted_label" not in header:
+        return []
+    return [c for c in PRED_COLS if c in header and (wanted is None or c in wanted)]
+
+
+def join_predictions(reviews, preds, columns=None):
+    """Add the prediction columns of preds to reviews by row position, in place.
+
+    The predictions CSV is the review CSV scored row by row, so row i of one
+    is row i of the other. A merge on review fields would multiply rows
+    wherever two reviews share them.
+    """
+    if len(preds) != len(reviews):
+        raise ValueError(f"Predictions have {len(preds):,} rows and reviews {len(reviews):,}; "
+                         "they are joined by row position, so both must come from the same file")
+    columns = [c for c in PRED_COLS if c in preds.columns] if columns is None else columns
+    for col in columns:
+        reviews[col] = preds[col].set_axis(reviews.index)
+    return reviews
+
+
+# ---------- FILTERS ----------
+
+def _disjuncts(filters):
+    """Filters in disjunctive normal form: a list of AND-ed lists of (column, op, value)."""
+    if not filters:
+        return []
+    return [filters] if isinstance(filters[0], tuple) else filters
+
+
+def filter_columns(filters):
+    return list(dict.fromkeys(col for conj in _disjuncts(filters) for col, _, _ in conj))
+
+
+def _condition(series, op, value):
+    if op in ("=", "=="):
+        return series == value
+    if op == "!=":
+        return series.notna() & (series != value)
+    if op == "<":
+        return series < value
+    if op == "<=":
+        return series <= value
+    if op == ">":
+        return series > value
+    if op == ">=":
+        return series >= value
+    if op == "in":
+        return series.isin(list(value))
+    if op == "not in":
+        return series.notna() & ~series.isin(list(value))
+    raise ValueError(f"Unsupported filter operator: {op!r}")
+
+
+def filter_mask(df, filters):
+    """Boolean mask of the rows matching the filters, for frames read from CSV."""
+    mask = np.zeros(len(df), dtype=bool)
+    for conj in _disjuncts(filters):
+        part = np.ones(len(df), dtype=bool)
+        for col, op, value in conj:
+            part &= _condition(df[col], op, value).fillna(False).to_numpy(dtype=bool)
+        mask |= part
+    return mask
+
+
+# ---------- BUILD ----------
+
+def read_csv_reviews(data_dir=DATA_DIR, columns=None, filters=None):
+    """Reviews with predictions joined by position, from the CSVs, indexed by row_id."""
+    reviews_path, pred_path = source_paths(data_dir)
+    header = _read_header(reviews_path)
+    needed = None if columns is None else list(dict.fromkeys([*columns, *filter_columns(filters)]))
+    pred_cols = _pred_cols(pred_path, needed)
+    review_cols = [c for c in header if (needed is None or c in needed) and c not in pred_cols]
+    dtypes = {c: "category" for c in DICT_COLS}
+
+    df = pd.read_csv(reviews_path, usecols=review_cols, dtype=dtypes)
+    if pred_cols:
+        join_predictions(df, pd.read_csv(pred_path, usecols=pred_cols, dtype=dtypes), pred_cols)
+    df.index.name = ROW_ID
+    if filters:
+        df = df[filter_mask(df, filters)]
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+
+def _sources_state(data_dir):
+    """{file name: (size, mtime_ns)} of the CSVs a build would read now."""
+    reviews_path, pred_path = source_paths(data_dir)
+    return {p.name: (p.stat().st_size, p.stat().st_mtime_ns) for p in [reviews_path, pred_path] if p}
+
+
+def build_dataset(data_dir=DATA_DIR, row_group_rows=ROW_GROUP_ROWS):
+    """Write data_dir/reviews_dataset from the CSVs; returns its metadata."""
+    if pa is None:
+        raise ImportError("pip install pyarrow to build the Parquet dataset")
+    data_dir = Path(data_dir)
+    df = read_csv_reviews(data_dir)
+    df = df.reset_index()
+    table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+    if PARTITION_COL in table.column_names:
+        # Partition values live in folder names, so the column is written as plain strings
+        i = table.column_names.index(PARTITION_COL)
+        table = table.set_column(i, PARTITION_COL, table[PARTITION_COL].cast(pa.string()))
+
+    path = data_dir / DATASET_NAME
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    partitioning = _partitioning() if PARTITION_COL in table.column_names else None
+    ds.write_dataset(
+        table, tmp, format="parquet", partitioning=partitioning, preserve_order=True,
+        basename_template="part-{i}.parquet", max_rows_per_group=row_group_rows,
+        min_rows_per_group=min(row_group_rows, 1 << 16),
+        file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+    )
+
+    sources = {}
+    for source in filter(None, source_paths(data_dir)):
+        st = source.stat()
+        sources[source.name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": file_hash(source)}
+    partitions = {}
+    if partitioning is not None:
+        counts = df[PARTITION_COL].value_counts(dropna=False, sort=False)
+        partitions = {("" if pd.isna(k) else str(k)): int(v) for k, v in counts.items()}
+    meta = {
+        "rows": len(df),
+        "columns": [c for c in df.columns if c != ROW_ID],
+        "partition": PARTITION_COL if partitioning is not None else None,
+        "partitions": partitions,
+        "sources": sources,
+        "files": {p.relative_to(tmp).as_posix(): file_hash(p) for p in sorted(tmp.rglob("*.parquet"))},
+    }
+    with open(tmp / META_NAME, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+
+    # Swap the new folder in, so readers never see half a dataset
+    old = path.with_name(path.name + ".old")
+    shutil.rmtree(old, ignore_errors=True)
+    if path.exists():
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return meta
+
+
+# ---------- READ ----------
+
+def _partitioning():
+    return ds.partitioning(pa.schema([(PARTITION_COL, pa.string())]), flavor="hive")
+
+
+def read_meta(path):
+    with open(Path(path) / META_NAME, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def current_dataset(data_dir=DATA_DIR):
+    """Path of the dataset if it can be read and still matches the CSVs, else None."""
+    path = Path(data_dir) / DATASET_NAME
+    if pa is None or not (path / META_NAME).exists():
+        return None
+    recorded = read_meta(path)["sources"]
+    try:
+        state = _sources_state(data_dir)
+    except FileNotFoundError:
+        return path  # the CSVs are gone, the dataset is all there is
+    changed = sorted(set(state) ^ set(recorded))
+    for name in set(state) & set(recorded):
+        (size, mtime_ns), entry = state[name], recorded[name]
+        # A touched but identical file (a fresh checkout, a copy) still matches
+        if entry["size"] != size or (entry["mtime_ns"] != mtime_ns
+                                     and entry["sha256"] != file_hash(Path(data_dir) / name)):
+            changed.append(name)
+    if changed:
+        warnings.warn(f"{', '.join(changed)} changed since {DATASET_NAME}/ was built, reading the CSVs "
+                      f"(rebuild with: python pipeline/dataset.py build)", stacklevel=2)
+        return None
+    return path
+
+
+def _open(path):
+    meta = read_meta(path)
+    partitioning = _partitioning() if meta["partition"] else None
+    return ds.dataset(path, format="parquet", partitioning=partitioning), meta
+
+
+def _projection(dataset, meta, columns, filters):
+    """Columns to scan (row_id and filter columns included) and the ones to return."""
+    names = set(dataset.schema.names)
+    wanted = meta["columns"] if columns is None else [c for c in columns if c in names]
+    scan = list(dict.fromkeys([ROW_ID, *wanted, *filter_columns(filters)]))
+    return scan, wanted
+
+
+def _to_pandas(table, wanted):
+    """Frame indexed by row_id, with the partition column dictionary-encoded like the others."""
+    if PARTITION_COL in table.column_names:
+        i = table.column_names.index(PARTITION_COL)
+        table = table.set_column(i, PARTITION_COL, pc.dictionary_encode(table[PARTITION_COL]))
+    # Arrow buffers are released column by column as pandas takes them over
+    return table.select([ROW_ID, *wanted]).to_pandas(split_blocks=True, self_destruct=True).set_index(ROW_ID)
+
+
+def _fragment_tables(fragment, schema, columns, expression, read_rows):
+    """Rows of one partition file in row_id order, read_rows at a time, its key as a column.
+
+    Reads synchronously with ParquetFile, so no partition runs ahead of the
+    merge; row groups whose statistics rule the filter out are skipped.
+    """
+    key = ds.get_partition_keys(fragment.partition_expression).get(PARTITION_COL)
+    row_groups = None
+    if expression is not None:
+        row_groups = [rg.id for piece in fragment.split_by_row_group(expression, schema=schema) for rg in piece.row_groups]
+    reader = pq.ParquetFile(fragment.path, buffer_size=1 << 20)  # stream column chunks, do not load them whole
+    file_cols = [c for c in columns if c in reader.schema_arrow.names]
+    for batch in reader.iter_batches(batch_size=read_rows, row_groups=row_groups, columns=file_cols):
+        table = pa.Table.from_batches([batch])
+        if PARTITION_COL in columns:
+            table = table.append_column(PARTITION_COL, pa.array([key] * len(table), pa.string()))
+        if expression is not None:
+            table = table.filter(expression)
+        if len(table):
+            yield table
+
+
+def _merge_by_row_id(streams, n_rows, batch_rows):
+    """Streams of row_id-sorted tables, merged into tables covering batch_rows row ids each."""
+    held = [[] for _ in streams]
+    for hi in range(batch_rows, n_rows + batch_rows, batch_rows):
+        parts = []
+        for stream, pending in zip(streams, held):
+            while not pending or pending[-1][ROW_ID][-1].as_py() < hi:
+                table = next(stream, None)
+                if table is None:
+                    break
+                pending.append(table)
+            if not pending:
+                continue
+            table = pa.concat_tables(pending)
+            cut = int(np.searchsorted(table[ROW_ID].to_numpy(), hi))
+            parts.append(table.slice(0, cut))
+            pending[:] = [table.slice(cut)] if cut < len(table) else []
+        table = pa.concat_tables(parts) if parts else None
+        if table is not None and table.num_rows:
+            yield table.take(pc.sort_indices(table[ROW_ID]))
+
+
+def _scan(path, columns, filters, batch_rows):
+    """(tables of batch_rows row ids each, in source order; the columns to return)."""
+    dataset, meta = _open(path)
+    scan, wanted = _projection(dataset, meta, columns, filters)
+    expression = pq.filters_to_expression(filters) if filters else None
+    streams = [_fragment_tables(fragment, dataset.schema, scan, expression, min(batch_rows, READ_ROWS))
+               for fragment in dataset.get_fragments(filter=expression)]
+    return _merge_by_row_id(streams, meta["rows"], batch_rows), wanted
+
+
+def load_reviews(columns=None, filters=None, data_dir=DATA_DIR):
+    """Review rows in source order, indexed by row_id: from the dataset, else the CSVs."""
+    path = current_dataset(data_dir)
+    if path is None:
+        return read_csv_reviews(data_dir, columns, filters)
+    tables, wanted = _scan(path, columns, filters, BATCH_ROWS)
+    # Merged a batch at a time, so only one batch is ever held twice
+    tables = list(tables)
+    if not tables:
+        dataset, meta = _open(path)
+        tables = [dataset.schema.empty_table().select(_projection(dataset, meta, columns, filters)[0])]
+    return _to_pandas(pa.concat_tables(tables), wanted)
+
+
+def iter_batches(columns=None, filters=None, batch_rows=BATCH_ROWS, data_dir=DATA_DIR):
+    """Yield review frames in source order, batch_rows source rows at a time (fewer once filtered).
+
+    Every partition is read once, side by side, and the batches are cut on
+    row_id, so memory stays around batch_rows rows plus a small read
+    buffer per cluster.
+    """
+    path = current_dataset(data_dir)
+    if path is None:
+        yield from _iter_csv(columns, filters, batch_rows, data_dir)
+        return
+    tables, wanted = _scan(path, columns, filters, batch_rows)
+    for table in tables:
+        yield _to_pandas(table, wanted)
+
+
+def _iter_csv(columns, filters, batch_rows, data_dir):
+    reviews_path, pred_path = source_paths(data_dir)
+    header = _read_header(reviews_path)
+    needed = None if columns is None else list(dict.fromkeys([*columns, *filter_columns(filters)]))
+    pred_cols = _pred_cols(pred_path, needed)
+    review_cols = [c for c in header if (needed is None or c in needed) and c not in pred_cols]
+    dtypes = {c: "category" for c in DICT_COLS}
+    reviews = pd.read_csv(reviews_path, usecols=review_cols, dtype=dtypes, chunksize=batch_rows)
+    preds = pd.read_csv(pred_path, usecols=pred_cols, dtype=dtypes, chunksize=batch_rows) if pred_cols else None
+    for chunk in reviews:
+        if preds is not None:
+            pred_chunk = next(preds, None)
+            for col in pred_cols:
+                chunk[col] = pred_chunk[col] if pred_chunk is not None else np.nan
+        chunk.index.name = ROW_ID
+        if filters:
+            chunk = chunk[filter_mask(chunk, filters)]
+        if columns is not None:
+            chunk = chunk[[c for c in columns if c in chunk.columns]]
+        if len(chunk):
+            yield chunk
+
+
+def dataset_columns(data_dir=DATA_DIR):
+    """Column names load_reviews() returns by default (without reading any rows)."""
+    path = current_dataset(data_dir)
+    if path is not None:
+        return list(read_meta(path)["columns"])
+    reviews_path, pred_path = source_paths(data_dir)
+    review_cols = _read_header(reviews_path)
+    return review_cols + [c for c in _pred_cols(pred_path) if c not in review_cols]
+
+
+# ---------- CLI ----------
+
+def describe(path):
+    meta = read_meta(path)
+    size = sum((Path(path) / rel).stat().st_size for rel in meta["files"])
+    print(f"{path}: {meta['rows']:,} rows, {len(meta['columns'])} columns, "
+          f"{len(meta['files'])} files, {size / 1e6:,.1f} MB")
+    for name, rows in meta["partitions"].items():
+        print(f"  {PARTITION_COL}={name or '(none)'}: {rows:,} rows")
+    schema = pq.read_schema(Path(path) / next(iter(meta["files"])))
+    dictionary = [f.name for f in schema if pa.types.is_dictionary(f.type)]
+    print(f"  dictionary-encoded: {', '.join(dictionary) or '-'}")
+    print(f"  built from: {', '.join(meta['sources'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the Parquet review dataset")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="folder with the CSVs")
+    parser.add_argument("--row-group-rows", type=int, default=ROW_GROUP_ROWS)
+    args = parser.parse_args()
+
+    path = Path(args.data_dir) / DATASET_NAME
+    if args.command == "build":
+        meta = build_dataset(args.data_dir, args.row_group_rows)
+        print(f"Saved {meta['rows']:,} rows to {path}/")
+    elif not (path / META_NAME).exists():
+        raise SystemExit(f"No dataset at {path}/ (run: python pipeline/dataset.py build)")
+    if pa is None:
+        raise SystemExit("pip install pyarrow to read the dataset")
+    describe(path)
+
+
+if __name__ == "__main__":
+    main()
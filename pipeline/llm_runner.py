@@ -0,0 +1,274 @@
+"""
+llm_runner.py — Concurrent, rate-limited, resumable LLM calls over HTTP
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Runs a list of prompts against the Anthropic Messages API or the OpenAI
+Chat Completions API (or pipeline/llm_stub.py, which speaks both) with
+asyncio and httpx, the HTTP client both SDKs are built on:
+
+    concurrency     at most `concurrency` requests in flight
+    rate limit      token buckets for requests per minute and, optionally,
+                    tokens per minute (prompt estimate + max_tokens)
+    retries         429, 5xx, 529 and connection errors, exponential backoff
+                    with jitter; a Retry-After header wins and also pauses
+                    the request bucket for every other worker
+    checkpoint      every answer is appended (and fsynced) to a JSONL journal
+                    as it arrives; a rerun skips jobs whose entry has the same
+                    request key, so an interrupted run resumes where it stopped
+
+A job is a dict with "id", "system", "prompt" and "max_tokens" keys.
+The request key hashes provider, model, prompts, max_tokens and
+temperature, so editing a prompt or switching models re-runs that job.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+import httpx
+
+PROVIDERS = {
+    "anthropic": {"url": "https://api.anthropic.com", "path": "/v1/messages", "key_env": "ANTHROPIC_API_KEY"},
+    "openai": {"url": "https://api.openai.com", "path": "/v1/chat/completions", "key_env": "OPENAI_API_KEY"},
+}
+ANTHROPIC_VERSION = "2023-06-01"
+TEMPERATURE = 0.3
+CONCURRENCY = 8
+RPM = 50  # Anthropic's lowest tier
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 1.0  # seconds before the first retry (doubles per attempt, with jitter)
+BACKOFF_MAX = 60.0
+TIMEOUT = 120.0
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+CHARS_PER_TOKEN = 4  # rough prompt size estimate for the tokens-per-minute bucket
+
+
+class LLMError(Exception):
+    def __init__(self, message, status=None, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """`rate` tokens per second, bursts of up to `capacity`; waiters are served in order."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1.0):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def hold(self, seconds):
+        """Hand out nothing for the next `seconds` (the server said to back off).
+
+        Holds overlap rather than add up: several 429s at once wait once.
+        """
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class Journal:
+    """Append-only JSONL of finished jobs: {"id", "key", "text", ...} per line."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # a line torn by a crash mid-write
+                    self.entries[entry["id"]] = entry
+        self._file = None
+
+    def done(self, job_id, key):
+        entry = self.entries.get(job_id)
+        return entry if entry is not None and entry["key"] == key else None
+
+    def record(self, entry):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            torn = False
+            if self.path.exists() and self.path.stat().st_size:
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            self._file = open(self.path, "a", encoding="utf-8")
+            if torn:
+                self._file.write("\n")
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.entries[entry["id"]] = entry
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def request_key(provider, model, job, temperature=TEMPERATURE):
+    payload = [provider, model, job["system"], job["prompt"], job["max_tokens"], temperature]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()[:32]
+
+
+def build_request(provider, model, api_key, job, temperature=TEMPERATURE):
+    """(path, headers, JSON body) of one call, in the provider's own format."""
+    if provider == "anthropic":
+        headers = {"x-api-key": api_key, "anthropic-version": ANTHROPIC_VERSION}
+        body = {"model": model, "system": job["system"], "max_tokens": job["max_tokens"],
+                "temperature": temperature, "messages": [{"role": "user", "content": job["prompt"]}]}
+    elif provider == "openai":
+        headers = {"authorization": f"Bearer {api_key}"}
+        body = {"model": model, "max_tokens": job["max_tokens"], "temperature": temperature,
+                "messages": [{"role": "system", "content": job["system"]},
+                             {"role": "user", "content": job["prompt"]}]}
+    else:
+        raise ValueError(f"Unknown provider: {provider!r}. Choose from {list(PROVIDERS)}")
+    return PROVIDERS[provider]["path"], headers, body
+
+
+def parse_response(provider, body):
+    """(text, {"input_tokens", "output_tokens"}) from a provider's JSON response."""
+    if provider == "anthropic":
+        text = "".join(block.get("text", "") for block in body["content"] if block.get("type") == "text")
+        usage = body.get("usage", {})
+        return text, {"input_tokens": usage.get("input_tokens"), "output_tokens": usage.get("output_tokens")}
+    usage = body.get("usage", {})
+    return body["choices"][0]["message"]["content"], {
+        "input_tokens": usage.get("prompt_tokens"), "output_tokens": usage.get("completion_tokens")}
+
+
+def _retry_after(response):
+    value = response.headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None  # an HTTP date; fall back to the backoff schedule
+
+
+def backoff(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Seconds before retry number `attempt` (1-based): half fixed, half random."""
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class Runner:
+    """Runs jobs against one provider and model; counters in `stats` after run()."""
+
+    def __init__(self, provider, model, api_key, base_url=None, concurrency=CONCURRENCY, rpm=RPM, tpm=None,
+                 max_attempts=MAX_ATTEMPTS, temperature=TEMPERATURE, timeout=TIMEOUT, backoff_base=BACKOFF_BASE):
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown provider: {provider!r}. Choose from {list(PROVIDERS)}")
+        self.provider = provider
+        self.model = model
+        self.api_key = api_key
+        self.base_url = base_url or PROVIDERS[provider]["url"]
+        self.concurrency = concurrency
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_attempts = max_attempts
+        self.temperature = temperature
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.stats = {}
+
+    async def _post(self, client, job):
+        path, headers, body = build_request(self.provider, self.model, self.api_key, job, self.temperature)
+        try:
+            response = await client.post(path, headers=headers, json=body)
+        except httpx.TransportError as e:  # connection refused / reset, timeouts
+            raise LLMError(f"{type(e).__name__}: {e}", retryable=True) from e
+        if response.status_code != 200:
+            raise LLMError(f"HTTP {response.status_code}: {response.text[:200]}", status=response.status_code,
+                           retryable=response.status_code in RETRY_STATUS, retry_after=_retry_after(response))
+        return parse_response(self.provider, response.json())
+
+    async def _call(self, client, job, requests, tokens):
+        cost = len(job["system"]) // CHARS_PER_TOKEN + len(job["prompt"]) // CHARS_PER_TOKEN + job["max_tokens"]
+        for attempt in range(1, self.max_attempts + 1):
+            await requests.acquire()
+            if tokens is not None:
+                await tokens.acquire(cost)
+            self.stats["attempts"] += 1
+            start = time.perf_counter()
+            try:
+                text, usage = await self._post(client, job)
+                self.stats["latencies"].append(time.perf_counter() - start)
+                return text, usage, attempt
+            except LLMError as e:
+                if e.status == 429:
+                    self.stats["rate_limited"] += 1
+                if not e.retryable or attempt == self.max_attempts:
+                    raise
+                self.stats["retries"] += 1
+                delay = e.retry_after if e.retry_after is not None else backoff(attempt, self.backoff_base)
+                if e.retry_after is not None:
+                    requests.hold(e.retry_after)
+                await asyncio.sleep(delay)
+
+    async def run(self, jobs, journal, on_done=None):
+        """{job id: journal entry} for every finished job (this run's and earlier ones').
+
+        Jobs that fail after all retries are left out, and counted in
+        stats["failed"] with their errors in stats["errors"]; rerun to retry them.
+        """
+        self.stats = {"jobs": len(jobs), "resumed": 0, "done": 0, "failed": 0, "attempts": 0, "retries": 0,
+                      "rate_limited": 0, "latencies": [], "errors": {}}
+        results, pending = {}, []
+        for job in jobs:
+            key = request_key(self.provider, self.model, job, self.temperature)
+            entry = journal.done(job["id"], key)
+            if entry is not None:
+                results[job["id"]] = entry
+                self.stats["resumed"] += 1
+            else:
+                pending.append((job, key))
+
+        requests = TokenBucket(self.rpm / 60.0)
+        tokens = TokenBucket(self.tpm / 60.0, capacity=self.tpm / 60.0 * 10) if self.tpm else None
+        slots = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            async def one(job, key):
+                async with slots:
+                    try:
+                        text, usage, attempts = await self._call(client, job, requests, tokens)
+                    except LLMError as e:
+                        self.stats["failed"] += 1
+                        self.stats["errors"][job["id"]] = str(e)
+                        return
+                entry = {"id": job["id"], "key": key, "model": self.model, "text": text, "usage": usage,
+                         "attempts": attempts, "finished_at": time.time()}
+                journal.record(entry)
+                results[job["id"]] = entry
+                self.stats["done"] += 1
+                if on_done is not None:
+                    on_done(job, entry)
+
+            await asyncio.gather(*(one(job, key) for job, key in pending))
+        return results
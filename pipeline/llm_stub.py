@@ -0,0 +1,182 @@
+"""
+llm_stub.py — Local stand-in for the Anthropic / OpenAI APIs, with simulated latency
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Usage:
+    python pipeline/llm_stub.py [--port 8765] [--latency 0.8] [--tokens-per-sec 60]
+                                [--jitter 0.3] [--error-rate 0.02] [--rpm 0]
+
+Answers POST /v1/messages and POST /v1/chat/completions in the providers'
+response formats, so pipeline/summarize_api.py (--provider anthropic|openai
+--base-url http://127.0.0.1:8765) runs end to end offline. Each request:
+
+    sleeps     latency + output tokens / tokens-per-sec, times a lognormal
+               jitter factor (sigma --jitter)
+    answers    a deterministic text of min(max_tokens, 40 + prompt words / 4)
+               words, headed by the prompt's first line
+    fails      with 529 (overloaded) at --error-rate, or with 429 and a
+               Retry-After header above --rpm requests per minute (0: no limit)
+
+Requests run on their own threads, so concurrency is limited only by the
+client. start() runs the server in a background thread for benchmarks.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HOST = "127.0.0.1"
+PORT = 8765
+WORDS = ("battery screen price works great easy setup kids reading sound alexa value charge "
+         "durable slow returned gift recommend quality light display").split()
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.8, tokens_per_sec=60.0, jitter=0.3, error_rate=0.02, rpm=0, seed=0):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rpm = rpm
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = []  # start times of the requests in the last minute, when rpm is set
+        self.stats = {"requests": 0, "ok": 0, "rate_limited": 0, "overloaded": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):  # a cancelled client hung up mid-answer
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def admit(self):
+        """(status, retry-after seconds, latency factor) for a new request."""
+        with self.lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            if self.rpm:
+                self.window = [t for t in self.window if now - t < 60.0]
+                if len(self.window) >= self.rpm:
+                    self.stats["rate_limited"] += 1
+                    return 429, 60.0 - (now - self.window[0]), None
+                self.window.append(now)
+            if self.rng.random() < self.error_rate:
+                self.stats["overloaded"] += 1
+                return 529, None, None
+            self.stats["in_flight"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+            return 200, None, self.rng.lognormvariate(0.0, self.jitter) if self.jitter else 1.0
+
+    def finish(self):
+        with self.lock:
+            self.stats["in_flight"] -= 1
+            self.stats["ok"] += 1
+
+
+def stub_text(prompt, max_tokens):
+    """Deterministic fake answer: the prompt's first line, then filler words."""
+    n_words = min(max_tokens, 40 + len(prompt.split()) // 4)
+    seed = int.from_bytes(hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).digest(), "little")
+    rng = random.Random(seed)
+    first = prompt.strip().splitlines()[0] if prompt.strip() else ""
+    body = " ".join(rng.choice(WORDS) for _ in range(n_words))
+    return f"**Stub summary** — {first[:120]}\n\n{body}.", n_words
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+        if self.path not in ("/v1/messages", "/v1/chat/completions"):
+            self._send(404, {"error": {"type": "not_found_error", "message": self.path}})
+            return
+        server = self.server
+        status, retry_after, factor = server.admit()
+        if status == 429:
+            self._send(429, {"error": {"type": "rate_limit_error", "message": "stub rate limit"}},
+                       {"retry-after": f"{retry_after:.2f}"})
+            return
+        if status == 529:
+            time.sleep(server.latency / 4)
+            self._send(529, {"error": {"type": "overloaded_error", "message": "stub overloaded"}})
+            return
+
+        messages = body.get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        prompt_tokens = (len(body.get("system", "")) + sum(len(m["content"]) for m in messages)) // 4
+        text, n_tokens = stub_text(prompt, int(body.get("max_tokens", 256)))
+        time.sleep((server.latency + n_tokens / server.tokens_per_sec) * factor)
+        server.finish()
+
+        if self.path == "/v1/messages":
+            self._send(200, {
+                "id": "msg_stub", "type": "message", "role": "assistant", "model": body.get("model"),
+                "content": [{"type": "text", "text": text}], "stop_reason": "end_turn",
+                "usage": {"input_tokens": prompt_tokens, "output_tokens": n_tokens},
+            })
+        else:
+            self._send(200, {
+                "id": "chatcmpl-stub", "object": "chat.completion", "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": n_tokens},
+            })
+
+
+def start(host=HOST, port=0, **settings):
+    """StubServer serving from a daemon thread (port 0: any free port); stop with .shutdown()."""
+    server = StubServer((host, port), **settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the Anthropic / OpenAI APIs")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=60.0)
+    parser.add_argument("--jitter", type=float, default=0.3, help="sigma of the lognormal latency factor")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="share of requests answered 529")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429s (0: no limit)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubServer((args.host, args.port), latency=args.latency, tokens_per_sec=args.tokens_per_sec,
+                        jitter=args.jitter, error_rate=args.error_rate, rpm=args.rpm, seed=args.seed)
+    print(f"Stub LLM API on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+prediction_cache.py — Persistent store of sentiment scores per checkpoint and review text
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Maps (checkpoint id, hash of the review text) to the class
+probabilities, so a nightly rescore only runs the model on texts it has
+never seen with that checkpoint. The checkpoint id is a hash of the model
+files, so retraining starts a fresh key space instead of serving stale
+scores. Backed by SQLite from the standard library.
+
+Maintenance:
+    python pipeline/prediction_cache.py stats
+    python pipeline/prediction_cache.py compact [--max-age-days 90] [--max-entries N] [--keep-checkpoint ID]
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+CACHE_PATH = Path(__file__).parent / ".cache" / "predictions.sqlite"
+
+
+def checkpoint_id(model_path) -> str:
+    """Short hash of every file in the checkpoint directory (weights, config, tokenizer)."""
+    h = hashlib.sha256()
+    for path in sorted(Path(model_path).rglob("*")):
+        if path.is_file():
+            h.update(path.relative_to(model_path).as_posix().encode())
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+    return h.hexdigest()[:16]
+
+
+def text_key(text: str) -> bytes:
+    """16-byte digest of a review text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class PredictionCache:
+    """SQLite table of (checkpoint, text hash) -> float32 probabilities, with hit/miss counters."""
+
+    def __init__(self, path=CACHE_PATH, checkpoint=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.checkpoint = checkpoint
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " checkpoint TEXT NOT NULL, text_hash BLOB NOT NULL, probs BLOB NOT NULL,"
+            " last_used INTEGER NOT NULL, PRIMARY KEY (checkpoint, text_hash)) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " finished REAL NOT NULL, checkpoint TEXT NOT NULL, hits INTEGER NOT NULL,"
+            " misses INTEGER NOT NULL)"
+        )
+        self._db.commit()
+
+    def get_many(self, texts):
+        """{text: probabilities} for the texts already scored with this checkpoint."""
+        if not texts:
+            return {}
+        keys = {text_key(t): t for t in texts}
+        found = {}
+        with self._lock:
+            hashes = list(keys)
+            for start in range(0, len(hashes), 500):  # stay under SQLite's variable limit
+                part = hashes[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT text_hash, probs FROM predictions WHERE checkpoint = ?"
+                    f" AND text_hash IN ({','.join('?' * len(part))})",
+                    [self.checkpoint, *part],
+                ).fetchall()
+                for h, probs in rows:
+                    found[keys[h]] = np.frombuffer(probs, dtype=np.float32)
+            today = int(time.time() // 86400)
+            self._db.executemany(
+                "UPDATE predictions SET last_used = ? WHERE checkpoint = ? AND text_hash = ?",
+                [(today, self.checkpoint, text_key(t)) for t in found],
+            )
+            self._db.commit()
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Store {text: probabilities} for this checkpoint."""
+        if not items:
+            return
+        today = int(time.time() // 86400)
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO predictions (checkpoint, text_hash, probs, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                [(self.checkpoint, text_key(t), np.asarray(p, dtype=np.float32).tobytes(), today)
+                 for t, p in items.items()],
+            )
+            self._db.commit()
+
+    def record_run(self):
+        """Append this run's hit/miss counts to the history shown by `stats`."""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO runs (finished, checkpoint, hits, misses) VALUES (?, ?, ?, ?)",
+                (time.time(), self.checkpoint, self.hits, self.misses),
+            )
+            self._db.commit()
+
+    def compact(self, max_age_days=None, max_entries=None, keep_checkpoint=None):
+        """Evict old or surplus entries, then VACUUM; returns the number of rows removed."""
+        with self._lock:
+            before = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+            if keep_checkpoint:
+                self._db.execute("DELETE FROM predictions WHERE checkpoint != ?", (keep_checkpoint,))
+            if max_age_days is not None:
+                cutoff = int(time.time() // 86400) - max_age_days
+                self._db.execute("DELETE FROM predictions WHERE last_used < ?", (cutoff,))
+            if max_entries is not None:
+                self._db.execute(
+                    "DELETE FROM predictions WHERE (checkpoint, text_hash) IN ("
+                    " SELECT checkpoint, text_hash FROM predictions"
+                    " ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (max_entries,),
+                )
+            self._db.commit()
+            after = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+            self._db.execute("VACUUM")
+        return before - after
+
+    def stats(self):
+        with self._lock:
+            per_checkpoint = self._db.execute(
+                "SELECT checkpoint, COUNT(*) FROM predictions GROUP BY checkpoint"
+            ).fetchall()
+            runs = self._db.execute(
+                "SELECT finished, checkpoint, hits, misses FROM runs ORDER BY finished DESC LIMIT 10"
+            ).fetchall()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": dict(per_checkpoint),
+            "size_mb": round(self.path.stat().st_size / 1024 ** 2, 1),
+            "recent_runs": runs,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or compact the sentiment prediction cache")
+    parser.add_argument("command", choices=["stats", "compact"])
+    parser.add_argument("--path", default=str(CACHE_PATH))
+    parser.add_argument("--max-age-days", type=int, default=None, help="drop entries unused for this long")
+    parser.add_argument("--max-entries", type=int, default=None, help="keep only the most recently used N")
+    parser.add_argument("--keep-checkpoint", default=None, help="drop entries of every other checkpoint")
+    args = parser.parse_args()
+
+    cache = PredictionCache(args.path)
+    if args.command == "compact":
+        removed = cache.compact(args.max_age_days, args.max_entries, args.keep_checkpoint)
+        print(f"Removed {removed:,} entries")
+
+    s = cache.stats()
+    print(f"{cache.path} ({s['size_mb']} MB)")
+    for ckpt, n in s["entries"].items():
+        print(f"  checkpoint {ckpt}: {n:,} texts")
+    if s["recent_runs"]:
+        print("Recent runs:")
+        for finished, ckpt, hits, misses in s["recent_runs"]:
+            total = hits + misses
+            rate = hits / total if total else 0.0
+            print(f"  {time.strftime('%Y-%m-%d %H:%M', time.localtime(finished))}  {ckpt}  "
+                  f"{hits:,} hits / {misses:,} misses ({rate:.1%} hit rate)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+score_reviews.py — Batch sentiment scoring with the fine-tuned RoBERTa model
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Usage:
+    python pipeline/score_reviews.py --input data/data_cleaned.csv \\
+        --output data/data_with_predictions_v2.csv [--chunksize 100000] [--threads 8]
+
+Writes the columns notebooks/02_review_classification_v2.ipynb adds
+(predicted_label, predicted_score, score_negative, score_neutral,
+score_positive) without running the notebook. The input CSV is read in
+chunks and each scored chunk is appended to the output, so memory does not
+grow with the file.
+
+Compute is spent once per distinct text:
+    - identical texts share one forward pass; about a third of reviews are
+      exact duplicates such as "good" or "great". Texts are matched and
+      scored exactly as the notebook passes them to the model (missing ->
+      ""), since RoBERTa's tokenizer sees newlines and runs of spaces
+    - an LRU memo carries scores of recent texts across chunks
+    - a persistent prediction cache (prediction_cache.py) remembers every
+      text scored with this checkpoint on earlier runs, so a nightly
+      rescore only pays for new reviews (--no-cache to skip it)
+    - the remaining texts are sorted by token length, so each batch pads
+      to a similar length
+"""
+
+import argparse
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from prediction_cache import CACHE_PATH, PredictionCache, checkpoint_id
+
+BASE_DIR = Path(__file__).parent.parent
+MODEL_PATH = os.getenv(
+    "SENTIMENT_MODEL", str(BASE_DIR / "notebooks" / "models" / "amazon_roberta_v2_final")
+)
+TEXT_COL = "reviews.text"
+MAX_LENGTH = 256  # same truncation as training
+BATCH_SIZE = 64
+CHUNKSIZE = 100_000
+MEMO_SIZE = 200_000  # distinct texts remembered across chunks
+
+
+def review_text(text) -> str:
+    """Dedup key and model input, as the notebook's fillna("").astype(str)."""
+    if isinstance(text, str):
+        return text
+    return "" if pd.isna(text) else str(text)
+
+
+class SentimentScorer:
+    """Fine-tuned classifier plus a memo of scored texts; scores each distinct text once."""
+
+    def __init__(self, model_path=MODEL_PATH, threads=None, batch_size=BATCH_SIZE,
+                 max_length=MAX_LENGTH, memo_size=MEMO_SIZE, cache_path=CACHE_PATH):
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_path).to(self.device)
+        self.model.eval()
+        id2label = self.model.config.id2label
+        self.labels = [id2label[i] for i in range(len(id2label))]
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self.checkpoint = checkpoint_id(model_path)
+        self.cache = PredictionCache(cache_path, self.checkpoint) if cache_path else None
+        self.rows = 0
+        self.forward_texts = 0
+
+    def score(self, texts) -> np.ndarray:
+        """Class probabilities (rows x labels) for raw review texts."""
+        keys = [review_text(t) for t in texts]
+        self.rows += len(keys)
+
+        found = {}
+        todo = []
+        for k in dict.fromkeys(keys):
+            if k in self._memo:
+                self._memo.move_to_end(k)
+                found[k] = self._memo[k]
+            else:
+                todo.append(k)
+        if todo and self.cache is not None:
+            cached = self.cache.get_many(todo)
+            found.update(cached)
+            self._remember(list(cached), list(cached.values()))
+            todo = [k for k in todo if k not in cached]
+        if todo:
+            probs = self._forward(todo)
+            found.update(zip(todo, probs))
+            self._remember(todo, probs)
+            if self.cache is not None:
+                self.cache.put_many(dict(zip(todo, probs)))
+        return np.stack([found[k] for k in keys]) if keys else np.empty((0, len(self.labels)))
+
+    def _remember(self, texts, probs):
+        for text, p in zip(texts, probs):
+            self._memo[text] = p
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    def _forward(self, texts) -> np.ndarray:
+        """Score distinct texts in length-sorted batches, results in input order."""
+        import torch
+
+        encoded = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        order = np.argsort([len(ids) for ids in encoded["input_ids"]], kind="stable")
+        probs = np.empty((len(texts), len(self.labels)), dtype=np.float32)
+
+        for start in range(0, len(order), self.batch_size):
+            idx = order[start:start + self.batch_size]
+            batch = self.tokenizer.pad(
+                {k: [encoded[k][i] for i in idx] for k in ("input_ids", "attention_mask")},
+                return_tensors="pt",
+            ).to(self.device)
+            with torch.inference_mode():
+                logits = self.model(**batch).logits
+            probs[idx] = torch.softmax(logits.float(), dim=-1).cpu().numpy()
+
+        self.forward_texts += len(texts)
+        return probs
+
+    def stats(self):
+        return {
+            "rows": self.rows,
+            "forward_texts": self.forward_texts,
+            "saved": round(1 - self.forward_texts / self.rows, 4) if self.rows else 0.0,
+            "memo_entries": len(self._memo),
+        }
+
+
+def add_predictions(df, probs, labels):
+    """Append the notebook's prediction columns to a chunk."""
+    best = probs.argmax(axis=1)
+    df["predicted_label"] = np.asarray(labels, dtype=object)[best]
+    df["predicted_score"] = probs.max(axis=1)
+    for i, label in enumerate(labels):
+        df[f"score_{label.lower()}"] = probs[:, i]
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score review sentiment with the fine-tuned RoBERTa model")
+    parser.add_argument("--input", required=True, help="CSV with a review text column")
+    parser.add_argument("--output", required=True, help="CSV to write (input columns + predictions)")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--text-col", default=TEXT_COL)
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads (default: torch's choice)")
+    parser.add_argument("--memo-size", type=int, default=MEMO_SIZE)
+    parser.add_argument("--cache", default=str(CACHE_PATH), help="prediction cache database")
+    parser.add_argument("--no-cache", action="store_true", help="score every distinct text with the model")
+    args = parser.parse_args()
+
+    scorer = SentimentScorer(args.model, threads=args.threads, batch_size=args.batch_size,
+                             memo_size=args.memo_size, cache_path=None if args.no_cache else args.cache)
+    print(f"Model: {args.model} ({scorer.device}, checkpoint {scorer.checkpoint}, labels {scorer.labels})")
+
+    start = time.perf_counter()
+    output = Path(args.output)
+    for i, chunk in enumerate(pd.read_csv(args.input, chunksize=args.chunksize)):
+        probs = scorer.score(chunk[args.text_col].tolist())
+        add_predictions(chunk, probs, scorer.labels)
+        chunk.to_csv(output, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        s = scorer.stats()
+        print(f"  chunk {i + 1}: {s['rows']:,} rows, {s['forward_texts']:,} forward passes "
+              f"({s['saved']:.1%} saved by dedup and cache)")
+
+    elapsed = time.perf_counter() - start
+    s = scorer.stats()
+    print(f"Scored {s['rows']:,} reviews in {elapsed:.1f}s ({s['rows'] / elapsed:,.0f} rows/s), "
+          f"{s['forward_texts']:,} distinct texts through the model")
+    if scorer.cache is not None:
+        scorer.cache.record_run()
+        c = scorer.cache.stats()
+        print(f"Prediction cache: {c['hits']:,} hits, {c['misses']:,} misses ({c['hit_rate']:.1%}), "
+              f"{sum(c['entries'].values()):,} entries")
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+summarize_api.py — Cluster and product summaries through an LLM API, concurrently and resumably
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Usage:
+    python pipeline/summarize_api.py [--data-dir data] [--output data/summaries_api.json]
+                                     [--provider anthropic|openai] [--model M] [--base-url URL]
+                                     [--concurrency 8] [--rpm 50] [--tpm N] [--fresh]
+
+Builds the same prompts as 04_summarization_api.ipynb (stats plus sampled
+reviews per product, one article per cluster, one summary per product with
+at least 20 reviews) and sends them through pipeline/llm_runner.py instead
+of one call after another. Answers are journaled to <output>.journal.jsonl
+as they arrive: after a crash or Ctrl+C, run the same command again and
+only the missing summaries are requested. --fresh ignores the journal.
+
+Writes the notebook's summaries_api.json schema (provider, model,
+cluster_summaries, product_summaries) once every job has an answer; if some
+still fail after retries, nothing is written and the command exits 1.
+
+Offline, against the stub (pipeline/llm_stub.py):
+    python pipeline/llm_stub.py &
+    python pipeline/summarize_api.py --base-url http://127.0.0.1:8765 --output /tmp/summaries.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from dataset import DATA_DIR, load_reviews
+from llm_runner import CONCURRENCY, PROVIDERS, RPM, Journal, Runner
+
+try:
+    from dotenv import find_dotenv, load_dotenv
+except ImportError:
+    load_dotenv = None
+
+MODELS = {
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-sonnet-4-20250514",
+}
+REVIEW_COLS = ["cluster_name", "name", "reviews.text", "reviews.rating", "sentiment",
+               "predicted_label", "predicted_score"]
+MIN_REVIEWS_FOR_PRODUCT_SUMMARY = 20
+CLUSTER_MAX_TOKENS = 1500
+PRODUCT_MAX_TOKENS = 600
+
+# ---------------- Prompts (as in 04_summarization_api.ipynb) ----------------
+SYSTEM_PROMPT = ("You are a consumer product analyst writing recommendation articles based on real \n"
+                 "customer reviews. Write in a clear, professional tone. Base all claims on the review data provided.\n"
+                 "Do not invent facts or reviews. If data is limited, say so.")
+
+
+CLUSTER_SUMMARY_PROMPT = """Write a recommendation article for the "{cluster_name}" product category.
+
+Category overview:
+- {total_products} products
+- {total_reviews:,} total customer reviews
+- Average rating: {avg_rating}/5
+
+Products in this category (sorted by review count):
+{product_list}
+
+Sample reviews from top products:
+{sample_reviews}
+
+Write the article with these sections:
+1. **Category Overview** — Brief intro to this product category and overall customer satisfaction
+2. **Top 3 Recommended Products** — Based on ratings, review count, and review sentiment. For each: name, why it's recommended, key strengths from reviews
+3. **Common Complaints** — Top 3-5 recurring issues across the category based on negative reviews
+4. **Worst Rated Product** — Which product has the most complaints and why
+5. **Buying Recommendation** — Brief conclusion with advice for shoppers
+
+Keep it under 600 words."""
+
+
+PRODUCT_SUMMARY_PROMPT = """Write a concise product review summary for:
+
+Product: {product_name}
+
+Stats:
+- Total reviews: {total_reviews}
+- Average rating: {avg_rating}/5
+- Positive: {pct_positive}%
+- Negative: {pct_negative}%
+- Neutral: {pct_neutral}%
+
+Sample reviews:
+{sample_reviews}
+
+Write a summary with:
+1. **Overall Verdict** — One sentence recommendation (Buy / Consider / Avoid)
+2. **Strengths** — Top 3 positives from reviews
+3. **Weaknesses** — Top 3 negatives from reviews
+4. **Best For** — What type of buyer this product suits
+
+Keep it under 200 words."""
+
+
+def get_product_stats(product_df):
+    """Compute summary stats for a product."""
+    total = len(product_df)
+    avg_rating = product_df["reviews.rating"].mean()
+
+    sentiment_counts = product_df["predicted_label"].value_counts()
+    pct_positive = sentiment_counts.get("POSITIVE", 0) / total * 100
+    pct_negative = sentiment_counts.get("NEGATIVE", 0) / total * 100
+    pct_neutral = sentiment_counts.get("NEUTRAL", 0) / total * 100
+
+    return {
+        "total_reviews": total,
+        "avg_rating": round(float(avg_rating), 2),
+        "pct_positive": round(float(pct_positive), 1),
+        "pct_negative": round(float(pct_negative), 1),
+        "pct_neutral": round(float(pct_neutral), 1)
+    }
+
+
+def sample_reviews(product_df, n_positive=5, n_negative=5, n_neutral=3, min_words=5):
+    """Sample diverse reviews for a product, prioritizing longer reviews."""
+    text = product_df["reviews.text"].fillna("").astype(str)
+    word_count = text.str.split().str.len()
+    keep = (word_count >= min_words).to_numpy()
+    text, word_count = text[keep], word_count[keep]
+    labels, ratings = product_df["predicted_label"][keep], product_df["reviews.rating"][keep]
+
+    sampled = []
+    for label, n in [("POSITIVE", n_positive), ("NEGATIVE", n_negative), ("NEUTRAL", n_neutral)]:
+        subset = word_count[(labels == label).to_numpy()]
+        # Longest first, same (unstable) sort as the notebook so ties pick the same reviews
+        for idx in subset.sort_values(ascending=False).head(n).index:
+            sampled.append(f"[{label}] (Rating: {ratings[idx]}) {text[idx][:500]}")
+    return sampled
+
+
+def build_clusters(df):
+    """{cluster: {"products", "total_reviews", "total_products", "avg_rating"}}, clusters in data order."""
+    clusters = {}
+    for cluster_name, cluster_df in df.groupby("cluster_name", sort=False, observed=True):
+        products = []
+        for product_name, product_df in cluster_df.groupby("name", sort=False, observed=True):
+            products.append({
+                "name": product_name,
+                "stats": get_product_stats(product_df),
+                "sample_reviews": sample_reviews(product_df)
+            })
+        products.sort(key=lambda x: x["stats"]["total_reviews"], reverse=True)
+        clusters[cluster_name] = {
+            "products": products,
+            "total_reviews": len(cluster_df),
+            "total_products": len(products),
+            "avg_rating": round(float(cluster_df["reviews.rating"].mean()), 2)
+        }
+    return clusters
+
+
+def build_cluster_prompt(cluster_name, cluster_data):
+    """Build the full prompt for a cluster summary."""
+    product_lines = []
+    for p in cluster_data["products"]:
+        s = p["stats"]
+        product_lines.append(
+            f"- {p['name'][:80]}: {s['total_reviews']} reviews, "
+            f"avg {s['avg_rating']}/5, {s['pct_positive']}% positive, {s['pct_negative']}% negative"
+        )
+
+    # Sample reviews from top 3 products (by review count)
+    all_reviews = []
+    for p in cluster_data["products"][:3]:
+        all_reviews.append(f"\n--- {p['name'][:60]} ---")
+        all_reviews.extend(p["sample_reviews"][:8])
+
+    return CLUSTER_SUMMARY_PROMPT.format(
+        cluster_name=cluster_name,
+        total_products=cluster_data["total_products"],
+        total_reviews=cluster_data["total_reviews"],
+        avg_rating=cluster_data["avg_rating"],
+        product_list="\n".join(product_lines),
+        sample_reviews="\n".join(all_reviews)
+    )
+
+
+def build_product_prompt(product):
+    stats = product["stats"]
+    return PRODUCT_SUMMARY_PROMPT.format(
+        product_name=product["name"],
+        total_reviews=stats["total_reviews"],
+        avg_rating=stats["avg_rating"],
+        pct_positive=stats["pct_positive"],
+        pct_negative=stats["pct_negative"],
+        pct_neutral=stats["pct_neutral"],
+        sample_reviews="\n".join(product["sample_reviews"])
+    )
+
+
+def build_jobs(clusters, min_reviews=MIN_REVIEWS_FOR_PRODUCT_SUMMARY):
+    """One job per cluster, then one per product with enough reviews, in the notebook's order."""
+    jobs = [{"id": f"cluster:{name}", "kind": "cluster", "key": name, "system": SYSTEM_PROMPT,
+             "prompt": build_cluster_prompt(name, data), "max_tokens": CLUSTER_MAX_TOKENS}
+            for name, data in clusters.items()]
+    for cluster_name, data in clusters.items():
+        for p in data["products"]:
+            if p["stats"]["total_reviews"] >= min_reviews:
+                jobs.append({"id": f"product:{p['name']}", "kind": "product", "key": p["name"],
+                             "cluster": cluster_name, "stats": p["stats"], "system": SYSTEM_PROMPT,
+                             "prompt": build_product_prompt(p), "max_tokens": PRODUCT_MAX_TOKENS})
+    return jobs
+
+
+def summaries_output(jobs, results, provider, model):
+    """The notebook's summaries_api.json structure, in job order."""
+    cluster_summaries, product_summaries = {}, {}
+    for job in jobs:
+        text = results[job["id"]]["text"]
+        if job["kind"] == "cluster":
+            cluster_summaries[job["key"]] = text
+        else:
+            product_summaries[job["key"]] = {"cluster": job["cluster"], "stats": job["stats"], "summary": text}
+    return {
+        "provider": provider,
+        "model": model,
+        "cluster_summaries": cluster_summaries,
+        "product_summaries": product_summaries
+    }
+
+
+def load_frame(data_dir):
+    df = load_reviews(REVIEW_COLS, data_dir=data_dir)
+    if "predicted_label" not in df.columns:
+        df["predicted_label"] = df["sentiment"].str.upper()  # star-based sentiment, as in the notebook
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate cluster and product summaries through an LLM API")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--output", default=None, help="default: <data-dir>/summaries_api.json")
+    parser.add_argument("--journal", default=None, help="default: <output>.journal.jsonl")
+    parser.add_argument("--provider", choices=list(PROVIDERS), default="anthropic")
+    parser.add_argument("--model", default=None, help="default: the notebook's model for the provider")
+    parser.add_argument("--base-url", default=None, help="API root, e.g. the stub's http://127.0.0.1:8765")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rpm", type=float, default=RPM, help="requests per minute")
+    parser.add_argument("--tpm", type=float, default=None, help="tokens per minute (prompt estimate + max_tokens)")
+    parser.add_argument("--min-reviews", type=int, default=MIN_REVIEWS_FOR_PRODUCT_SUMMARY)
+    parser.add_argument("--fresh", action="store_true", help="ignore (and replace) the journal")
+    args = parser.parse_args()
+
+    if load_dotenv is not None:
+        load_dotenv(find_dotenv(usecwd=True))
+    output = Path(args.output or os.path.join(args.data_dir, "summaries_api.json"))
+    journal_path = Path(args.journal or f"{output}.journal.jsonl")
+    model = args.model or MODELS[args.provider]
+    api_key = os.getenv(PROVIDERS[args.provider]["key_env"])
+    if not api_key:
+        if args.base_url is None:
+            raise SystemExit(f"{PROVIDERS[args.provider]['key_env']} not set (in the environment or .env)")
+        api_key = "stub"
+
+    df = load_frame(args.data_dir)
+    jobs = build_jobs(build_clusters(df), args.min_reviews)
+    if args.fresh and journal_path.exists():
+        journal_path.unlink()
+    journal = Journal(journal_path)
+    print(f"{len(jobs)} prompts ({sum(j['kind'] == 'cluster' for j in jobs)} clusters), "
+          f"{args.provider} {model}, journal {journal_path}")
+
+    def progress(job, entry):
+        print(f"  done {job['id'][:70]} ({len(entry['text'])} chars, attempt {entry['attempts']})")
+
+    runner = Runner(args.provider, model, api_key, base_url=args.base_url, concurrency=args.concurrency,
+                    rpm=args.rpm, tpm=args.tpm)
+    start = time.perf_counter()
+    try:
+        results = asyncio.run(runner.run(jobs, journal, on_done=progress))
+    except KeyboardInterrupt:
+        raise SystemExit(f"Interrupted; {len(journal.entries)} answers kept in {journal_path}, rerun to resume")
+    finally:
+        journal.close()
+    seconds = time.perf_counter() - start
+
+    s = runner.stats
+    p50 = float(np.median(s["latencies"])) if s["latencies"] else 0.0
+    print(f"{s['done']} new, {s['resumed']} resumed, {s['failed']} failed in {seconds:.1f}s "
+          f"({s['attempts']} requests, {s['retries']} retries, {s['rate_limited']} rate limited, "
+          f"p50 latency {p50:.2f}s)")
+    if s["failed"]:
+        for job_id, error in s["errors"].items():
+            print(f"  FAILED {job_id[:70]}: {error}", file=sys.stderr)
+        print(f"{output} not written; rerun to retry the failed prompts", file=sys.stderr)
+        raise SystemExit(1)
+
+    out = summaries_output(jobs, results, args.provider, model)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, output)
+    print(f"Saved {output}: {len(out['cluster_summaries'])} cluster, "
+          f"{len(out['product_summaries'])} product summaries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+synthetic.py — Deterministic synthetic review corpus in the layout of the real data
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Usage:
+    python pipeline/synthetic.py --scale 1m --output /tmp/corpus-1m
+    python pipeline/synthetic.py --rows 250000 --products 2000 --clusters 24 --output /tmp/corpus [--seed 0]
+
+Writes data_with_clusters.csv, data_with_predictions_v2.csv and
+product_clusters.csv (the files 03_clustering.ipynb and 02_review_classification_v2.ipynb
+leave in data/) plus synthetic.json with the parameters and what came out,
+so every script that reads data/ runs on it unchanged (--data-dir).
+
+The shape follows the real dump (data/product_clusters.csv):
+    products   the 65 real products, in "lines": line k repeats the catalog
+               with weights / k, so each line keeps the real heavy head
+               (AAA batteries ~30% of it) and lines get rarer down the tail;
+               line 1 is the real catalog, names and all
+    clusters   the 6 real clusters, times cluster groups ("Fire Tablets 2"...);
+               lines are dealt to groups in turn, line 1 to the first
+    ratings    each product's distribution is the overall one (90% 4-5
+               stars, 4.3% 3 stars, 5.6% 1-2) tilted to its real average
+    texts      per cluster and sentiment sentence pools, 1-4 sentences, and
+               short stock phrases ("Great product") that repeat as in the real data
+    labels     the v2 classifier's accuracy (~95.5%), errors mostly toward NEUTRAL
+
+Rows are generated in chunks of CHUNK_ROWS, each from its own seed, so
+memory stays bounded at 10M rows and a corpus is fully determined by
+(rows, products, clusters, seed).
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pandas writes the CSVs, ~20x slower
+    pa = None
+
+TEMPLATE_PATH = Path(__file__).resolve().parent.parent / "data" / "product_clusters.csv"
+CHUNK_ROWS = 500_000
+META_NAME = "synthetic.json"
+
+# rows, products, clusters
+SCALES = {
+    "10k": (10_000, 65, 6),
+    "1m": (1_000_000, 5_000, 60),
+    "10m": (10_000_000, 50_000, 600),
+}
+
+REVIEW_COLS = ["id", "name", "categories", "primaryCategories", "reviews.date", "reviews.username",
+               "reviews.rating", "reviews.text", "sentiment"]
+SCORE_COLS = ["score_negative", "score_neutral", "score_positive"]
+LABELS = np.array(["NEGATIVE", "NEUTRAL", "POSITIVE"])
+SENTIMENTS = np.array(["Negative", "Neutral", "Positive"])
+
+# Star shares of the real dump: 1-2 stars 5.6%, 3 stars 4.3%, 4-5 stars 90.2%
+RATING_P = np.array([0.031, 0.025, 0.043, 0.235, 0.666])
+# Rows: true sentiment, columns: predicted label (negative, neutral, positive)
+CONFUSION = np.array([[0.85, 0.10, 0.05],
+                      [0.15, 0.55, 0.30],
+                      [0.005, 0.015, 0.98]])
+RATING_JITTER = 0.15  # sd of a product line's average rating around the real product's
+DATE_START, DATE_DAYS = "2014-10-01", 1300
+
+NOUNS = {
+    "Fire Tablets": ["tablet", "screen", "apps", "battery life", "games", "parental controls", "camera",
+                     "kids case", "storage", "alexa"],
+    "Batteries & Household": ["batteries", "price", "pack", "charge", "remote", "value", "power", "flashlight"],
+    "E-Readers": ["kindle", "screen", "backlight", "books", "page turns", "battery", "font", "glare"],
+    "Smart Speakers": ["echo", "alexa", "sound", "speaker", "voice recognition", "music", "smart home", "wifi"],
+    "Accessories": ["charger", "cable", "case", "cover", "adapter", "fit", "charging", "stand"],
+    "Media & Home": ["remote", "tv", "streaming", "fire stick", "picture", "setup", "netflix", "menu"],
+}
+CATEGORY_LABELS = {
+    "Fire Tablets": ["Tablets", "Fire Tablets", "Amazon Tablets", "All Tablets", "Computers & Tablets",
+                     "Computers/Tablets & Networking", "iPad & Tablets", "Kids' Tablets", "Android Tablets"],
+    "Batteries & Household": ["Health & Beauty", "Household Batteries", "Batteries", "AA Batteries",
+                              "AAA Batteries", "Office Supplies", "Home Improvement", "Camera & Photo"],
+    "E-Readers": ["Amazon Ereaders", "Kindle E-readers", "Amazon Book Reader", "E-Readers & Accessories",
+                  "E-Readers", "Tablets & eBook Readers", "Tablets & E-Readers"],
+    "Smart Speakers": ["Smart Speakers", "Amazon Echo", "Amazon Home", "Home Security & Automation",
+                       "Surveillance & Smart Home Electronics", "Smart Home", "Speakers"],
+    "Accessories": ["Accessories", "Computers & Accessories", "Hubs & Accessories", "Digital Device Accessory",
+                    "Amazon Device Accessories", "Power Adapters", "Cases", "Cables"],
+    "Media & Home": ["TV & Video", "Streaming Media Players", "Media", "Amazon Fire TV", "Home Theater",
+                     "Movies & TV", "Remote Controls"],
+}
+# Labels 03_clustering.ipynb's clean_categories drops as noise, and ones every product has
+NOISE_LABELS = ["Featured Brands", "Amazon", "Digital Device 3", "Frys", "Electronics Deals", "Back To College",
+                "Top Rated", "See more"]
+COMMON_LABELS = ["Electronics", "Electronics Features", "Consumer Electronics", "Amazon Devices"]
+
+SHORT = {  # stock phrases, and the share of reviews that are one
+    "Negative": (["Junk", "Stopped working", "Waste of money", "Do not buy", "Returned it"], 0.05),
+    "Neutral": (["Its ok", "Okay", "Average", "Not bad", "Does the job"], 0.15),
+    "Positive": (["Great", "Good", "Great product", "Love it", "Excellent", "Works great", "Great value",
+                  "Great price"], 0.30),
+}
+TEMPLATES = {
+    "Negative": ["The {n} stopped working after {t}.", "The {n} {bad} after {t}.", "Had to return it, the {n} {bad}.",
+                 "Very slow and the {n} keeps freezing.", "The {n} is {poor}.", "Would not recommend this {n}.",
+                 "Customer service was no help with the {n}.", "Batteries died quickly and the {n} {bad}.",
+                 "Disappointed, the {n} is {poor} and the {n2} {bad}.", "Not worth the money, {n} {bad}."],
+    "Neutral": ["The {n} is okay but the {n2} could be better.", "It's fine for the price, {n} is average.",
+                "Does the job, nothing special about the {n}.", "The {n} is good but the {n2} is {poor}.",
+                "Decent {n}, I expected more.", "Works, but the {n} {bad} sometimes."],
+    "Positive": ["Great {n} for the price.", "Love the {n}, {good}.", "Bought this for my {who} and {who_say}.",
+                 "The {n} is {good}.", "Easy to set up and the {n} is {good}.", "Excellent {n}, would buy again.",
+                 "My {who} uses the {n} every day.", "Best {n} I have owned, {good}.",
+                 "The {n} and the {n2} are both {good}.", "Good value, the {n} works as expected."],
+}
+FILL = {
+    "t": ["two weeks", "a month", "a few days", "three months", "one use", "a week"],
+    "bad": ["broke", "died", "stopped charging", "quit working", "keeps disconnecting", "froze", "leaked"],
+    "poor": ["terrible", "too slow", "poor quality", "cheap", "unreliable", "hard to use"],
+    "good": ["works great", "easy to use", "very fast", "perfect", "awesome", "really good", "clear and bright"],
+    "who": ["kids", "son", "daughter", "wife", "husband", "mom", "dad", "grandson", "granddaughter"],
+    "who_say": ["they love it", "it works great", "they use it daily", "it was a hit"],
+}
+USER_NAMES = ["Mike", "Sarah", "Dave", "Jen", "Chris", "Amy", "John", "Lisa", "Tom", "Kim", "Bob", "Sue",
+              "Matt", "Karen", "Joe", "Amanda", "reader", "techguy", "mom", "buyer"]
+SENTENCE_POOL = 400  # distinct sentences per cluster and sentiment
+
+
+def load_template(path=TEMPLATE_PATH):
+    """The real catalog, most-reviewed product first."""
+    template = pd.read_csv(path).sort_values("review_count", ascending=False, kind="stable")
+    return template.reset_index(drop=True)
+
+
+def tilted_rating_p(means, p=RATING_P, iterations=60):
+    """(n, 5) star distributions: p tilted by exp(theta * stars) to each mean (bisection on theta)."""
+    stars = np.arange(1, 6)
+    means = np.clip(np.asarray(means, dtype=float), 1.05, 4.95)
+    lo, hi = np.full(len(means), -20.0), np.full(len(means), 20.0)
+    for _ in range(iterations):
+        theta = (lo + hi) / 2
+        w = p * np.exp(np.outer(theta, stars))
+        mean = (w * stars).sum(axis=1) / w.sum(axis=1)
+        lo, hi = np.where(mean < means, theta, lo), np.where(mean < means, hi, theta)
+    w = p * np.exp(np.outer((lo + hi) / 2, stars))
+    return w / w.sum(axis=1, keepdims=True)
+
+
+def product_id(rng, n):
+    """Datafiniti-style 20-character ids ("AVqkIhwDv8e3D1O-lebb")."""
+    alphabet = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"))
+    chars = alphabet[rng.integers(0, len(alphabet), (n, 18))]
+    return ["AV" + "".join(row) for row in chars]
+
+
+def make_catalog(n_products, n_clusters, seed=0, template=None):
+    """One row per product: name, cluster, weight (share of reviews), target avg rating, categories."""
+    template = load_template() if template is None else template
+    rng = np.random.default_rng([seed, 0])
+    pick = random.Random(seed)
+    bases = template.drop_duplicates("cluster").sort_values("cluster")
+    base_id = dict(zip(bases["cluster_name"], bases["cluster"]))
+    n_base = len(base_id)
+    n_groups = max(1, round(n_clusters / n_base))
+    lines = math.ceil(n_products / len(template))
+
+    line = np.repeat(np.arange(lines), len(template))[:n_products]
+    j = np.tile(np.arange(len(template)), lines)[:n_products]
+    group = line % n_groups
+    base = template["cluster_name"].to_numpy()[j]
+    names = template["name"].to_numpy()[j]
+    counts = template["review_count"].to_numpy(dtype=float)[j]
+    weight = counts / (line + 1)
+    rating = template["avg_rating"].to_numpy()[j] + np.where(line > 0, rng.normal(0, RATING_JITTER, n_products), 0)
+
+    categories = []
+    for b in base:
+        own = CATEGORY_LABELS[b]
+        labels = (pick.sample(own, pick.randint(3, min(7, len(own)))) + pick.sample(COMMON_LABELS, pick.randint(1, 2))
+                  + pick.sample(NOISE_LABELS, pick.randint(0, 2)))
+        pick.shuffle(labels)
+        categories.append(",".join(labels))
+
+    return pd.DataFrame({
+        "id": product_id(rng, n_products),
+        "name": [n if k == 0 else f"{n} #{k + 1}" for n, k in zip(names, line)],
+        "categories": categories,
+        "primary_category": template["primary_category"].to_numpy()[j],
+        "cluster": group * n_base + np.array([base_id[b] for b in base]),
+        "cluster_name": [b if g == 0 else f"{b} {g + 1}" for b, g in zip(base, group)],
+        "base_cluster": base,
+        "weight": weight / weight.sum(),
+        "target_rating": np.clip(rating, 1.0, 5.0),
+    })
+
+
+def sentence_pools(seed=0):
+    """{(base cluster, sentiment): array of distinct sentences}."""
+    pick = random.Random(seed)
+    pools = {}
+    for base, nouns in NOUNS.items():
+        for sentiment, templates in TEMPLATES.items():
+            sentences = set()
+            for _ in range(SENTENCE_POOL * 20):
+                if len(sentences) >= SENTENCE_POOL:
+                    break
+                n, n2 = pick.sample(nouns, 2)
+                fill = {k: pick.choice(v) for k, v in FILL.items()}
+                text = pick.choice(templates).format(n=n, n2=n2, **fill)
+                sentences.add(text[0].upper() + text[1:])
+            pools[(base, sentiment)] = np.array(sorted(sentences), dtype=object)
+    return pools
+
+
+def review_texts(rng, base, sentiment, pools):
+    """Review texts for rows with the given base cluster and sentiment arrays."""
+    texts = np.empty(len(base), dtype=object)
+    for (b, s), pool in pools.items():
+        rows = np.flatnonzero((base == b) & (sentiment == s))
+        if not len(rows):
+            continue
+        idx = rng.integers(0, len(pool), (len(rows), 4))
+        n_sentences = 1 + rng.binomial(3, 0.35, len(rows))
+        text = pool[idx[:, 0]]
+        for k in range(1, 4):
+            text = np.where(n_sentences > k, text + " " + pool[idx[:, k]], text)
+        phrases, share = SHORT[s]
+        short = rng.random(len(rows)) < share
+        text[short] = np.array(phrases, dtype=object)[rng.integers(0, len(phrases), short.sum())]
+        texts[rows] = text
+    return texts
+
+
+def make_reviews(catalog, n_rows, seed=0, chunk=0, n_users=None, pools=None, star_p=None, dates=None):
+    """n_rows reviews of the catalog's products, every column of both CSVs."""
+    rng = np.random.default_rng([seed, 2, chunk])
+    pools = sentence_pools(seed) if pools is None else pools
+    star_p = tilted_rating_p(catalog["target_rating"]) if star_p is None else star_p
+    if dates is None:
+        days = pd.date_range(DATE_START, periods=DATE_DAYS, freq="D")
+        dates = np.array(days.strftime("%Y-%m-%dT00:00:00.000Z"), dtype=object)
+    n_users = n_users or max(1, n_rows // 3)
+
+    product = rng.choice(len(catalog), n_rows, p=catalog["weight"].to_numpy())
+    cdf = star_p.cumsum(axis=1)[product]
+    rating = 1 + (rng.random(n_rows)[:, None] > cdf[:, :4]).sum(axis=1)
+    true = np.where(rating <= 2, 0, np.where(rating == 3, 1, 2))
+    sentiment = SENTIMENTS[true]
+
+    # Predicted label from the confusion row of the true sentiment, confident when right
+    pred = (rng.random(n_rows)[:, None] > CONFUSION.cumsum(axis=1)[true][:, :2]).sum(axis=1)
+    top = np.where(pred == true, 0.75 + 0.25 * rng.beta(4, 1, n_rows), 0.4 + 0.5 * rng.random(n_rows))
+    split = rng.random(n_rows) * (1 - top)
+    scores = np.empty((n_rows, 3))
+    scores[np.arange(n_rows), pred] = top
+    scores[np.arange(n_rows), (pred + 1) % 3] = split
+    scores[np.arange(n_rows), (pred + 2) % 3] = 1 - top - split
+    scores = scores.round(6)  # smaller files, and both CSV writers print the same digits
+
+    users = rng.integers(0, n_users, n_rows)
+    names = np.array(USER_NAMES, dtype=object)
+    day = np.minimum((rng.beta(5, 2, n_rows) * DATE_DAYS).astype(int), DATE_DAYS - 1)
+    base = catalog["base_cluster"].to_numpy()[product]
+
+    take = catalog.iloc[product]
+    return pd.DataFrame({
+        "id": take["id"].to_numpy(),
+        "name": take["name"].to_numpy(),
+        "categories": take["categories"].to_numpy(),
+        "primaryCategories": take["primary_category"].to_numpy(),
+        "reviews.date": dates[day],
+        "reviews.username": names[users % len(names)] + (users // len(names)).astype(str).astype(object),
+        "reviews.rating": rating,
+        "reviews.text": review_texts(rng, base, sentiment, pools),
+        "sentiment": sentiment,
+        "predicted_label": LABELS[pred],
+        "predicted_score": scores[np.arange(n_rows), pred],
+        "score_negative": scores[:, 0],
+        "score_neutral": scores[:, 1],
+        "score_positive": scores[:, 2],
+        "cluster": take["cluster"].to_numpy(),
+        "cluster_name": take["cluster_name"].to_numpy(),
+    })
+
+
+def append_csv(df, path, header):
+    """Write df to path (header: start the file, else append); pyarrow when installed."""
+    if pa is None:
+        df.to_csv(path, mode="w" if header else "a", header=header, index=False)
+        return
+    with open(path, "wb" if header else "ab") as f:
+        pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), f,
+                         pa_csv.WriteOptions(include_header=header))
+
+
+def write_corpus(output_dir, n_rows, n_products, n_clusters, seed=0, chunk_rows=CHUNK_ROWS, verbose=True):
+    """Write the three CSVs and synthetic.json to output_dir; returns the metadata."""
+    start = time.perf_counter()
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    catalog = make_catalog(n_products, n_clusters, seed)
+    pools = sentence_pools(seed)
+    star_p = tilted_rating_p(catalog["target_rating"])
+    dates = np.array(pd.date_range(DATE_START, periods=DATE_DAYS, freq="D").strftime("%Y-%m-%dT00:00:00.000Z"),
+                     dtype=object)
+
+    clusters_path, pred_path = out / "data_with_clusters.csv", out / "data_with_predictions_v2.csv"
+    counts = np.zeros(len(catalog), dtype=np.int64)
+    star_sums = np.zeros(len(catalog))
+    labels = pd.Series(0, index=SENTIMENTS)
+    position = pd.Series(np.arange(len(catalog)), index=catalog["name"])
+    n_chunks = math.ceil(n_rows / chunk_rows)
+    for chunk in range(n_chunks):
+        rows = min(chunk_rows, n_rows - chunk * chunk_rows)
+        df = make_reviews(catalog, rows, seed, chunk, max(1, n_rows // 3), pools, star_p, dates)
+        append_csv(df[REVIEW_COLS + ["cluster", "cluster_name"]], clusters_path, header=chunk == 0)
+        append_csv(df[REVIEW_COLS + ["predicted_label", "predicted_score"] + SCORE_COLS], pred_path, header=chunk == 0)
+        pos = position.loc[df["name"]].to_numpy()
+        counts += np.bincount(pos, minlength=len(catalog))
+        star_sums += np.bincount(pos, weights=df["reviews.rating"], minlength=len(catalog))
+        labels = labels.add(df["sentiment"].value_counts(), fill_value=0)
+        if verbose:
+            print(f"  chunk {chunk + 1}/{n_chunks}: {(chunk * chunk_rows + rows):,} rows")
+
+    # Products that got at least one review, as 03_clustering.ipynb saves them
+    reviewed = counts > 0
+    products = catalog.loc[reviewed, ["name", "cluster", "cluster_name", "primary_category"]].copy()
+    products.insert(1, "review_count", counts[reviewed])
+    products.insert(2, "avg_rating", star_sums[reviewed] / counts[reviewed])
+    products.sort_values("name").to_csv(out / "product_clusters.csv", index=False)
+
+    shares = np.sort(counts)[::-1] / n_rows
+    meta = {
+        "rows": n_rows, "products": n_products, "clusters": int(catalog["cluster"].nunique()), "seed": seed,
+        "chunk_rows": chunk_rows,
+        "reviewed_products": int(reviewed.sum()),
+        "sentiment_share": {k: round(float(v) / n_rows, 4) for k, v in labels.items()},
+        "top_product_share": round(float(shares[0]), 4),
+        "top_10_share": round(float(shares[:10].sum()), 4),
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+    (out / META_NAME).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return meta
+
+
+def read_meta(data_dir):
+    path = Path(data_dir) / META_NAME
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic review corpus shaped like the real data")
+    parser.add_argument("--output", required=True, help="folder for the CSVs (used as --data-dir later)")
+    parser.add_argument("--scale", choices=list(SCALES), default=None,
+                        help="preset rows / products / clusters: " + ", ".join(
+                            f"{k}={r:,}/{p:,}/{c}" for k, (r, p, c) in SCALES.items()))
+    parser.add_argument("--rows", type=int, default=None)
+    parser.add_argument("--products", type=int, default=None)
+    parser.add_argument("--clusters", type=int, default=None, help="rounded to a multiple of the 6 real ones")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, products, clusters = SCALES[args.scale or "10k"]
+    rows, products, clusters = args.rows or rows, args.products or products, args.clusters or clusters
+    print(f"Writing {rows:,} reviews of {products:,} products in ~{clusters} clusters to {args.output}/")
+    meta = write_corpus(args.output, rows, products, clusters, args.seed)
+    print(json.dumps(meta, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+aggregate.py — Single-pass review aggregation for the static site generator
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Every number in stats.json, clusters.json, clusters_local.json and
+products.json is derived from one groupby over the review table:
+
+    (cluster, product, sentiment, rating) -> reviews, reviews with text
+
+That table has at most clusters x products x 3 x 5 rows, so all the
+per-product and per-cluster metrics are rolled up from it without touching
+the review rows again. Rows come out in order of first appearance, which
+keeps the output ordering identical to the old per-product loop. Count
+tables from separate chunks merge by summing, which is what the streaming
+mode in ingest.py relies on.
+"""
+
+import numpy as np
+import pandas as pd
+
+KEY_COLS = ["cluster", "name", "sentiment", "rating"]
+
+
+def count_reviews(df, sentiment_col, cluster_col):
+    """Count reviews per (cluster, product, sentiment, rating) in one groupby pass."""
+    keys = pd.DataFrame({
+        "cluster": df[cluster_col] if cluster_col else "Unknown",
+        "name": df["name"],
+        "sentiment": df[sentiment_col] if sentiment_col in df.columns else np.nan,
+        "rating": df["reviews.rating"],
+        "has_text": df["reviews.text"].notna() if "reviews.text" in df.columns else False,
+    })
+    counts = (
+        keys.groupby(KEY_COLS, sort=False, dropna=False, observed=True)
+        .agg(reviews=("has_text", "size"), text_reviews=("has_text", "sum"))
+        .reset_index()
+    )
+    counts["text_reviews"] = counts["text_reviews"].astype(np.int64)
+    for col in ["cluster", "name", "sentiment"]:
+        # Categorical keys from chunked reads would not concatenate cleanly
+        counts[col] = counts[col].astype(object)
+    return counts
+
+
+def merge_counts(parts):
+    """Combine count tables from several chunks, keeping first-appearance order."""
+    return (
+        pd.concat(parts, ignore_index=True)
+        .groupby(KEY_COLS, sort=False, dropna=False)
+        .sum()
+        .reset_index()
+    )
+
+
+def _value_counts(counts, by):
+    """Rebuild value_counts() for each group: count descending, ties in first-seen order."""
+    vc = (
+        counts.dropna(subset=["sentiment"])
+        .groupby(by + ["sentiment"], sort=False, dropna=False, observed=True)
+        .agg(n=("reviews", "sum"), first=("order", "min"))
+        .reset_index()
+        .sort_values("first", kind="stable")
+        .sort_values("n", ascending=False, kind="stable")
+    )
+    out = {}
+    for row in vc.itertuples(index=False):
+        group = tuple(getattr(row, col) for col in by) if by else ()
+        dist = out.setdefault(group, {})
+        dist[str(row.sentiment).upper()] = int(row.n)
+    return out
+
+
+def prepare_counts(counts):
+    """Number the count rows in first-appearance order and add the rating sums."""
+    counts = counts.reset_index(drop=True)
+    counts["order"] = np.arange(len(counts))
+    rated = counts["rating"].notna()
+    counts["rated"] = np.where(rated, counts["reviews"], 0)
+    counts["rating_sum"] = np.where(rated, counts["rating"].fillna(0) * counts["reviews"], 0.0)
+    return counts
+
+
+def overall_metrics(counts):
+    """stats.json totals and distributions from prepared counts."""
+    rated = counts["rating"].notna()
+    rated_total = int(counts["rated"].sum())
+    rating_dist = (
+        counts[rated].groupby("rating")["reviews"].sum().sort_index()
+    )
+    return {
+        "total_reviews": int(counts["reviews"].sum()),
+        "total_products": int(counts["name"].dropna().nunique()),
+        "avg_rating": round(float(counts["rating_sum"].sum() / rated_total), 2)
+        if rated_total else float("nan"),
+        "sentiment_distribution": _value_counts(counts, []).get((), {}),
+        "rating_distribution": {str(int(k)): int(v) for k, v in rating_dist.items()},
+    }
+
+
+def product_metrics(counts):
+    """products.json entries, in first-appearance order.
+
+    Each entry only depends on that product's count rows, so any subset of
+    prepared counts gives the same entries for the products it contains.
+    """
+    by_product = (
+        counts.dropna(subset=["name"])
+        .groupby("name", sort=False, observed=True)
+        .agg(review_count=("reviews", "sum"), rated=("rated", "sum"),
+             rating_sum=("rating_sum", "sum"), first=("order", "min"))
+        .sort_values("first", kind="stable")
+    )
+    first_cluster = counts.set_index("order")["cluster"].loc[by_product["first"]].to_numpy()
+    product_sentiment = _value_counts(counts, ["name"])
+    return [
+        {
+            "name": name,
+            "cluster": cluster,
+            "review_count": int(row.review_count),
+            "avg_rating": round(float(row.rating_sum / row.rated), 2) if row.rated else float("nan"),
+            "sentiment": product_sentiment.get((name,), {}),
+        }
+        for (name, row), cluster in zip(by_product.iterrows(), first_cluster)
+    ]
+
+
+def cluster_metrics(counts):
+    """clusters.json entries, sorted by name like df.groupby; per cluster, like product_metrics."""
+    clusters = {}
+    in_cluster = counts.dropna(subset=["cluster"])
+    by_cluster_product = (
+        in_cluster.groupby(["cluster", "name"], observed=True)
+        .agg(reviews=("text_reviews", "sum"), rated=("rated", "sum"),
+             rating_sum=("rating_sum", "sum"))
+    )
+    by_cluster_product["avg_rating"] = by_cluster_product["rating_sum"] / by_cluster_product["rated"]
+    by_cluster = (
+        in_cluster.groupby("cluster", observed=True)
+        .agg(review_count=("reviews", "sum"), product_count=("name", "nunique"),
+             rated=("rated", "sum"), rating_sum=("rating_sum", "sum"))
+    )
+    cluster_sentiment = _value_counts(in_cluster, ["cluster"])
+
+    for name, row in by_cluster.iterrows():
+        top_products = (
+            by_cluster_product.loc[name, ["reviews", "avg_rating"]]
+            .sort_values("reviews", ascending=False)
+            .head(5)
+        )
+        clusters[name] = {
+            "review_count": int(row.review_count),
+            "product_count": int(row.product_count),
+            "avg_rating": round(float(row.rating_sum / row.rated), 2),
+            "sentiment": cluster_sentiment.get((name,), {}),
+            "top_products": [
+                {"name": pname, "reviews": int(prow["reviews"]),
+                 "avg_rating": round(float(prow["avg_rating"]), 2)}
+                for pname, prow in top_products.iterrows()
+            ],
+        }
+    return clusters
+
+
+def summarize_counts(counts, has_clusters=True):
+    """Roll the (cluster, product, sentiment, rating) counts up into every JSON metric."""
+    counts = prepare_counts(counts)
+    return {
+        "overall": overall_metrics(counts),
+        "products": product_metrics(counts),
+        "clusters": cluster_metrics(counts) if has_clusters else {},
+    }
+
+
+def aggregate_reviews(df, sentiment_col, cluster_col):
+    """Compute every per-product and per-cluster metric with a single groupby pass."""
+    counts = count_reviews(df, sentiment_col, cluster_col)
+    return summarize_counts(counts, has_clusters=cluster_col is not None)
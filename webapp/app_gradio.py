@@ -1,165 +1,57 @@
-import re
+import os
+import sys
 import json
 import tempfile
 from pathlib import Path
 import gradio as gr
 import pandas as pd
-import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 
-# ---------------- Model ----------------
-GEN_MODEL_NAME = "google/flan-t5-base"
-device = "cuda" if torch.cuda.is_available() else "cpu"
+# Parsing and generation live in their own modules so they can be imported
+# without the UI; the model itself is only loaded on first use
+from brief_parser import prettify_reason, parse_brief
+from summarizer import (
+    DECODING_PROFILES, DEFAULT_PROFILE, GEN_BATCH_SIZE,
+    generate_summaries, get_summary_cache, stream_summary_from_brief, warm_up,
+)
+# Concurrent "Generate Summary" clicks are batched into one generate call
+from inference_worker import INFERENCE_WORKER
+# EXPORT_WORKERS > 1 generates the export's summaries in forked worker processes
+from export_pool import EXPORT_WORKERS, resolve_workers, start_pool
+# Stage timings and /metrics when PROFILE_STAGES is set (see profiling.py)
+from profiling import PROFILER, serve_metrics, stage
+# pipeline/briefs.py turns raw clustered reviews into briefs
+sys.path.append(str(Path(__file__).resolve().parent.parent / "pipeline"))
+
+# Set GEN_WARMUP=0 to skip loading the model in the background at launch
+GEN_WARMUP = os.getenv("GEN_WARMUP", "1") != "0"
+# Stream the summary token by token (default), or set GEN_STREAM=0 to send
+# clicks through the micro-batching worker and show the summary when done
+GEN_STREAM = os.getenv("GEN_STREAM", "1") != "0"
+# With PROFILE_STAGES=1, serve Prometheus metrics on this port (0: don't)
+PROFILE_METRICS_PORT = int(os.getenv("PROFILE_METRICS_PORT", "0"))
+
+SUMMARY_PLACEHOLDER = "_Writing summary…_"
 
-dtype = torch.float16 if device == "cuda" else torch.float32
-tokenizer = AutoTokenizer.from_pretrained(GEN_MODEL_NAME)
-model = AutoModelForSeq2SeqLM.from_pretrained(
-    GEN_MODEL_NAME,
-    torch_dtype=dtype
-).to(device)
-model.eval()
-
-print("Device:", device)
-
-STATE = {"df": None}
-
-# ---------------- Clean complaint keywords ----------------
-STOP = {"don", "didn", "doesn", "dont", "isn", "wasn", "weren",
-        "cant", "couldn", "wouldn", "buy"}
-
-def prettify_reason(reason: str) -> str:
-    r = (reason or "").strip()
-    if not r:
-        return "No clear reason provided."
-
-    if ";" not in r and len(r.split()) > 5:
-        return r
-
-    toks = [t.strip().lower() for t in r.split(";") if t.strip()]
-    toks = [t for t in toks if len(t) >= 3 and t not in STOP]
-
-    seen = set()
-    cleaned = []
-    for t in toks:
-        if t not in seen:
-            seen.add(t)
-            cleaned.append(t)
-
-    cleaned = cleaned[:6]
-
-    if not cleaned:
-        return "Negative feedback appears general without a clear recurring issue."
-
-    return "Negative reviews repeatedly mention: " + ", ".join(cleaned) + "."
-
-# ---------------- Brief parsing ----------------
-def parse_brief(brief: str):
-    b = (brief or "").replace("\r\n", "\n").replace("\r", "\n").strip()
-
-    cat = "Category"
-    m = re.search(r"^\s*CATEGORY:\s*(.+?)\s*$", b, flags=re.MULTILINE)
-    if m:
-        cat = m.group(1).strip()
-
-    top3 = []
-    top_match = re.search(
-        r"TOP 3 PRODUCTS:\s*(.*?)(?:\n\s*WORST PRODUCT:|\Z)",
-        b,
-        flags=re.DOTALL | re.IGNORECASE
-    )
-    top_block = top_match.group(1).strip() if top_match else ""
-
-    if top_block:
-        chunks = re.split(r"\n\s*(?=\d+\)\s)", "\n" + top_block)
-        for ch in chunks:
-            ch = ch.strip()
-            if not ch:
-                continue
-            lines = [ln.strip() for ln in ch.split("\n") if ln.strip()]
-            header = re.sub(r"^\d+\)\s*", "", lines[0]).strip()
-            name = header.split("|")[0].strip()
-
-            rating = None
-            reviews = None
-            mr = re.search(r"rating\s*=\s*([0-9.]+)", header, flags=re.IGNORECASE)
-            mv = re.search(r"reviews\s*=\s*(\d+)", header, flags=re.IGNORECASE)
-            if mr: rating = float(mr.group(1))
-            if mv: reviews = int(mv.group(1))
-
-            complaints = ""
-            for ln in lines[1:]:
-                if ln.lower().startswith("complaints:"):
-                    complaints = ln.split(":", 1)[1].strip()
-                    break
-
-            top3.append({
-                "name": name,
-                "rating": rating,
-                "reviews": reviews,
-                "complaints": complaints
-            })
-
-    worst = {"name": "", "rating": None, "reviews": None, "reason": ""}
-    w = re.search(r"WORST PRODUCT:\s*(.+)", b, flags=re.IGNORECASE)
-    if w:
-        wline = w.group(1).strip().split("\n")[0]
-        worst["name"] = wline.split("|")[0].strip()
-        mr = re.search(r"rating\s*=\s*([0-9.]+)", wline, flags=re.IGNORECASE)
-        mv = re.search(r"reviews\s*=\s*(\d+)", wline, flags=re.IGNORECASE)
-        if mr: worst["rating"] = float(mr.group(1))
-        if mv: worst["reviews"] = int(mv.group(1))
-
-    r = re.search(r"avoid because:\s*(.+)\s*$", b, flags=re.IGNORECASE | re.MULTILINE)
-    if r:
-        worst["reason"] = r.group(1).strip()
-
-    return cat, top3, worst
-
-# ---------------- Summary generation ----------------
-@torch.inference_mode()
-def generate_summary_from_brief(brief: str) -> str:
-    cat, top3, worst = parse_brief(brief)
-
-    lines = [f"Category: {cat}."]
-    for p in top3:
-        lines.append(
-            f"{p['name']} has rating {p['rating']} from {p['reviews']} reviews."
-        )
-
-    if worst["name"]:
-        lines.append(
-            f"The lowest rated is {worst['name']} with rating {worst['rating']} from {worst['reviews']} reviews."
-        )
-
-    facts = "\n".join(lines)
-
-    prompt = f"""Write 2 short natural paragraphs for shoppers.
-
-Use ONLY the facts below.
-
-FACTS:
-{facts}
-"""
+# ---------------- Markdown builder ----------------
+def build_full_markdown(brief: str, summary: str = None, profile: str = DEFAULT_PROFILE) -> str:
+    if summary is None:
+        summary = INFERENCE_WORKER.summarize(brief, profile=profile)
+    return render_markdown(parse_brief(brief), summary)
 
-    inputs = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=384).to(device)
 
-    out = model.generate(
-        **inputs,
-        max_new_tokens=140,
-        do_sample=True,
-        temperature=0.6,
-        top_p=0.9,
-        repetition_penalty=1.15,
-        use_cache=False,
-    )
+def stream_full_markdown(brief: str, profile: str = DEFAULT_PROFILE, use_summary_cache=True):
+    """Yield the article: parsed sections at once, then the summary as it decodes."""
+    parsed = parse_brief(brief)
+    yield render_markdown(parsed, SUMMARY_PLACEHOLDER)
+    if not GEN_STREAM:
+        yield render_markdown(parsed, INFERENCE_WORKER.summarize(brief, profile=profile))
+        return
+    for summary in stream_summary_from_brief(brief, profile=profile, use_summary_cache=use_summary_cache):
+        yield render_markdown(parsed, summary)
 
-    return tokenizer.decode(out[0], skip_special_tokens=True).strip()
-
-# ---------------- Markdown builder ----------------
-def build_full_markdown(brief: str) -> str:
-    cat, top3, worst = parse_brief(brief)
-    summary = generate_summary_from_brief(brief)
 
+def render_markdown(parsed, summary: str) -> str:
+    cat, top3, worst = parsed
     md = [f"# {cat}", "", summary, "", "## Top Picks"]
 
     for p in top3:
@@ -181,19 +73,23 @@ def build_full_markdown(brief: str) -> str:
     return "\n\n".join(md)
 
 # ---------------- JSON Export ----------------
-def export_json():
-    df = STATE["df"]
+def export_json(profile=DEFAULT_PROFILE, df=None):
     if df is None:
         raise ValueError("No CSV loaded.")
 
     cluster_summaries = {}
     product_summaries = {}
 
-    for _, row in df.iterrows():
-        category = str(row["category"])
-        brief = str(row["brief"])
+    categories = df["category"].astype(str).tolist()
+    briefs = df["brief"].astype(str).tolist()
+    workers = resolve_workers(EXPORT_WORKERS)
+    with stage("export.summaries", briefs=len(briefs), workers=workers):
+        summaries = generate_summaries(briefs, batch_size=GEN_BATCH_SIZE, profile=profile, workers=workers)
+    stats = get_summary_cache().stats()
+    print(f"Summary cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
 
-        cluster_summaries[category] = build_full_markdown(brief)
+    for category, brief, summary in zip(categories, briefs, summaries):
+        cluster_summaries[category] = build_full_markdown(brief, summary)
 
         cat, top3, worst = parse_brief(brief)
 
@@ -217,9 +113,10 @@ def export_json():
         "product_summaries": product_summaries
     }
 
-    tmpdir = tempfile.mkdtemp()
-    path = Path(tmpdir) / "export.json"
-    path.write_text(json.dumps(export_obj, indent=2, ensure_ascii=False), encoding="utf-8")
+    with stage("export.write"):
+        tmpdir = tempfile.mkdtemp()
+        path = Path(tmpdir) / "export.json"
+        path.write_text(json.dumps(export_obj, indent=2, ensure_ascii=False), encoding="utf-8")
 
     return str(path)
 
@@ -227,10 +124,16 @@ def export_json():
 with gr.Blocks(title="Category Blog Generator") as demo:
     gr.Markdown("# Category Blog Generator")
 
+    # Each browser session keeps its own loaded CSV
+    session_df = gr.State(None)
+
     csv_file = gr.File(file_types=[".csv"])
     load_btn = gr.Button("Load CSV")
 
     category_dd = gr.Dropdown(label="Category")
+    profile_dd = gr.Dropdown(
+        choices=list(DECODING_PROFILES), value=DEFAULT_PROFILE, label="Decoding profile"
+    )
     gen_btn = gr.Button("Generate Summary")
 
     output_md = gr.Markdown()
@@ -239,19 +142,44 @@ with gr.Blocks(title="Category Blog Generator") as demo:
     export_file = gr.File()
 
     def load_csv(file):
-        df = pd.read_csv(file.name)
-        STATE["df"] = df
+        with stage("app.load_csv") as s:
+            df = pd.read_csv(file.name)
+            s["rows"] = len(df)
+            if "brief" not in df.columns:
+                # Raw clustered reviews (e.g. data_with_clusters.csv): build the briefs here
+                from briefs import build_briefs
+                with stage("app.build_briefs"):
+                    df = build_briefs(df)
         categories = sorted(df["category"].unique())
-        return gr.Dropdown(choices=categories, value=categories[0])
+        return gr.Dropdown(choices=categories, value=categories[0]), df
 
-    def generate(category):
-        df = STATE["df"]
+    def generate(category, profile, df):
+        if df is None:
+            raise gr.Error("Load a CSV first.")
         row = df[df["category"] == category].iloc[0]
-        return build_full_markdown(row["brief"])
+        yield from stream_full_markdown(row["brief"], profile=profile)
 
-    load_btn.click(load_csv, inputs=[csv_file], outputs=[category_dd])
-    gen_btn.click(generate, inputs=[category_dd], outputs=[output_md])
-    export_btn.click(export_json, outputs=[export_file])
+    load_btn.click(load_csv, inputs=[csv_file], outputs=[category_dd, session_df])
+    # Streams into output_md. No limit on the handler: the parsed sections and cached
+    # summaries show at once, and only fresh generation waits (GEN_STREAM_CONCURRENCY
+    # in summarizer.py, or the batching worker)
+    gen_btn.click(generate, inputs=[category_dd, profile_dd, session_df], outputs=[output_md],
+                  concurrency_limit=None)
+    export_btn.click(export_json, inputs=[profile_dd, session_df], outputs=[export_file])
 
 if __name__ == "__main__":
+    if resolve_workers(EXPORT_WORKERS) > 1:
+        # Loads the model and forks the export workers before it first runs (see export_pool.py)
+        start_pool()
+    if GEN_WARMUP:
+        warm_up(background=True)
+    if not GEN_STREAM:
+        INFERENCE_WORKER.start()
+    if PROFILE_METRICS_PORT:
+        if PROFILER is None:
+            print("PROFILE_METRICS_PORT is set but PROFILE_STAGES is not; no metrics served")
+        else:
+            server = serve_metrics(PROFILE_METRICS_PORT)
+            host, port = server.server_address[:2]
+            print(f"Metrics on http://{host}:{port}/metrics")
     demo.launch()
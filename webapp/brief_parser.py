@@ -0,0 +1,233 @@
+"""
+brief_parser.py — Category brief parsing helpers for the Gradio app
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Pure-Python (re only), so tools that just need to read briefs can import
+this without pulling in torch, transformers or gradio.
+
+parse_brief reads a brief line by line in one pass with precompiled
+patterns and memoizes the result, so export (prompt, markdown, product
+stats) parses each brief once. Briefs that stray from the generated layout
+(markers out of order, repeated or mid-line) go through parse_brief_regex,
+the original parser, so results are identical either way.
+"""
+
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, TypedDict
+
+# ---------------- Clean complaint keywords ----------------
+STOP = {"don", "didn", "doesn", "dont", "isn", "wasn", "weren",
+        "cant", "couldn", "wouldn", "buy"}
+
+def prettify_reason(reason: str) -> str:
+    r = (reason or "").strip()
+    if not r:
+        return "No clear reason provided."
+
+    if ";" not in r and len(r.split()) > 5:
+        return r
+
+    toks = [t.strip().lower() for t in r.split(";") if t.strip()]
+    toks = [t for t in toks if len(t) >= 3 and t not in STOP]
+
+    seen = set()
+    cleaned = []
+    for t in toks:
+        if t not in seen:
+            seen.add(t)
+            cleaned.append(t)
+
+    cleaned = cleaned[:6]
+
+    if not cleaned:
+        return "Negative feedback appears general without a clear recurring issue."
+
+    return "Negative reviews repeatedly mention: " + ", ".join(cleaned) + "."
+
+# ---------------- Brief parsing ----------------
+class Product(TypedDict):
+    name: str
+    rating: Optional[float]
+    reviews: Optional[int]
+    complaints: str
+
+
+class WorstProduct(TypedDict):
+    name: str
+    rating: Optional[float]
+    reviews: Optional[int]
+    reason: str
+
+
+class ParsedBrief(NamedTuple):
+    """Unpacks like the old (cat, top3, worst) tuple. Cached: treat as read-only."""
+    category: str
+    top3: List[Product]
+    worst: WorstProduct
+
+
+PARSE_CACHE_SIZE = 4096
+
+_RATING = re.compile(r"rating\s*=\s*([0-9.]+)", re.IGNORECASE)
+_REVIEWS = re.compile(r"reviews\s*=\s*(\d+)", re.IGNORECASE)
+_ITEM = re.compile(r"\d+\)(\s|$)")
+
+_TOP, _WORST, _AVOID = "top 3 products:", "worst product:", "avoid because:"
+_START, _IN_TOP, _IN_WORST = 0, 1, 2
+
+
+class _Unusual(Exception):
+    """Brief layout the line parser does not handle; use the regex parser."""
+
+
+def _numbers(text):
+    mr = _RATING.search(text)
+    mv = _REVIEWS.search(text)
+    return (float(mr.group(1)) if mr else None), (int(mv.group(1)) if mv else None)
+
+
+def _parse_lines(b: str) -> ParsedBrief:
+    """Single pass over the lines of a normalized brief in the generated layout."""
+    cat = None
+    top3 = []
+    worst = {"name": "", "rating": None, "reviews": None, "reason": ""}
+    state = _START
+    seen_top = seen_worst = seen_avoid = False
+    current = None
+
+    for line in b.split("\n"):
+        s = line.strip()
+        if not s:
+            continue
+        low = s.lower()
+
+        # Markers are only trusted at the start of a line, once, in order
+        has_top, has_worst, has_avoid = _TOP in low, _WORST in low, _AVOID in low
+        if has_top + has_worst + has_avoid > 1:
+            raise _Unusual
+        if has_top:
+            if low != _TOP or state != _START or seen_top:
+                raise _Unusual
+            seen_top, state = True, _IN_TOP
+            continue
+        if has_worst:
+            rest = s[len(_WORST):].strip()
+            if not low.startswith(_WORST) or not rest or seen_worst:
+                raise _Unusual
+            if state == _IN_TOP and current is None:
+                raise _Unusual  # the old TOP pattern runs past a WORST line right after it
+            seen_worst, state = True, _IN_WORST
+            worst["name"] = rest.split("|")[0].strip()
+            worst["rating"], worst["reviews"] = _numbers(rest)
+            continue
+        if has_avoid:
+            rest = s[len(_AVOID):].strip()
+            if not low.startswith(_AVOID) or not rest or state != _IN_WORST or seen_avoid:
+                raise _Unusual
+            seen_avoid = True
+            worst["reason"] = rest
+            continue
+        if s.startswith("CATEGORY:"):
+            if state != _START or cat is not None or not s[9:].strip():
+                raise _Unusual
+            cat = s[9:].strip()
+            continue
+
+        if state == _IN_TOP:
+            m = _ITEM.match(s)
+            if m:
+                if not m.group(1):
+                    raise _Unusual  # bare "1)", the item text is on the next line
+                header = s[m.end():].strip()
+                rating, reviews = _numbers(header)
+                current = {"name": header.split("|")[0].strip(), "rating": rating,
+                           "reviews": reviews, "complaints": None}
+                top3.append(current)
+            elif current is None:
+                raise _Unusual  # text before the first numbered item
+            elif current["complaints"] is None and low.startswith("complaints:"):
+                current["complaints"] = s.split(":", 1)[1].strip()
+
+    for p in top3:
+        if p["complaints"] is None:
+            p["complaints"] = ""
+    return ParsedBrief(cat or "Category", top3, worst)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(brief: str) -> ParsedBrief:
+    b = brief.replace("\r\n", "\n").replace("\r", "\n").strip()
+    try:
+        return _parse_lines(b)
+    except _Unusual:
+        return parse_brief_regex(b)
+
+
+def parse_brief(brief: str) -> ParsedBrief:
+    """(category, top3, worst) of a brief, parsed once per distinct text."""
+    return _parse_cached(brief or "")
+
+
+def parse_brief_regex(brief: str) -> ParsedBrief:
+    """Original regex parser; the reference for parse_brief and its fallback."""
+    b = (brief or "").replace("\r\n", "\n").replace("\r", "\n").strip()
+
+    cat = "Category"
+    m = re.search(r"^\s*CATEGORY:\s*(.+?)\s*$", b, flags=re.MULTILINE)
+    if m:
+        cat = m.group(1).strip()
+
+    top3 = []
+    top_match = re.search(
+        r"TOP 3 PRODUCTS:\s*(.*?)(?:\n\s*WORST PRODUCT:|\Z)",
+        b,
+        flags=re.DOTALL | re.IGNORECASE
+    )
+    top_block = top_match.group(1).strip() if top_match else ""
+
+    if top_block:
+        chunks = re.split(r"\n\s*(?=\d+\)\s)", "\n" + top_block)
+        for ch in chunks:
+            ch = ch.strip()
+            if not ch:
+                continue
+            lines = [ln.strip() for ln in ch.split("\n") if ln.strip()]
+            header = re.sub(r"^\d+\)\s*", "", lines[0]).strip()
+            name = header.split("|")[0].strip()
+
+            rating = None
+            reviews = None
+            mr = re.search(r"rating\s*=\s*([0-9.]+)", header, flags=re.IGNORECASE)
+            mv = re.search(r"reviews\s*=\s*(\d+)", header, flags=re.IGNORECASE)
+            if mr: rating = float(mr.group(1))
+            if mv: reviews = int(mv.group(1))
+
+            complaints = ""
+            for ln in lines[1:]:
+                if ln.lower().startswith("complaints:"):
+                    complaints = ln.split(":", 1)[1].strip()
+                    break
+
+            top3.append({
+                "name": name,
+                "rating": rating,
+                "reviews": reviews,
+                "complaints": complaints
+            })
+
+    worst = {"name": "", "rating": None, "reviews": None, "reason": ""}
+    w = re.search(r"WORST PRODUCT:\s*(.+)", b, flags=re.IGNORECASE)
+    if w:
+        wline = w.group(1).strip().split("\n")[0]
+        worst["name"] = wline.split("|")[0].strip()
+        mr = re.search(r"rating\s*=\s*([0-9.]+)", wline, flags=re.IGNORECASE)
+        mv = re.search(r"reviews\s*=\s*(\d+)", wline, flags=re.IGNORECASE)
+        if mr: worst["rating"] = float(mr.group(1))
+        if mv: worst["reviews"] = int(mv.group(1))
+
+    r = re.search(r"avoid because:\s*(.+)\s*$", b, flags=re.IGNORECASE | re.MULTILINE)
+    if r:
+        worst["reason"] = r.group(1).strip()
+
+    return ParsedBrief(cat, top3, worst)
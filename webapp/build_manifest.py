@@ -0,0 +1,178 @@
+"""
+build_manifest.py — Content-hash manifest for incremental webapp/data builds
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+generate_webapp.py records, per run:
+    inputs      SHA-256 of every input file (reused while size and mtime match)
+                and of the settings that shape the output
+    artifacts   the input hashes each artifact was built from, and the hash
+                of every file it wrote (a JSON file, or a set of pages)
+    groups      a 64-bit fingerprint per product and per cluster
+
+An artifact is rebuilt only when one of its inputs changed, or when one of
+its files is missing or no longer matches the recorded hash. When the
+review rows changed, the group fingerprints tell which products and
+clusters actually moved; the others reuse their entries from the previous
+build, stored next to the manifest.
+
+Fingerprints are sums of per-row hashes mixed with the row's position in
+its group, so they are order-sensitive yet can be accumulated chunk by
+chunk in streaming mode.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+MANIFEST_PATH = CACHE_DIR / "build_manifest.json"
+GROUPS_PATH = CACHE_DIR / "build_groups.json"
+
+
+def file_hash(path):
+    """SHA-256 of a file's content, read in 1 MB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _load_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def _dump_json(obj, path):
+    """Write via a temporary file so an interrupted run never leaves half a manifest."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class BuildManifest:
+    """Input and output hashes of the last build, plus its per-group state."""
+
+    def __init__(self, path=MANIFEST_PATH, groups_path=GROUPS_PATH):
+        self.path = Path(path)
+        self.groups_path = Path(groups_path)
+        previous = _load_json(self.path, {})
+        self.previous_inputs = previous.get("inputs", {})
+        self.artifacts = previous.get("artifacts", {})
+        self.inputs = {}
+
+    def hash_input(self, name, path):
+        """Content hash of one input (None if absent); unchanged size + mtime skip the read."""
+        if path is None or not os.path.exists(path):
+            self.inputs[name] = None
+            return None
+        st = os.stat(path)
+        prev = self.previous_inputs.get(name) or {}
+        if (prev.get("path") == os.path.abspath(path) and prev.get("size") == st.st_size
+                and prev.get("mtime_ns") == st.st_mtime_ns):
+            digest = prev["sha256"]
+        else:
+            digest = file_hash(path)
+        self.inputs[name] = {"path": os.path.abspath(path), "size": st.st_size,
+                             "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        return digest
+
+    def hash_setting(self, name, value):
+        """Record a build setting as an input, so changing it rebuilds what depends on it."""
+        digest = hashlib.sha256(json.dumps(value).encode("utf-8")).hexdigest()
+        self.inputs[name] = {"value": value, "sha256": digest}
+        return digest
+
+    def digest(self, name):
+        entry = self.inputs.get(name)
+        return entry["sha256"] if entry else None
+
+    def is_stale(self, artifact, deps, output_dir):
+        """True when the artifact's inputs changed or one of its files is missing or was modified."""
+        recorded = self.artifacts.get(artifact)
+        if recorded is None or "files" not in recorded:
+            return True
+        if recorded["deps"] != {n: self.digest(n) for n in deps}:
+            return True
+        for rel, digest in recorded["files"].items():
+            path = os.path.join(output_dir, rel)
+            if not os.path.exists(path) or file_hash(path) != digest:
+                return True
+        return False
+
+    def record(self, artifact, deps, output_dir, files):
+        """Record the files an artifact was written to; returns the ones it no longer has."""
+        previous = set(self.artifacts.get(artifact, {}).get("files", {}))
+        self.artifacts[artifact] = {
+            "deps": {n: self.digest(n) for n in deps},
+            "files": {rel: file_hash(os.path.join(output_dir, rel)) for rel in files},
+        }
+        return sorted(previous - set(files))
+
+    def version(self, artifact):
+        """Short hash of an artifact's files, for cache-busting URLs."""
+        files = self.artifacts.get(artifact, {}).get("files", {})
+        payload = json.dumps(sorted(files.items())).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()[:10]
+
+    def load_groups(self):
+        """Per-group state of the last build: fingerprints and the entries built from them."""
+        return _load_json(self.groups_path, {})
+
+    def save(self, groups=None):
+        if groups is not None:
+            _dump_json(groups, self.groups_path)
+        _dump_json({"inputs": self.inputs, "artifacts": self.artifacts}, self.path)
+
+
+class GroupFingerprints:
+    """Position-aware fingerprint of the rows in each group, fed one frame or chunk at a time."""
+
+    def __init__(self, by, columns):
+        self.by = by
+        self.columns = columns
+        self._sums = {}
+        self._seen = {}  # rows already folded in per group, for positions across chunks
+
+    def update(self, frame):
+        cols = [c for c in self.columns if c in frame.columns]
+        codes, keys = pd.factorize(frame[self.by].astype(object))
+        valid = codes >= 0  # rows without a group are left out of every group
+        codes = codes[valid]
+        if not len(codes):
+            return
+        offsets = np.array([self._seen.get(k, 0) for k in keys], dtype=np.uint64)
+        pos = pd.Series(codes).groupby(codes).cumcount().to_numpy(np.uint64) + offsets[codes]
+        # hash_pandas_object hashes float32 5.0, int64 5 and float64 5.0 differently, and
+        # the chunked, in-memory and dataset reads give ratings different dtypes
+        values = frame.loc[valid, cols]
+        values = values.astype({c: np.float64 for c in cols if pd.api.types.is_numeric_dtype(values[c])})
+        # Review texts are mostly unique, so factorizing before hashing only costs time
+        rows = pd.util.hash_pandas_object(values, index=False, categorize=False).to_numpy()
+        mixed = pd.util.hash_pandas_object(pd.DataFrame({"row": rows, "pos": pos}), index=False).to_numpy()
+        sums = np.zeros(len(keys), dtype=np.uint64)
+        np.add.at(sums, codes, mixed)  # wraps around mod 2**64
+        sizes = np.bincount(codes, minlength=len(keys))
+        for k, s, n in zip(keys, sums, sizes):
+            self._sums[k] = (self._sums.get(k, 0) + int(s)) % (1 << 64)
+            self._seen[k] = self._seen.get(k, 0) + int(n)
+
+    def observe(self, chunks):
+        """Pass chunks through unchanged, folding each into the fingerprints."""
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    def result(self):
+        """{str(group): hex fingerprint}, the row count included."""
+        return {str(k): f"{s:016x}:{self._seen[k]}" for k, s in self._sums.items()}
@@ -41,6 +41,18 @@ if [ ! -f "data/stats.json" ]; then
     exit 1
 fi
 
+# Sites generated before sharding have products.json + reviews_sample.json
+# instead of index.json and page folders; index.html loads either
+if [ -f "data/index.json" ]; then
+    SHARDED=1
+elif [ -f "data/products.json" ] && [ -f "data/reviews_sample.json" ]; then
+    SHARDED=0
+else
+    echo "ERROR: data/ has neither index.json nor products.json + reviews_sample.json."
+    echo "  Run generate_webapp.py first: python generate_webapp.py"
+    exit 1
+fi
+
 echo "=== Amazon Review Analyzer — Deploy to OVH ==="
 echo ""
 echo "  Host: ${OVH_HOST}"
@@ -48,26 +60,37 @@ echo "  User: ${OVH_USER}"
 echo "  Path: ${OVH_PATH}"
 echo ""
 echo "Files to upload:"
-echo "  index.html"
-echo "  data/stats.json"
-echo "  data/clusters.json"
-echo "  data/clusters_local.json"
-echo "  data/products.json"
-echo "  data/reviews_sample.json"
+echo "  index.html, .htaccess"
+if [ "$SHARDED" = 1 ]; then
+    echo "  data/index.json, stats.json, clusters.json, clusters_local.json (+ .gz/.br)"
+    echo "  data/products/  ($(find data/products -name '*.json' | wc -l) pages)"
+    echo "  data/reviews/   ($(find data/reviews -name '*.json' | wc -l) pages)"
+    echo "  data/search/    ($(find data/search -name '*.json' | wc -l) index shards)"
+else
+    echo "  data/stats.json, clusters.json, clusters_local.json, products.json, reviews_sample.json"
+    echo "  (unsharded data; rerun generate_webapp.py for pages and precompressed files)"
+fi
 echo ""
 
+# Page folders, in the sharded layout only
+PAGES=""
+if [ "$SHARDED" = 1 ]; then
+    for dir in products reviews search; do
+        PAGES+="mkdir ${OVH_PATH}/data/${dir}
+put -r data/${dir} ${OVH_PATH}/data/${dir}
+"
+    done
+fi
+
 # Upload via SFTP
 echo "Uploading via SFTP..."
 sftp ${OVH_USER}@${OVH_HOST} << EOF
 mkdir ${OVH_PATH}
 mkdir ${OVH_PATH}/data
 put index.html ${OVH_PATH}/index.html
-put data/stats.json ${OVH_PATH}/data/stats.json
-put data/clusters.json ${OVH_PATH}/data/clusters.json
-put data/clusters_local.json ${OVH_PATH}/data/clusters_local.json
-put data/products.json ${OVH_PATH}/data/products.json
-put data/reviews_sample.json ${OVH_PATH}/data/reviews_sample.json
-quit
+put .htaccess ${OVH_PATH}/.htaccess
+put data/*.json* ${OVH_PATH}/data/
+${PAGES}quit
 EOF
 
 echo ""
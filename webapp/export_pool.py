@@ -0,0 +1,191 @@
+"""
+export_pool.py — Process pool that generates export summaries in parallel
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+torch's intra-op threads do little for the small seq2seq batches the export
+generates, so with EXPORT_WORKERS > 1 the batches are spread over a pool of
+worker processes instead. The parent loads the model once and forks the
+workers: the weights are shared copy-on-write and never written (inference
+only), so N workers cost roughly one model plus N small heaps, not N models.
+
+    EXPORT_WORKERS   worker processes for export (default 1: no pool;
+                     "auto": one per CPU)
+    EXPORT_THREADS   torch threads per worker (default: CPUs // workers)
+
+The pool has to be forked before this process runs the model: once torch
+has run a multi-threaded OpenMP region, a forked child that uses more than
+one thread deadlocks. start_pool() loads the model single-threaded, forks
+the workers and keeps them for the life of the process; app_gradio.py calls
+it at launch. If the model has already run when an export asks for workers,
+the export stays in this process (with a warning) instead of hanging.
+
+Needs fork (Linux, macOS) and the pytorch backends on CPU; anywhere else
+generation stays in this process. Each batch is seeded from its position,
+so sampled summaries do not depend on which worker drew them.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+EXPORT_WORKERS = os.getenv("EXPORT_WORKERS", "1")
+EXPORT_THREADS = int(os.getenv("EXPORT_THREADS", "0"))
+
+# Workers and threads of the last pool run, and each worker's memory, for benchmarks
+LAST_RUN = {}
+
+_POOL = None  # (executor, workers, threads) once start_pool() has forked them
+_POOL_LOCK = threading.Lock()
+
+
+def cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        return os.cpu_count() or 1
+
+
+def resolve_workers(value=EXPORT_WORKERS) -> int:
+    if str(value).strip().lower() == "auto":
+        return cpu_count()
+    return max(1, int(value))
+
+
+def threads_per_worker(workers: int) -> int:
+    """Split the CPUs evenly so workers x threads never oversubscribes the box."""
+    return EXPORT_THREADS or max(1, cpu_count() // workers)
+
+
+def can_fork(device, backend) -> bool:
+    # CUDA contexts and ONNX Runtime sessions do not survive fork
+    return ("fork" in multiprocessing.get_all_start_methods()
+            and device == "cpu" and backend in ("pytorch", "pytorch-int8"))
+
+
+def memory_kb():
+    """This process's peak RSS and proportional set size (shared pages split between sharers), Linux only."""
+    out = {}
+    for path, key, name in (("/proc/self/status", "VmHWM:", "peak_rss_kb"),
+                            ("/proc/self/smaps_rollup", "Pss:", "pss_kb")):
+        try:
+            with open(path) as f:
+                line = next((l for l in f if l.startswith(key)), None)
+        except OSError:
+            continue
+        if line:
+            out[name] = int(line.split()[1])
+    return out
+
+
+# ---------------- Worker side ----------------
+def _init_worker(threads):
+    import torch
+    import profiling
+    import summarizer
+
+    torch.set_num_threads(threads)
+    # The forked profiler's lock may have been held by another thread, and a
+    # worker's records would be lost at exit anyway; the parent times the pool
+    profiling.PROFILER = summarizer.PROFILER = None
+
+
+def _ready(_):
+    return os.getpid()
+
+
+def _run_batch(task):
+    import torch
+    from summarizer import _generate_uncached
+
+    seed, idx, prompts, gen_kwargs = task
+    torch.manual_seed(seed)
+    texts = _generate_uncached(prompts, len(prompts), gen_kwargs)
+    return idx, texts, os.getpid(), memory_kb()
+
+
+# ---------------- Parent side ----------------
+def start_pool(workers=None, threads=None) -> int:
+    """Load the model and fork the export workers, if not done yet; returns the pool's worker count (1: none).
+
+    Call it before this process generates anything; afterwards it refuses to fork.
+    """
+    global _POOL
+    import torch
+    import summarizer
+
+    workers = resolve_workers() if workers is None else workers
+    with _POOL_LOCK:
+        if _POOL is not None:
+            return _POOL[1]
+        if workers <= 1:
+            return 1
+        if summarizer.inference_started():
+            print("export_pool: the model has already run in this process and forking now could deadlock "
+                  "the workers; exporting in-process. Start the pool at launch (EXPORT_WORKERS) instead.")
+            return 1
+        if not summarizer.model_loaded():
+            # Single-threaded, so no OpenMP thread team exists yet when we fork
+            parent_threads = torch.get_num_threads()
+            torch.set_num_threads(1)
+            try:
+                summarizer.get_model()
+            finally:
+                torch.set_num_threads(parent_threads)
+        _, _, device = summarizer.get_model()
+        if not can_fork(device, summarizer.GEN_BACKEND):
+            return 1
+
+        threads = threads or threads_per_worker(workers)
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"),
+                                       initializer=_init_worker, initargs=(threads,))
+        # With fork the executor starts every worker on the first submit: do it now
+        list(executor.map(_ready, range(workers)))
+        _POOL = (executor, workers, threads)
+        print(f"Export pool: {workers} workers x {threads} torch threads")
+        return workers
+
+
+def generate_parallel(prompts, batch_size, gen_kwargs, workers):
+    """Summaries for prompts in input order, batches generated across worker processes."""
+    global _POOL
+    import torch
+    from summarizer import MAX_INPUT_TOKENS, _generate_uncached, get_model
+
+    n_batches = -(-len(prompts) // batch_size)
+    if n_batches <= 1 or start_pool(workers) <= 1:
+        return _generate_uncached(prompts, batch_size, gen_kwargs)
+    executor, workers, threads = _POOL
+
+    # Same length-sorted batches as the single-process path, longest first so
+    # the slowest batches start early and the short ones fill in at the end
+    tokenizer, _, _ = get_model()
+    encoded = tokenizer(prompts, truncation=True, max_length=MAX_INPUT_TOKENS)
+    order = sorted(range(len(prompts)), key=lambda i: len(encoded["input_ids"][i]))
+    base_seed = torch.initial_seed()
+    tasks = []
+    for n, start in enumerate(range(0, len(order), batch_size)):
+        idx = order[start:start + batch_size]
+        tasks.append((base_seed + n, idx, [prompts[i] for i in idx], gen_kwargs))
+    tasks.reverse()
+
+    summaries = [None] * len(prompts)
+    worker_memory = {}
+    try:
+        for idx, texts, pid, memory in executor.map(_run_batch, tasks):
+            for i, text in zip(idx, texts):
+                summaries[i] = text
+            worker_memory[pid] = memory
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); replacing it would mean forking after inference
+        with _POOL_LOCK:
+            _POOL = None
+        print("export_pool: a worker died; generating this export in-process")
+        return _generate_uncached(prompts, batch_size, gen_kwargs)
+    parent_memory = memory_kb()  # while the workers still share its pages
+
+    LAST_RUN.clear()
+    LAST_RUN.update(workers=workers, threads=threads, batches=len(tasks), parent_memory=parent_memory,
+                    worker_memory=worker_memory)
+    return summaries
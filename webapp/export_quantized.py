@@ -0,0 +1,133 @@
+"""
+export_quantized.py — Export and validate the CPU inference backends
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Run once before switching the app to GEN_BACKEND=onnx:
+    python webapp/export_quantized.py [--min-agreement 0.9]
+
+1. Exports flan-t5-base to ONNX (encoder, decoder and decoder-with-past,
+   so generation reuses the KV cache) under webapp/models/.
+2. Runs greedy decoding on every brief in data/category_blog_posts.csv with
+   the fp32 baseline, the dynamic int8 model and the ONNX export, and
+   writes how closely each one matches fp32 to models/validation.json.
+
+The int8 backend needs no artifact: quantize_dynamic runs at load time in
+a couple of seconds, so it is only validated here.
+"""
+
+import argparse
+import difflib
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import summarizer
+from summarizer import (
+    ARTIFACTS_DIR, BACKENDS, GEN_MODEL_NAME, decoding_kwargs, build_facts_prompt,
+    onnx_artifact_dir, _generate_uncached,
+)
+
+BASE_DIR = Path(__file__).parent.parent
+BRIEFS_CSV = BASE_DIR / "data" / "category_blog_posts.csv"
+VALIDATION_PATH = ARTIFACTS_DIR / "validation.json"
+
+
+# ---------- Export ----------
+def export_onnx(force=False):
+    """Write the ONNX encoder/decoder and tokenizer to models/, unless already there."""
+    out_dir = onnx_artifact_dir()
+    if out_dir.exists() and not force:
+        print(f"ONNX export already at {out_dir} (use --force to redo)")
+        return out_dir
+
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+
+    start = time.perf_counter()
+    model = ORTModelForSeq2SeqLM.from_pretrained(GEN_MODEL_NAME, export=True, use_cache=True)
+    model.save_pretrained(out_dir)
+    AutoTokenizer.from_pretrained(GEN_MODEL_NAME).save_pretrained(out_dir)
+    print(f"Exported ONNX to {out_dir} in {time.perf_counter() - start:.1f}s")
+    return out_dir
+
+
+# ---------- Validation ----------
+def agreement(reference, candidate):
+    """Exact-match rate and mean character similarity against the reference outputs."""
+    exact = sum(a == b for a, b in zip(reference, candidate)) / len(reference)
+    similarity = sum(
+        difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(reference, candidate)
+    ) / len(reference)
+    return round(exact, 3), round(similarity, 3)
+
+
+def validate(briefs, batch_size):
+    """Greedy outputs of every backend, compared with the fp32 baseline."""
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(GEN_MODEL_NAME)
+    prompts = [build_facts_prompt(b) for b in briefs]
+    gen_kwargs = decoding_kwargs("fast-greedy")  # deterministic, so outputs are comparable
+
+    results, outputs = {}, {}
+    for name, load in BACKENDS.items():
+        start = time.perf_counter()
+        model = load("cpu")
+        loaded_in = time.perf_counter() - start
+
+        start = time.perf_counter()
+        outputs[name] = _generate_uncached(prompts, batch_size, gen_kwargs, loaded=(tokenizer, model, "cpu"))
+        elapsed = time.perf_counter() - start
+
+        exact, similarity = agreement(outputs["pytorch"], outputs[name])
+        results[name] = {
+            "load_s": round(loaded_in, 2),
+            "generate_s": round(elapsed, 2),
+            "s_per_brief": round(elapsed / len(prompts), 3),
+            "exact_match": exact,
+            "similarity": similarity,
+        }
+        print(f"{name:<14} load {loaded_in:6.1f}s  generate {elapsed:6.1f}s  "
+              f"exact {exact:.1%}  similarity {similarity:.3f}")
+        del model
+    return results, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and validate the quantized/ONNX backends")
+    parser.add_argument("--force", action="store_true", help="re-export even if the ONNX files exist")
+    parser.add_argument("--skip-validation", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=summarizer.GEN_BATCH_SIZE)
+    parser.add_argument("--min-agreement", type=float, default=None,
+                        help="fail if any backend's similarity to fp32 is below this")
+    args = parser.parse_args()
+
+    export_onnx(force=args.force)
+    if args.skip_validation:
+        return
+
+    briefs = pd.read_csv(BRIEFS_CSV)["brief"].astype(str).tolist()
+    print(f"Validating on {len(briefs)} briefs from {BRIEFS_CSV.name}")
+    results, outputs = validate(briefs, args.batch_size)
+
+    VALIDATION_PATH.write_text(json.dumps({
+        "model": GEN_MODEL_NAME,
+        "briefs": len(briefs),
+        "decoding": "fast-greedy",
+        "backends": results,
+        "samples": {name: texts[:3] for name, texts in outputs.items()},
+    }, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Wrote {VALIDATION_PATH}")
+
+    if args.min_agreement is not None:
+        failed = [n for n, r in results.items() if r["similarity"] < args.min_agreement]
+        if failed:
+            print(f"Below --min-agreement {args.min_agreement}: {', '.join(failed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,46 +5,108 @@ Team: Krzysztof Giwojno & Felipe Doria
 
 Usage:
     python generate_webapp.py
+    python generate_webapp.py --chunksize 200000   # stream big CSVs with bounded memory
+    python generate_webapp.py --force              # ignore the build manifest, rebuild everything
+    python generate_webapp.py --reviews-per-group 2000 --page-size 100
 
 Reads:
+    - reviews_dataset/ (see pipeline/dataset.py), only the columns used;
+      without it, or when a CSV changed since it was built:
     - data_cleaned.csv (or data_with_clusters.csv)
     - data_with_predictions_v2.csv
     - summaries_api.json
     - product_clusters.csv
 
-Produces (in webapp/data/):
+Produces (in webapp/data/, minified, each with .gz/.br siblings):
+    - index.json          Shard manifest and file versions for the front end
     - stats.json          Dashboard overview numbers
     - clusters.json       Cluster summaries + metadata
-    - products.json       Product summaries + stats
-    - reviews_sample.json Sample reviews with predictions for the explorer
+    - clusters_local.json Cluster summaries from the local model
+    - products/           Product summaries + stats, paged, per cluster
+    - reviews/            Sampled reviews with predictions for the explorer,
+                          paged, per cluster and sentiment (see publish.py)
+    - search/             Inverted index over the explorer reviews' text,
+                          sharded by term range (see search_index.py)
+
+Builds are incremental (see build_manifest.py): files whose inputs did not
+change are left alone, and when reviews changed only the products and
+clusters whose rows changed are recomputed.
 """
 
+import argparse
 import json
 import os
-import random
+import sys
 import pandas as pd
 import numpy as np
 
+from aggregate import (KEY_COLS, cluster_metrics, count_reviews, overall_metrics,
+                       prepare_counts, product_metrics)
+from build_manifest import BuildManifest, GroupFingerprints
+from ingest import PRED_COLS, REVIEW_COLS, iter_chunks, peak_memory_mb, read_header, stream_counts
+from profiling import print_summary, stage
+from publish import (PAGE_SIZE, brotli, payload_sizes, product_shards,
+                     remove_files, review_shards, write_file)
+from sampling import ReservoirSampler, stratified_sample
+from search_index import build_postings, search_files
+
+PIPELINE_DIR = os.path.join(os.path.dirname(__file__), "..", "pipeline")
+sys.path.append(PIPELINE_DIR)
+from dataset import DATASET_NAME, META_NAME, current_dataset, dataset_columns, iter_batches, load_reviews
+
 # ---------- CONFIG ----------
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")  # project root (parent of webapp/)
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "data")
-REVIEWS_SAMPLE_SIZE = 200  # reviews to include in explorer (per cluster, capped)
-
+CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache")
+REVIEWS_PER_GROUP = 500  # explorer reviews sampled per (cluster, sentiment)
+
+# Source files whose changes invalidate every artifact
+CODE_INPUTS = {f"code:{name}": os.path.join(os.path.dirname(__file__), name)
+               for name in ["generate_webapp.py", "aggregate.py", "ingest.py", "build_manifest.py",
+                            "publish.py", "search_index.py", "sampling.py"]}
+CODE_INPUTS["code:dataset.py"] = os.path.join(PIPELINE_DIR, "dataset.py")
+ROW_INPUTS = ["reviews", "predictions", "setting:reviews_per_group", *CODE_INPUTS]
+ARTIFACT_DEPS = {
+    "stats": ROW_INPUTS + ["summaries_api"],
+    "clusters": ROW_INPUTS + ["summaries_api"],
+    "clusters_local": ROW_INPUTS + ["summaries_local"],
+    "products": ROW_INPUTS + ["summaries_api", "setting:page_size"],
+    "reviews": ROW_INPUTS + ["setting:page_size"],
+    "search": ROW_INPUTS,
+}
+# index.json lists the versions of all the others, so it changes with any of them
+ARTIFACT_DEPS["index"] = list(dict.fromkeys(n for deps in ARTIFACT_DEPS.values() for n in deps))
+COUNT_COLS = KEY_COLS + ["reviews", "text_reviews"]
+
+parser = argparse.ArgumentParser(description="Generate webapp/data/*.json from the project outputs.")
+parser.add_argument("--chunksize", type=int, default=0,
+                    help="stream the review CSVs in chunks of this many rows (default: load them whole)")
+parser.add_argument("--force", action="store_true",
+                    help="rebuild every file and every group, ignoring the build manifest")
+parser.add_argument("--reviews-per-group", type=int, default=REVIEWS_PER_GROUP,
+                    help=f"explorer reviews sampled per cluster and sentiment (default {REVIEWS_PER_GROUP})")
+parser.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                    help=f"products / reviews per page file (default {PAGE_SIZE})")
+parser.add_argument("--data-dir", default=DATA_DIR, help="folder with the CSV and JSON inputs")
+parser.add_argument("--output-dir", default=OUTPUT_DIR, help="where the site data is written")
+parser.add_argument("--cache-dir", default=CACHE_DIR, help="build manifest and per-group state")
+args = parser.parse_args()
+
+DATA_DIR, OUTPUT_DIR = args.data_dir, args.output_dir
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# ---------- LOAD DATA ----------
-print("Loading data...")
-
-# Try clustered data first, fall back to cleaned
+# The Parquet dataset when it is current, else clustered data, else cleaned
+dataset_path = current_dataset(DATA_DIR)
 clustered_path = os.path.join(DATA_DIR, "data_with_clusters.csv")
 cleaned_path = os.path.join(DATA_DIR, "data_cleaned.csv")
 
-if os.path.exists(clustered_path):
-    df = pd.read_csv(clustered_path)
-    print(f"  Loaded data_with_clusters.csv: {len(df):,} rows")
+if dataset_path is not None:
+    # Its metadata holds the hash of every part file, so it stands in for the rows
+    reviews_path = os.path.join(dataset_path, META_NAME)
+elif os.path.exists(clustered_path):
+    reviews_path = clustered_path
 elif os.path.exists(cleaned_path):
-    df = pd.read_csv(cleaned_path)
-    print(f"  Loaded data_cleaned.csv: {len(df):,} rows")
+    reviews_path = cleaned_path
 else:
     raise FileNotFoundError(
         f"No data file found. Expected one of:\n"
@@ -52,71 +114,201 @@ else:
         f"  {cleaned_path}"
     )
 
-# Load predictions
 pred_path = os.path.join(DATA_DIR, "data_with_predictions_v2.csv")
-if os.path.exists(pred_path):
-    pred_df = pd.read_csv(pred_path)
-    if "predicted_label" in pred_df.columns:
-        df["predicted_label"] = pred_df["predicted_label"]
-        df["predicted_score"] = pred_df["predicted_score"]
-        print(f"  Merged v2 predictions")
-
-# Load summaries
-summaries = {}
+if dataset_path is not None or not os.path.exists(pred_path):
+    pred_path = None  # the dataset already carries the prediction columns
 summaries_path = os.path.join(DATA_DIR, "summaries_api.json")
-if os.path.exists(summaries_path):
-    with open(summaries_path, "r", encoding="utf-8") as f:
-        summaries = json.load(f)
-    print(f"  Loaded summaries_api.json")
-
-# Load local summaries
-summaries_local = {}
 summaries_local_path = os.path.join(DATA_DIR, "summaries_local_full.json")
-if os.path.exists(summaries_local_path):
-    with open(summaries_local_path, "r", encoding="utf-8") as f:
-        summaries_local = json.load(f)
-    print(f"  Loaded summaries_local_full.json")
-
-# Load product clusters
-product_clusters = None
 clusters_path = os.path.join(DATA_DIR, "product_clusters.csv")
-if os.path.exists(clusters_path):
-    product_clusters = pd.read_csv(clusters_path)
-    print(f"  Loaded product_clusters.csv: {len(product_clusters)} products")
+
+# ---------- BUILD MANIFEST ----------
+print("Checking inputs...")
+
+manifest = BuildManifest(os.path.join(args.cache_dir, "build_manifest.json"),
+                         os.path.join(args.cache_dir, "build_groups.json"))
+with stage("inputs"):
+    for name, path in {"reviews": reviews_path, "predictions": pred_path,
+                       "summaries_api": summaries_path, "summaries_local": summaries_local_path,
+                       "product_clusters": clusters_path, **CODE_INPUTS}.items():
+        manifest.hash_input(name, path)
+    manifest.hash_setting("setting:reviews_per_group", args.reviews_per_group)
+    manifest.hash_setting("setting:page_size", args.page_size)
+
+stale = [
+    artifact for artifact, deps in ARTIFACT_DEPS.items()
+    if args.force or manifest.is_stale(artifact, deps, OUTPUT_DIR)
+]
+if stale and "index" not in stale:
+    stale.append("index")
+if not stale:
+    manifest.save()
+    print("  All files up to date, nothing to do")
+    raise SystemExit(0)
+print(f"  Rebuilding: {', '.join(stale)}")
+
+# Per-group state of the last build, usable only if it came from the same code
+groups = {} if args.force else manifest.load_groups()
+row_digests = {name: manifest.digest(name) for name in ROW_INPUTS}
+if any(groups.get("rows", {}).get(name) != row_digests[name] for name in CODE_INPUTS):
+    groups = {}
+rows_changed = groups.get("rows") != row_digests
+
+# ---------- LOAD DATA ----------
+print("\nLoading data...")
+
+with stage("load.reviews") as s:
+    if not rows_changed:
+        # Only summaries changed: every number comes from the last build's groups
+        df = None
+        print(f"  Reviews unchanged, reusing the aggregates of the last build")
+    elif args.chunksize:
+        # Streaming mode: rows are read chunk by chunk, counted and sampled in one pass
+        df = None
+        if dataset_path is not None:
+            columns = dataset_columns(DATA_DIR)
+            print(f"  Streaming {DATASET_NAME}/ in chunks of {args.chunksize:,} rows")
+        else:
+            columns = read_header(reviews_path)
+            if pred_path and "predicted_label" in read_header(pred_path):
+                columns += PRED_COLS
+            print(f"  Streaming {os.path.basename(reviews_path)} in chunks of {args.chunksize:,} rows")
+    elif dataset_path is not None:
+        df = load_reviews(REVIEW_COLS + PRED_COLS, data_dir=DATA_DIR)
+        columns = list(df.columns)
+        print(f"  Loaded {DATASET_NAME}/: {len(df):,} rows, {len(columns)} of "
+              f"{len(dataset_columns(DATA_DIR))} columns")
+    else:
+        df = pd.read_csv(reviews_path)
+        print(f"  Loaded {os.path.basename(reviews_path)}: {len(df):,} rows")
+
+        # Load predictions
+        with stage("load.predictions"):
+            if pred_path:
+                pred_df = pd.read_csv(pred_path)
+                if "predicted_label" in pred_df.columns:
+                    df["predicted_label"] = pred_df["predicted_label"]
+                    df["predicted_score"] = pred_df["predicted_score"]
+                    print(f"  Merged v2 predictions")
+        columns = list(df.columns)
+    if df is not None:
+        s["rows"] = len(df)
+
+with stage("load.summaries"):
+    # Load summaries
+    summaries = {}
+    if os.path.exists(summaries_path):
+        with open(summaries_path, "r", encoding="utf-8") as f:
+            summaries = json.load(f)
+        print(f"  Loaded summaries_api.json")
+
+    # Load local summaries
+    summaries_local = {}
+    if os.path.exists(summaries_local_path):
+        with open(summaries_local_path, "r", encoding="utf-8") as f:
+            summaries_local = json.load(f)
+        print(f"  Loaded summaries_local_full.json")
+
+    # Load product clusters
+    product_clusters = None
+    if rows_changed and os.path.exists(clusters_path):
+        product_clusters = pd.read_csv(clusters_path)
+        print(f"  Loaded product_clusters.csv: {len(product_clusters)} products")
+
+# ---------- AGGREGATE ----------
+print("\nAggregating reviews...")
+
+
+def changed_groups(fingerprints, before, kind):
+    """Groups whose fingerprint differs from the last build's (all of them without one)."""
+    changed = {k for k, fp in fingerprints.items() if before.get(k) != fp}
+    print(f"  {len(fingerprints) - len(changed):,} {kind} unchanged, {len(changed):,} recomputed")
+    return changed
+
+
+with stage("aggregate"):
+    if rows_changed:
+        sentiment_col = "predicted_label" if "predicted_label" in columns else "sentiment"
+        cluster_col = "cluster_name" if "cluster_name" in columns else None
+
+        # One groupby pass feeds every JSON writer below; the explorer sample is drawn in the same pass
+        samples = {}
+        if df is None:
+            if dataset_path is not None:
+                chunks = iter_batches(REVIEW_COLS + PRED_COLS, batch_rows=args.chunksize, data_dir=DATA_DIR)
+            else:
+                chunks = iter_chunks(reviews_path, pred_path, args.chunksize)
+            sampler = ReservoirSampler(sentiment_col, cluster_col, args.reviews_per_group) if cluster_col else None
+            if sampler:
+                chunks = sampler.observe(chunks)
+            counts, n_rows = stream_counts(chunks, sentiment_col, cluster_col)
+            samples = sampler.result() if sampler else {}
+            print(f"  Streamed {n_rows:,} rows")
+        else:
+            counts = count_reviews(df, sentiment_col, cluster_col)
+            if cluster_col:
+                samples = stratified_sample(df, sentiment_col, cluster_col, args.reviews_per_group)
+        counts = prepare_counts(counts)
+
+        # Products and clusters are rebuilt only where their count rows changed
+        product_fp = GroupFingerprints("name", COUNT_COLS)
+        product_fp.update(counts)
+        product_fp = product_fp.result()
+        changed = changed_groups(product_fp, groups.get("product_fp", {}), "products")
+        fresh = {str(p["name"]): p for p in product_metrics(counts[counts["name"].astype(str).isin(changed)])}
+        previous = {str(p["name"]): p for p in groups.get("products", [])}
+        products = [fresh[k] if k in changed else previous[k]
+                    for k in counts["name"].dropna().drop_duplicates().astype(str)]
+
+        clusters, cluster_fp = {}, {}
+        if cluster_col:
+            cluster_fp = GroupFingerprints("cluster", COUNT_COLS)
+            cluster_fp.update(counts)
+            cluster_fp = cluster_fp.result()
+            changed = changed_groups(cluster_fp, groups.get("cluster_fp", {}), "clusters")
+            fresh = cluster_metrics(counts[counts["cluster"].astype(str).isin(changed)])
+            previous = groups.get("clusters", {})
+            clusters = {name: fresh[name] if str(name) in changed else previous[str(name)]
+                        for name in sorted(counts["cluster"].dropna().unique())}
+
+        agg = {"overall": overall_metrics(counts), "products": products, "clusters": clusters}
+    else:
+        agg = {"overall": groups["overall"], "products": groups["products"], "clusters": groups["clusters"]}
+        samples = groups.get("samples", {})
+overall = agg["overall"]
+print(f"  {len(agg['products'])} products, {len(agg['clusters'])} clusters")
+
+
+def write_artifact(artifact, files):
+    """Write an artifact's {relative path: object} files if it is stale, and record them."""
+    if artifact not in stale:
+        print(f"  {artifact} up to date")
+        return False
+    with stage(f"write.{artifact}") as s:
+        written = [rel for rel_path, obj in files.items() for rel in write_file(OUTPUT_DIR, rel_path, obj)]
+        remove_files(OUTPUT_DIR, manifest.record(artifact, ARTIFACT_DEPS[artifact], OUTPUT_DIR, written))
+        s["files"] = len(written)
+    return True
 
 # ---------- 1. STATS.JSON ----------
 print("\nGenerating stats.json...")
 
-sentiment_col = "predicted_label" if "predicted_label" in df.columns else "sentiment"
-sentiment_counts = df[sentiment_col].value_counts().to_dict()
-
-# Normalize sentiment keys
-norm_sentiment = {}
-for k, v in sentiment_counts.items():
-    key = k.upper() if isinstance(k, str) else str(k)
-    norm_sentiment[key] = int(v)
-
-cluster_col = "cluster_name" if "cluster_name" in df.columns else None
-cluster_dist = {}
-if cluster_col:
-    for name, group in df.groupby(cluster_col):
-        cluster_dist[name] = {
-            "review_count": int(len(group)),
-            "product_count": int(group["name"].nunique()),
-            "avg_rating": round(float(group["reviews.rating"].mean()), 2),
-        }
+cluster_dist = {
+    name: {
+        "review_count": c["review_count"],
+        "product_count": c["product_count"],
+        "avg_rating": c["avg_rating"],
+    }
+    for name, c in agg["clusters"].items()
+}
 
 stats = {
-    "total_reviews": int(len(df)),
-    "total_products": int(df["name"].nunique()),
+    "total_reviews": overall["total_reviews"],
+    "total_products": overall["total_products"],
     "total_clusters": len(cluster_dist),
-    "avg_rating": round(float(df["reviews.rating"].mean()), 2),
-    "sentiment_distribution": norm_sentiment,
+    "avg_rating": overall["avg_rating"],
+    "sentiment_distribution": overall["sentiment_distribution"],
     "cluster_distribution": cluster_dist,
-    "rating_distribution": {
-        str(int(k)): int(v) for k, v in
-        df["reviews.rating"].value_counts().sort_index().items()
-    },
+    "rating_distribution": overall["rating_distribution"],
     "model_info": {
         "classification": "RoBERTa-base (Yelp→Amazon fine-tuned, class weights)",
         "clustering": "TF-IDF + K-Means (K=6)",
@@ -125,9 +317,8 @@ stats = {
     }
 }
 
-with open(f"{OUTPUT_DIR}/stats.json", "w") as f:
-    json.dump(stats, f, indent=2)
-print(f"  Saved stats.json")
+if write_artifact("stats", {"stats.json": stats}):
+    print(f"  Saved stats.json")
 
 # ---------- 2. CLUSTERS.JSON ----------
 print("Generating clusters.json...")
@@ -135,115 +326,64 @@ print("Generating clusters.json...")
 clusters_out = {}
 cluster_summaries = summaries.get("cluster_summaries", {})
 
-if cluster_col:
-    for name, group in df.groupby(cluster_col):
-        sentiment_dist = {}
-        if sentiment_col in group.columns:
-            for label, count in group[sentiment_col].value_counts().items():
-                sentiment_dist[str(label).upper()] = int(count)
-
-        top_products = (
-            group.groupby("name")
-            .agg(reviews=("reviews.text", "count"), avg_rating=("reviews.rating", "mean"))
-            .sort_values("reviews", ascending=False)
-            .head(5)
-        )
-
-        clusters_out[name] = {
-            "review_count": int(len(group)),
-            "product_count": int(group["name"].nunique()),
-            "avg_rating": round(float(group["reviews.rating"].mean()), 2),
-            "sentiment": sentiment_dist,
-            "top_products": [
-                {"name": pname, "reviews": int(row["reviews"]),
-                 "avg_rating": round(float(row["avg_rating"]), 2)}
-                for pname, row in top_products.iterrows()
-            ],
-            "summary": cluster_summaries.get(name, "Summary not available."),
-        }
+for name, c in agg["clusters"].items():
+    clusters_out[name] = {
+        "review_count": c["review_count"],
+        "product_count": c["product_count"],
+        "avg_rating": c["avg_rating"],
+        "sentiment": c["sentiment"],
+        "top_products": c["top_products"],
+        "summary": cluster_summaries.get(name, "Summary not available."),
+    }
 
-with open(f"{OUTPUT_DIR}/clusters.json", "w") as f:
-    json.dump(clusters_out, f, indent=2, ensure_ascii=False)
-print(f"  Saved clusters.json ({len(clusters_out)} clusters)")
+if write_artifact("clusters", {"clusters.json": clusters_out}):
+    print(f"  Saved clusters.json ({len(clusters_out)} clusters)")
 
-# ---------- 3. PRODUCTS.JSON ----------
-print("Generating products.json...")
+# ---------- 3. PRODUCTS/ ----------
+print("Generating products/...")
 
 product_summaries_raw = summaries.get("product_summaries", {})
 products_out = []
 
-for product_name in df["name"].unique():
-    product_df = df[df["name"] == product_name]
-    review_count = len(product_df)
-    avg_rating = round(float(product_df["reviews.rating"].mean()), 2)
-
-    sentiment_dist = {}
-    if sentiment_col in product_df.columns:
-        for label, count in product_df[sentiment_col].value_counts().items():
-            sentiment_dist[str(label).upper()] = int(count)
-
-    cluster = product_df[cluster_col].iloc[0] if cluster_col else "Unknown"
-
+for p in agg["products"]:
     # Get summary if available
-    summary_data = product_summaries_raw.get(product_name, {})
+    summary_data = product_summaries_raw.get(p["name"], {})
     summary_text = summary_data.get("summary", "") if isinstance(summary_data, dict) else ""
 
     products_out.append({
-        "name": product_name,
-        "cluster": cluster,
-        "review_count": int(review_count),
-        "avg_rating": avg_rating,
-        "sentiment": sentiment_dist,
+        "name": p["name"],
+        "cluster": p["cluster"],
+        "review_count": p["review_count"],
+        "avg_rating": p["avg_rating"],
+        "sentiment": p["sentiment"],
         "summary": summary_text,
     })
 
 products_out.sort(key=lambda x: x["review_count"], reverse=True)
 
-with open(f"{OUTPUT_DIR}/products.json", "w") as f:
-    json.dump(products_out, f, indent=2, ensure_ascii=False)
-print(f"  Saved products.json ({len(products_out)} products)")
-
-# ---------- 4. REVIEWS_SAMPLE.JSON ----------
-print("Generating reviews_sample.json...")
-
-sample_reviews = []
-random.seed(42)
-
-if cluster_col:
-    for cluster_name, group in df.groupby(cluster_col):
-        # Sample per sentiment for diversity
-        for label in ["POSITIVE", "NEGATIVE", "NEUTRAL"]:
-            if sentiment_col in group.columns:
-                label_df = group[group[sentiment_col].str.upper() == label]
-            else:
-                label_df = pd.DataFrame()
-
-            if len(label_df) == 0:
-                continue
-
-            n = min(20, len(label_df))
-            sampled = label_df.sample(n=n, random_state=42)
-
-            for _, row in sampled.iterrows():
-                text = str(row.get("reviews.text", ""))
-                if len(text.strip()) < 5:
-                    continue
-                sample_reviews.append({
-                    "text": text[:500],
-                    "rating": int(row.get("reviews.rating", 0)),
-                    "sentiment": str(label),
-                    "product": str(row.get("name", "Unknown"))[:80],
-                    "cluster": str(cluster_name),
-                    "confidence": round(float(row.get("predicted_score", 0.0)), 3)
-                        if "predicted_score" in row.index else None,
-                })
-
-random.shuffle(sample_reviews)
-sample_reviews = sample_reviews[:500]  # cap total
-
-with open(f"{OUTPUT_DIR}/reviews_sample.json", "w") as f:
-    json.dump(sample_reviews, f, indent=2, ensure_ascii=False)
-print(f"  Saved reviews_sample.json ({len(sample_reviews)} reviews)")
+product_index, product_pages = product_shards(products_out, args.page_size)
+if write_artifact("products", product_pages):
+    print(f"  Saved products/ ({len(products_out)} products, {len(product_pages)} pages)")
+
+# ---------- 4. REVIEWS/ ----------
+print("Generating reviews/...")
+
+review_index, review_pages = review_shards(samples, args.page_size)
+n_reviews = sum(shard["count"] for shard in review_index)
+if write_artifact("reviews", review_pages):
+    print(f"  Saved reviews/ ({n_reviews:,} reviews in {len(review_index)} shards, {len(review_pages)} pages)")
+
+print("Generating search/...")
+# Document ids are positions in the pages above, in shard order
+search_pages = {}
+if "search" in stale:
+    with stage("build.search") as s:
+        texts = [r["text"] for page in review_pages.values() for r in page]
+        search_pages = search_files(build_postings(texts), len(texts))
+        s["documents"] = len(texts)
+if write_artifact("search", search_pages):
+    meta = search_pages["search/shards.json"]
+    print(f"  Saved search/ ({sum(s['terms'] for s in meta['shards']):,} terms in {len(meta['shards'])} shards)")
 
 # ---------- 5. CLUSTERS_LOCAL.JSON ----------
 print("Generating clusters_local.json...")
@@ -251,31 +391,66 @@ print("Generating clusters_local.json...")
 clusters_local_out = {}
 local_cluster_summaries = summaries_local.get("cluster_summaries", {})
 
-if cluster_col and local_cluster_summaries:
-    for name, group in df.groupby(cluster_col):
-        sentiment_dist = {}
-        if sentiment_col in group.columns:
-            for label, count in group[sentiment_col].value_counts().items():
-                sentiment_dist[str(label).upper()] = int(count)
-
+if local_cluster_summaries:
+    for name, c in agg["clusters"].items():
         clusters_local_out[name] = {
-            "review_count": int(len(group)),
-            "product_count": int(group["name"].nunique()),
-            "avg_rating": round(float(group["reviews.rating"].mean()), 2),
-            "sentiment": sentiment_dist,
+            "review_count": c["review_count"],
+            "product_count": c["product_count"],
+            "avg_rating": c["avg_rating"],
+            "sentiment": c["sentiment"],
             "summary": local_cluster_summaries.get(name, "Summary not available."),
         }
 
-with open(f"{OUTPUT_DIR}/clusters_local.json", "w") as f:
-    json.dump(clusters_local_out, f, indent=2, ensure_ascii=False)
-print(f"  Saved clusters_local.json ({len(clusters_local_out)} clusters)")
+if write_artifact("clusters_local", {"clusters_local.json": clusters_local_out}):
+    print(f"  Saved clusters_local.json ({len(clusters_local_out)} clusters)")
+
+# ---------- 6. INDEX.JSON ----------
+print("Generating index.json...")
+
+# Written last: page URLs carry the versions so browsers can cache them between builds
+index = {
+    "versions": {artifact: manifest.version(artifact) for artifact in ARTIFACT_DEPS if artifact != "index"},
+    "products": {"page_size": args.page_size, "total": len(products_out), "shards": product_index},
+    "reviews": {"page_size": args.page_size, "total": n_reviews, "shards": review_index},
+}
+if write_artifact("index", {"index.json": index}):
+    print(f"  Saved index.json ({len(product_index)} product shards, {len(review_index)} review shards)")
 
 # ---------- DONE ----------
+with stage("manifest.save"):
+    if rows_changed:
+        groups = {
+            "rows": row_digests, "overall": overall,
+            "products": agg["products"], "product_fp": product_fp,
+            "clusters": agg["clusters"], "cluster_fp": cluster_fp,
+            "samples": samples,
+        }
+        manifest.save(groups)
+    else:
+        manifest.save()
+
 print(f"\n{'='*50}")
 print(f"Webapp data generated in {OUTPUT_DIR}/")
+print(f"  index.json          - Shard manifest for the front end")
 print(f"  stats.json          - Dashboard overview")
 print(f"  clusters.json       - Cluster summaries (API)")
 print(f"  clusters_local.json - Cluster summaries (Local T5)")
-print(f"  products.json       - Product data + summaries")
-print(f"  reviews_sample.json - Sample reviews for explorer")
+print(f"  products/           - Product data + summaries, paged")
+print(f"  reviews/            - Sample reviews for explorer, paged")
+print(f"  search/             - Text index for the explorer search")
+
+# What the browser downloads before the dashboard renders, per encoding
+first_load = payload_sizes(OUTPUT_DIR, ["index.json", "stats.json"])
+everything = payload_sizes(OUTPUT_DIR, [rel for a in manifest.artifacts.values()
+                                        for rel in a["files"] if rel.endswith(".json")])
+print(f"\n{'':<12} {'raw':>10} {'gzip':>10} {'brotli':>10}")
+for label, sizes in [("first load", first_load), ("all files", everything)]:
+    br = f"{sizes['br'] / 1024:>8.1f}KB" if sizes["br"] is not None else f"{'-':>10}"
+    print(f"{label:<12} {sizes['raw'] / 1024:>8.1f}KB {sizes['gz'] / 1024:>8.1f}KB {br}")
+if brotli is None:
+    print("  (pip install brotli to also write .br files)")
+peak_mb = peak_memory_mb()
+if peak_mb is not None:
+    print(f"\nPeak memory: {peak_mb:,.0f} MB")
+print_summary()
 print(f"\nNext: Copy webapp/ folder to your OVH hosting")
@@ -0,0 +1,109 @@
+"""
+inference_worker.py — Micro-batching queue in front of the summarizer
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Gradio runs each "Generate Summary" click in its own thread. Instead of
+calling model.generate once per click, handlers submit their brief to one
+shared worker thread. The worker waits up to GEN_BATCH_WINDOW_MS for more
+requests to arrive (or until GEN_MAX_BATCH are queued), then generates them
+as one padded batch and hands each caller its own summary.
+
+    GEN_BATCH_WINDOW_MS   how long to wait for company after the first request (default 25)
+    GEN_MAX_BATCH         most requests per batch (default 8)
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from summarizer import DEFAULT_PROFILE, generate_summaries
+
+BATCH_WINDOW_MS = float(os.getenv("GEN_BATCH_WINDOW_MS", "25"))
+MAX_BATCH = int(os.getenv("GEN_MAX_BATCH", "8"))
+
+
+class InferenceWorker:
+    """One background thread that turns concurrent requests into batched generate calls."""
+
+    def __init__(self, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH, use_summary_cache=True):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.use_summary_cache = use_summary_cache
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="inference-worker", daemon=True)
+                self._thread.start()
+        return self
+
+    def submit(self, brief, profile=DEFAULT_PROFILE) -> Future:
+        """Queue one brief; the Future resolves to its summary."""
+        self.start()
+        future = Future()
+        self._queue.put((brief, profile, future))
+        return future
+
+    def summarize(self, brief, profile=DEFAULT_PROFILE) -> str:
+        """Blocking helper for Gradio handlers."""
+        return self.submit(brief, profile).result()
+
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes or the batch is full."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Requests with different decoding profiles cannot share a generate call
+            by_profile = {}
+            for brief, profile, future in batch:
+                by_profile.setdefault(profile, []).append((brief, future))
+
+            for profile, items in by_profile.items():
+                live = [(b, f) for b, f in items if f.set_running_or_notify_cancel()]
+                if not live:
+                    continue
+                briefs = [b for b, _ in live]
+                futures = [f for _, f in live]
+                try:
+                    summaries = generate_summaries(
+                        briefs, batch_size=self.max_batch, profile=profile,
+                        use_summary_cache=self.use_summary_cache,
+                    )
+                except Exception as exc:  # surface the error in every waiting handler
+                    for f in futures:
+                        f.set_exception(exc)
+                    continue
+                for f, summary in zip(futures, summaries):
+                    f.set_result(summary)
+                self.batches += 1
+                self.requests += len(briefs)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+
+INFERENCE_WORKER = InferenceWorker()
@@ -0,0 +1,75 @@
+"""
+ingest.py — Chunked CSV ingestion for the static site generator
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Streams data_with_clusters.csv and data_with_predictions_v2.csv in aligned
+chunks, reading only the columns the generator uses with compact dtypes.
+Each chunk is folded into the running (cluster, product, sentiment, rating)
+counts from aggregate.py, so memory depends on the chunk size and the
+number of groups, not on the number of reviews. The explorer sample is
+drawn from the same chunks by sampling.ReservoirSampler.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from aggregate import count_reviews, merge_counts
+
+REVIEW_COLS = ["name", "cluster_name", "reviews.rating", "reviews.text", "sentiment"]
+PRED_COLS = ["predicted_label", "predicted_score"]
+DTYPES = {
+    "name": "category",
+    "cluster_name": "category",
+    "sentiment": "category",
+    "predicted_label": "category",
+    "reviews.rating": "float32",
+    "predicted_score": "float64",  # rounded to 3 decimals in the sample, keep full precision
+}
+
+
+def read_header(path):
+    """Column names of a CSV without reading any rows."""
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_chunks(reviews_path, pred_path, chunksize):
+    """Yield review chunks with the prediction columns joined by row position."""
+    review_cols = [c for c in REVIEW_COLS if c in read_header(reviews_path)]
+    reviews = pd.read_csv(reviews_path, usecols=review_cols, dtype=DTYPES, chunksize=chunksize)
+
+    preds = None
+    if pred_path and "predicted_label" in read_header(pred_path):
+        pred_cols = [c for c in PRED_COLS if c in read_header(pred_path)]
+        preds = pd.read_csv(pred_path, usecols=pred_cols, dtype=DTYPES, chunksize=chunksize)
+
+    for chunk in reviews:
+        if preds is not None:
+            pred_chunk = next(preds, None)
+            for col in PRED_COLS:
+                # Both readers number rows continuously, so index alignment
+                # matches the positional join of the in-memory path
+                chunk[col] = pred_chunk[col] if pred_chunk is not None else np.nan
+        yield chunk
+
+
+def stream_counts(chunks, sentiment_col, cluster_col):
+    """Fold every chunk into one (cluster, product, sentiment, rating) count table."""
+    counts = None
+    n_rows = 0
+    for chunk in chunks:
+        n_rows += len(chunk)
+        part = count_reviews(chunk, sentiment_col, cluster_col)
+        counts = part if counts is None else merge_counts([counts, part])
+    return counts, n_rows
+
+
+def peak_memory_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
@@ -0,0 +1,385 @@
+"""
+profiling.py — Stage timers, memory sampling and run reports for the generator and the app
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Off unless PROFILE_STAGES is set, and free while off: stage() hands back
+one shared no-op context manager and nothing else runs.
+
+    PROFILE_STAGES=1             wall time and RSS (start, end, sampled peak) per stage
+    PROFILE_STAGES=tracemalloc   also the peak of Python allocations per stage
+                                 (tracemalloc slows the run: +25% on a full build)
+    PROFILE_REPORT=path          run report written at exit, .json (default) or .csv;
+                                 default webapp/.cache/profile/<script>-<time>.json
+    PROFILE_METRICS_PORT=9100    app_gradio.py: serve Prometheus text on :9100/metrics
+    PROFILE_METRICS_HOST=...     interface the metrics bind to (default 127.0.0.1,
+                                 this machine only; 0.0.0.0 for a remote scraper)
+    PROFILE_SAMPLE_MS=10         RSS sampling interval
+
+Usage:
+    with stage("load.reviews") as s:
+        df = ...
+        s["rows"] = len(df)      # extra fields go into the stage's record
+
+Stages nest (each record names its parent) and may run on several threads.
+The RSS peak of a stage is sampled by one background thread, so stages
+shorter than the interval report their start/end RSS only.
+"""
+
+import atexit
+import csv
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+MODE = os.getenv("PROFILE_STAGES", "0").lower()
+ENABLED = MODE not in ("", "0", "false", "off")
+TRACEMALLOC = ENABLED and MODE == "tracemalloc"
+REPORT_DIR = Path(__file__).parent / ".cache" / "profile"
+SAMPLE_SECONDS = float(os.getenv("PROFILE_SAMPLE_MS", "10")) / 1000
+METRICS_HOST = os.getenv("PROFILE_METRICS_HOST", "127.0.0.1")
+TOKEN_WINDOW = 5000  # per-token latencies kept for the Prometheus quantiles
+CSV_FIELDS = ["stage", "parent", "thread", "start_s", "seconds", "rss_start_mb", "rss_end_mb",
+              "rss_peak_mb", "py_peak_mb"]
+
+
+def rss_bytes():
+    """Resident set size of this process now (None where unsupported)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def _mb(n):
+    return None if n is None else round(n / 2 ** 20, 2)
+
+
+class _NullStage:
+    """What stage() returns when profiling is off: entering it does nothing, fields are dropped."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setitem__(self, key, value):
+        pass
+
+    def elapsed(self):
+        return 0.0
+
+
+_NULL = _NullStage()
+
+
+class _Stage:
+    def __init__(self, profiler, name, fields):
+        self.profiler = profiler
+        self.name = name
+        self.fields = fields
+
+    def __setitem__(self, key, value):
+        self.fields[key] = value
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def __enter__(self):
+        self.profiler._enter(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._exit(self, failed=exc[0] is not None)
+        return False
+
+
+class Profiler:
+    """Collects stage records; summary(), write_report() and prometheus_text() read them."""
+
+    def __init__(self, tracemalloc_enabled=False):
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.records = []
+        self.totals = {}  # stage -> {"runs", "seconds", "last_seconds", "rss_peak"}
+        self.tokens = {"generated": 0, "seconds": 0.0, "latencies": [], "tokens_per_sec": None,
+                       "first_token_s": None}
+        self.tracemalloc = tracemalloc_enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._active = set()
+        self._sampler = None
+        if self.tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # ---------- stages ----------
+    def stage(self, name, **fields):
+        return _Stage(self, name, fields)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, s):
+        stack = self._stack()
+        s.parent = stack[-1].name if stack else None
+        if self.tracemalloc:
+            # reset_peak() is process-wide: fold the running peak into the enclosing stage first
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].py_peak = max(stack[-1].py_peak, peak)
+            tracemalloc.reset_peak()
+            s.py_start, s.py_peak = current, current
+        stack.append(s)
+        s.stack = stack
+        s.rss_start = s.rss_peak = rss_bytes()
+        with self._lock:
+            self._active.add(s)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name="profile-rss", daemon=True)
+                self._sampler.start()
+        s.start = time.perf_counter()
+
+    def _exit(self, s, failed):
+        seconds = time.perf_counter() - s.start
+        rss_end = rss_bytes()
+        stack = s.stack
+        stack.remove(s)
+        record = {
+            "stage": s.name, "parent": s.parent, "thread": threading.current_thread().name,
+            "start_s": round(s.start - self.origin, 4), "seconds": round(seconds, 6),
+            "rss_start_mb": _mb(s.rss_start), "rss_end_mb": _mb(rss_end),
+            "rss_peak_mb": _mb(max(v for v in (s.rss_peak, rss_end, s.rss_start) if v is not None))
+            if rss_end is not None else None,
+            "py_peak_mb": None,
+        }
+        if self.tracemalloc:
+            peak = max(s.py_peak, tracemalloc.get_traced_memory()[1])
+            record["py_peak_mb"] = _mb(peak - s.py_start)
+            if stack:
+                stack[-1].py_peak = max(stack[-1].py_peak, peak)
+        if failed:
+            record["failed"] = True
+        record.update(s.fields)
+        with self._lock:
+            self._active.discard(s)
+            self.records.append(record)
+            total = self.totals.setdefault(s.name, {"runs": 0, "seconds": 0.0, "last_seconds": 0.0,
+                                                    "rss_peak_mb": None})
+            total["runs"] += 1
+            total["seconds"] += seconds
+            total["last_seconds"] = seconds
+            if record["rss_peak_mb"] is not None:
+                total["rss_peak_mb"] = max(total["rss_peak_mb"] or 0.0, record["rss_peak_mb"])
+
+    def _sample(self):
+        while True:
+            time.sleep(SAMPLE_SECONDS)
+            rss = rss_bytes()
+            if rss is None:
+                return
+            with self._lock:
+                for s in self._active:
+                    s.rss_peak = max(s.rss_peak or 0, rss)
+
+    # ---------- generation ----------
+    def record_tokens(self, n_tokens, seconds, latencies=(), first_token_s=None):
+        """Generated tokens over `seconds`; latencies are per-token gaps when streaming."""
+        with self._lock:
+            t = self.tokens
+            t["generated"] += n_tokens
+            t["seconds"] += seconds
+            t["tokens_per_sec"] = n_tokens / seconds if seconds > 0 else None
+            if first_token_s is not None:
+                t["first_token_s"] = first_token_s
+            t["latencies"].extend(latencies)
+            del t["latencies"][:-TOKEN_WINDOW]
+
+    # ---------- output ----------
+    def stage_totals(self):
+        with self._lock:
+            return {name: dict(t) for name, t in self.totals.items()}
+
+    def summary(self, file=None):
+        """Table of stage totals, in first-run order."""
+        file = file or sys.stdout
+        totals = self.stage_totals()
+        if not totals:
+            return
+        print(f"\n{'stage':<28} {'runs':>5} {'seconds':>9} {'peak RSS':>10}", file=file)
+        for name, t in totals.items():
+            peak = f"{t['rss_peak_mb']:>8,.0f}MB" if t["rss_peak_mb"] is not None else f"{'-':>10}"
+            print(f"{name:<28} {t['runs']:>5} {t['seconds']:>9.3f} {peak}", file=file)
+        tok = self.tokens
+        if tok["generated"]:
+            print(f"generated {tok['generated']:,} tokens in {tok['seconds']:.2f}s "
+                  f"({tok['generated'] / tok['seconds']:.1f} tokens/s)", file=file)
+
+    def report(self):
+        with self._lock:
+            tok = dict(self.tokens)
+            lat = sorted(tok.pop("latencies"))
+            records = list(self.records)
+        if lat:
+            tok["token_latency_ms"] = {q: round(lat[min(len(lat) - 1, int(len(lat) * p))] * 1000, 3)
+                                       for q, p in (("p50", 0.5), ("p95", 0.95), ("max", 1.0))}
+        if tok["seconds"]:
+            tok["avg_tokens_per_sec"] = round(tok["generated"] / tok["seconds"], 2)
+        return {
+            "script": os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "python",
+            "argv": sys.argv[1:],
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "wall_seconds": round(time.perf_counter() - self.origin, 3),
+            "mode": "tracemalloc" if self.tracemalloc else "rss",
+            "rss_end_mb": _mb(rss_bytes()),
+            "stages": records,
+            "totals": self.stage_totals(),
+            "generation": tok,
+        }
+
+    def write_report(self, path=None):
+        """Write the run report (.csv: one row per stage run; else JSON); returns the path."""
+        report = self.report()
+        if path is None:
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+            path = REPORT_DIR / f"{Path(report['script']).stem}-{stamp}.json"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".csv":
+            extra = sorted({k for r in report["stages"] for k in r} - set(CSV_FIELDS))
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS + extra)
+                writer.writeheader()
+                writer.writerows(report["stages"])
+        else:
+            path.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+        return path
+
+    def prometheus_text(self):
+        """Stage totals, token counters and RSS in the Prometheus text exposition format."""
+        totals = self.stage_totals()
+        with self._lock:
+            tok = dict(self.tokens, latencies=sorted(self.tokens["latencies"]))
+
+        def label(name):
+            return name.replace("\\", "\\\\").replace('"', '\\"')
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+
+        metric("webapp_stage_runs_total", "counter", "Completed runs of each stage.",
+               [(f'{{stage="{label(n)}"}}', t["runs"]) for n, t in totals.items()])
+        metric("webapp_stage_seconds_total", "counter", "Wall time spent in each stage.",
+               [(f'{{stage="{label(n)}"}}', round(t["seconds"], 6)) for n, t in totals.items()])
+        metric("webapp_stage_last_seconds", "gauge", "Wall time of the last run of each stage.",
+               [(f'{{stage="{label(n)}"}}', round(t["last_seconds"], 6)) for n, t in totals.items()])
+        metric("webapp_stage_rss_peak_bytes", "gauge", "Highest sampled RSS during each stage.",
+               [(f'{{stage="{label(n)}"}}', int(t["rss_peak_mb"] * 2 ** 20))
+                for n, t in totals.items() if t["rss_peak_mb"] is not None])
+        metric("webapp_generated_tokens_total", "counter", "Tokens generated by the summarizer.",
+               [("", tok["generated"])])
+        metric("webapp_generation_seconds_total", "counter", "Time spent generating those tokens.",
+               [("", round(tok["seconds"], 6))])
+        if tok["tokens_per_sec"] is not None:
+            metric("webapp_generation_tokens_per_second", "gauge", "Throughput of the last generation.",
+                   [("", round(tok["tokens_per_sec"], 3))])
+        lat = tok["latencies"]
+        if lat:
+            metric("webapp_token_latency_seconds", "summary",
+                   f"Gap between streamed tokens (last {TOKEN_WINDOW:,}).",
+                   [(f'{{quantile="{q}"}}', round(lat[min(len(lat) - 1, int(len(lat) * q))], 6))
+                    for q in (0.5, 0.9, 0.99)]
+                   + [("_sum", round(sum(lat), 6)), ("_count", len(lat))])
+        rss = rss_bytes()
+        if rss is not None:
+            metric("webapp_resident_memory_bytes", "gauge", "Resident set size of the process.", [("", rss)])
+        return "\n".join(lines) + "\n"
+
+
+PROFILER = Profiler(TRACEMALLOC) if ENABLED else None
+
+
+def stage(name, **fields):
+    """Context manager timing one stage; a shared no-op when profiling is off."""
+    if PROFILER is None:
+        return _NULL
+    return PROFILER.stage(name, **fields)
+
+
+def record_generation(s, n_tokens, steps, latencies=(), first_token_s=None):
+    """Add token throughput to the record of stage `s`, which timed one generate() call.
+
+    steps is the number of decoding steps (the longest output), latencies the
+    gaps between streamed tokens, in seconds.
+    """
+    if PROFILER is None:
+        return
+    seconds = s.elapsed()
+    s["tokens"] = n_tokens
+    s["steps"] = steps
+    s["ms_per_step"] = round(seconds / steps * 1000, 3) if steps else None
+    s["tokens_per_sec"] = round(n_tokens / seconds, 2) if seconds > 0 else None
+    if first_token_s is not None:
+        s["first_token_ms"] = round(first_token_s * 1000, 3)
+    PROFILER.record_tokens(n_tokens, seconds, latencies, first_token_s)
+
+
+def print_summary(file=None):
+    if PROFILER is not None:
+        PROFILER.summary(file)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = PROFILER.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve_metrics(port, host=METRICS_HOST):
+    """Serve /metrics from a daemon thread; None when profiling is off."""
+    if PROFILER is None:
+        return None
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="profile-metrics", daemon=True).start()
+    return server
+
+
+def _write_at_exit():
+    try:
+        path = PROFILER.write_report(os.getenv("PROFILE_REPORT") or None)
+    except OSError as e:
+        print(f"Profile report not written: {e}", file=sys.stderr)
+        return
+    print(f"Profile report: {path}", file=sys.stderr)
+
+
+if PROFILER is not None:
+    atexit.register(_write_at_exit)
@@ -0,0 +1,117 @@
+"""
+publish.py — Minified, precompressed and paged JSON for the static site
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Every file is written minified, with .gz and (when the brotli package is
+installed) .br siblings that the web server hands out instead of the plain
+file (see webapp/.htaccess). Products and explorer reviews are split into
+fixed-size pages:
+
+    products/<shard>/<page>.json   "all", then one shard per cluster
+    reviews/<shard>/<page>.json    one shard per (cluster, sentiment),
+                                   sorted by rating so each star filter
+                                   is a contiguous range of the shard
+
+index.json describes the shards (counts, pages, rating ranges) so the
+front end fetches only the pages the current filter and page need.
+"""
+
+import gzip
+import json
+import os
+
+try:
+    import brotli
+except ImportError:  # optional: .gz only
+    brotli = None
+
+PAGE_SIZE = 100
+SENTIMENTS = ["POSITIVE", "NEGATIVE", "NEUTRAL"]
+
+
+def encode_json(obj):
+    """Minified UTF-8 JSON bytes."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def write_file(output_dir, rel_path, obj):
+    """Write one JSON file and its compressed siblings; returns the relative paths written."""
+    data = encode_json(obj)
+    path = os.path.join(output_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    variants = {rel_path: data, rel_path + ".gz": gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        variants[rel_path + ".br"] = brotli.compress(data, quality=11)
+    for rel, payload in variants.items():
+        with open(os.path.join(output_dir, rel), "wb") as f:
+            f.write(payload)
+    return list(variants)
+
+
+def paginate(records, page_size=PAGE_SIZE):
+    return [records[i:i + page_size] for i in range(0, len(records), page_size)]
+
+
+def product_shards(products, page_size=PAGE_SIZE):
+    """(shard list, {relative path: page}) for products already in display order."""
+    # Shards follow the table's first-appearance order; ids number clusters by name, like reviews
+    clusters = list(dict.fromkeys(p["cluster"] for p in products))
+    ids = {c: f"c{i:02d}" for i, c in enumerate(sorted(clusters, key=str))}
+    groups = [("all", None, products)] + [
+        (ids[c], c, [p for p in products if p["cluster"] == c]) for c in clusters
+    ]
+    shards, files = [], {}
+    for shard_id, cluster, records in groups:
+        pages = paginate(records, page_size)
+        shards.append({"id": shard_id, "cluster": cluster, "count": len(records), "pages": len(pages)})
+        for n, page in enumerate(pages):
+            files[f"products/{shard_id}/{n}.json"] = page
+    return shards, files
+
+
+def review_shards(samples, page_size=PAGE_SIZE):
+    """(shard list, {relative path: page}) from {cluster: sampled review records}."""
+    shards, files = [], {}
+    for i, cluster in enumerate(sorted(samples)):
+        for label in SENTIMENTS:
+            records = [r for r in samples[cluster] if r["sentiment"] == label]
+            if not records:
+                continue
+            # Stable sort: within a rating, reviews keep their sampled order
+            records.sort(key=lambda r: -r["rating"])
+            ratings = {}
+            for pos, r in enumerate(records):
+                start, count = ratings.get(str(r["rating"]), (pos, 0))
+                ratings[str(r["rating"])] = (start, count + 1)
+            shard_id = f"c{i:02d}-{label.lower()}"
+            pages = paginate(records, page_size)
+            shards.append({
+                "id": shard_id, "cluster": records[0]["cluster"], "sentiment": label,
+                "count": len(records), "pages": len(pages),
+                "ratings": {k: list(v) for k, v in ratings.items()},
+            })
+            for n, page in enumerate(pages):
+                files[f"reviews/{shard_id}/{n}.json"] = page
+    return shards, files
+
+
+def remove_files(output_dir, rel_paths):
+    """Delete files left over from a previous build, and directories they leave empty."""
+    for rel in rel_paths:
+        path = os.path.join(output_dir, rel)
+        if os.path.exists(path):
+            os.remove(path)
+        parent = os.path.dirname(path)
+        if os.path.isdir(parent) and not os.listdir(parent):
+            os.rmdir(parent)
+
+
+def payload_sizes(output_dir, rel_paths):
+    """{"raw", "gz", "br"} total bytes of JSON files, per encoding (br None without brotli)."""
+    sizes = {"raw": 0, "gz": 0, "br": 0 if brotli is not None else None}
+    for rel in rel_paths:
+        for enc, suffix in (("raw", ""), ("gz", ".gz"), ("br", ".br")):
+            path = os.path.join(output_dir, rel + suffix)
+            if sizes[enc] is not None and os.path.exists(path):
+                sizes[enc] += os.path.getsize(path)
+    return sizes
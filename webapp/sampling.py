@@ -0,0 +1,159 @@
+"""
+sampling.py — Stratified review sample for the explorer, in memory or streamed
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+A review is usable when it has a cluster, a POSITIVE / NEGATIVE / NEUTRAL
+label and at least MIN_TEXT characters of text. Every usable review gets a
+random rank: a seeded 64-bit hash of its (cluster, sentiment) group and its
+position among the group's usable reviews. The sample of a group is its
+per_label lowest-ranked reviews, found for all groups with one sort on the
+group and a partial sort per group; explorer records are then built
+column-wise for those rows only.
+
+Keeping the lowest ranks seen so far is also a reservoir sampler: fed
+chunk by chunk, ReservoirSampler holds at most per_label rows per group
+and ends with the same sample as one pass over the whole frame. A
+cluster's sample depends only on its own reviews.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from publish import SENTIMENTS
+
+MIN_TEXT = 5  # shorter (stripped) texts are not shown in the explorer
+MAX_TEXT = 500
+MAX_PRODUCT = 80
+RECORD_COLS = ["text", "rating", "sentiment", "product", "cluster", "confidence"]
+
+
+def _mix(x):
+    """splitmix64 finalizer: well-spread 64-bit hashes of uint64 values."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _group_seed(seed, cluster, label):
+    digest = hashlib.sha256(f"{seed}|{cluster}|{label}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def normalize_labels(values):
+    """Index into SENTIMENTS of each value, case-insensitive (-1 for anything else).
+
+    Uppercases each distinct value once instead of every row.
+    """
+    codes, uniques = pd.factorize(values)
+    lookup = np.array([SENTIMENTS.index(u.upper()) if isinstance(u, str) and u.upper() in SENTIMENTS else -1
+                       for u in uniques] + [-1], dtype=np.int64)
+    return lookup[codes]  # code -1 (missing) reads the trailing -1
+
+
+def lowest_ranks(group, rank, per_label):
+    """Positions of the per_label lowest ranks in each group, in group then rank order."""
+    order = np.argsort(group, kind="stable")
+    picked = []
+    for part in np.split(order, np.flatnonzero(np.diff(group[order])) + 1):
+        if len(part) > per_label:
+            part = part[np.argpartition(rank[part], per_label - 1)[:per_label]]
+        picked.append(part[np.argsort(rank[part], kind="stable")])
+    return np.concatenate(picked) if picked else np.empty(0, dtype=np.int64)
+
+
+class ReservoirSampler:
+    """Stratified sample of a frame, or of a stream of chunks, holding at most per_label rows per group."""
+
+    def __init__(self, sentiment_col, cluster_col, per_label=20, seed=42):
+        self.sentiment_col = sentiment_col
+        self.cluster_col = cluster_col
+        self.per_label = per_label
+        self.seed = seed
+        self._seen = {}  # usable rows so far per (cluster, label), for positions across chunks
+        self._kept = None
+
+    def _candidates(self, frame):
+        """Rank every usable row of a frame; explorer records for its lowest-ranked ones."""
+        if "reviews.text" not in frame.columns or not len(frame):
+            return None
+        label = normalize_labels(frame[self.sentiment_col])
+        cluster_codes, clusters = pd.factorize(frame[self.cluster_col])
+        texts = frame["reviews.text"].astype(str)
+        usable = np.flatnonzero((label >= 0) & (cluster_codes >= 0)
+                                & (texts.str.strip().str.len() >= MIN_TEXT).to_numpy())
+        if not len(usable):
+            return None
+        names = np.array([str(c) for c in clusters], dtype=object)
+        by_name = np.argsort(np.argsort(names.astype(str)))  # cluster codes in name order
+        cluster = names[cluster_codes[usable]]
+        label = label[usable]
+
+        # Position of each row among its group's usable rows, continuing from earlier chunks
+        group = cluster_codes[usable] * len(SENTIMENTS) + label
+        sizes = np.bincount(group, minlength=len(names) * len(SENTIMENTS))
+        offsets = np.zeros(len(sizes), dtype=np.uint64)
+        seeds = np.zeros(len(sizes), dtype=np.uint64)
+        for k in np.flatnonzero(sizes):
+            name = (names[k // len(SENTIMENTS)], SENTIMENTS[k % len(SENTIMENTS)])
+            offsets[k] = self._seen.get(name, 0)
+            seeds[k] = _group_seed(self.seed, *name)
+            self._seen[name] = int(offsets[k]) + int(sizes[k])
+        pos = pd.Series(group).groupby(group).cumcount().to_numpy(np.uint64) + offsets[group]
+        rank = _mix(seeds[group] + pos * np.uint64(0x9E3779B97F4A7C15))
+
+        # Only the rows that can still make the sample become records
+        picked = lowest_ranks(by_name[cluster_codes[usable]] * len(SENTIMENTS) + label, rank, self.per_label)
+        rows = frame.iloc[usable[picked]]
+        out = pd.DataFrame({
+            "text": texts.iloc[usable[picked]].str.slice(0, MAX_TEXT).to_numpy(),
+            "rating": pd.to_numeric(rows["reviews.rating"], errors="coerce").fillna(0).astype(int).to_numpy()
+                if "reviews.rating" in rows.columns else 0,
+            "sentiment": np.array(SENTIMENTS, dtype=object)[label[picked]],
+            "product": rows["name"].astype(str).str.slice(0, MAX_PRODUCT).to_numpy()
+                if "name" in rows.columns else "Unknown",
+            "cluster": cluster[picked],
+        })
+        if "predicted_score" in rows.columns:
+            score = rows["predicted_score"].astype(float).round(3).to_numpy()
+            out["confidence"] = np.where(np.isnan(score), None, score.astype(object))
+        else:
+            out["confidence"] = None
+        out["_label"] = label[picked]
+        out["_rank"] = rank[picked]
+        return out
+
+    def update(self, frame):
+        fresh = self._candidates(frame)
+        if fresh is None:
+            return
+        pool = fresh if self._kept is None else pd.concat([self._kept, fresh], ignore_index=True)
+        cluster_codes, _ = pd.factorize(pool["cluster"], sort=True)
+        picked = lowest_ranks(cluster_codes * len(SENTIMENTS) + pool["_label"].to_numpy(),
+                              pool["_rank"].to_numpy(np.uint64), self.per_label)
+        self._kept = pool.iloc[picked].reset_index(drop=True)
+
+    def observe(self, chunks):
+        """Pass chunks through unchanged, folding each into the sample."""
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    def result(self):
+        """{cluster: explorer records}, each cluster's in label then rank order."""
+        if self._kept is None:
+            return {}
+        columns = [self._kept[c].tolist() for c in RECORD_COLS]
+        out = {}
+        for values in zip(*columns):
+            record = dict(zip(RECORD_COLS, values))
+            out.setdefault(record["cluster"], []).append(record)
+        return out
+
+
+def stratified_sample(frame, sentiment_col, cluster_col, per_label=20, seed=42):
+    """{cluster: explorer records} sampled from a whole frame in one pass."""
+    sampler = ReservoirSampler(sentiment_col, cluster_col, per_label, seed)
+    sampler.update(frame)
+    return sampler.result()
@@ -0,0 +1,132 @@
+"""
+search_index.py — Inverted index over the explorer's review text
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Documents are the explorer reviews in the order publish.review_shards
+lays them out, so a document id is a position in the concatenated review
+shards. The browser turns it back into (shard, page, offset) with the
+counts in index.json, and turns the cluster / sentiment / rating filters
+into id ranges the same way (shards are per cluster and sentiment, sorted
+by rating): the facets need no storage of their own.
+
+    search/shards.json   tokenizer settings, document count and the term
+                         range [first, last] of every shard
+    search/<n>.json      {"terms": [...], "counts": [...], "deltas": [...]}:
+                         the sorted document ids of each term, delta-encoded
+                         (the first id of a term is absolute)
+
+Shards cover consecutive runs of the sorted vocabulary, cut so that each
+holds about SHARD_POSTINGS ids; a query loads only the shards its terms
+(or, for the word being typed, its prefix) fall in.
+
+Tokens are lowercase runs of [a-z0-9], two characters or longer, minus
+STOPWORDS; index.html tokenizes queries the same way.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+TOKEN_PATTERN = r"[a-z0-9]+"
+MIN_TOKEN = 2
+MIN_PREFIX = 2  # shorter last words are matched exactly, not as a prefix
+SHARD_POSTINGS = 50_000
+CHUNK_DOCS = 100_000
+# Too common to narrow a search; negations are kept ("not working")
+STOPWORDS = sorted("""
+a an and are as at be been but by for from had has have he her his i if in into is it its
+me my of on or our she so than that the their them then there these they this those to
+was we were what when which who will with you your
+""".split())
+_MARK = "\x01"  # document separator token, kept by the byte table below
+_BYTE_TABLE = bytes(b if chr(b) in "abcdefghijklmnopqrstuvwxyz0123456789" + _MARK else 32 for b in range(256))
+
+
+def tokenize(text):
+    """Index terms of one text, in order, repeats included."""
+    stop = set(STOPWORDS)
+    return [t for t in re.findall(TOKEN_PATTERN, str(text).lower()) if len(t) >= MIN_TOKEN and t not in stop]
+
+
+def build_postings(texts):
+    """(terms, counts, docs): sorted vocabulary, ids per term, and all ids grouped by term.
+
+    Tokenizes CHUNK_DOCS texts at a time as one byte string: every byte
+    outside [a-z0-9] becomes a space (so does all of non-ASCII UTF-8, as
+    in the regex) and split() cuts the tokens, with a marker token between
+    documents. Each chunk's (term, doc) pairs are deduplicated with an
+    integer sort instead of per-document sets.
+    """
+    stop = set(STOPWORDS)
+    vocabulary = {}
+    term_parts, doc_parts = [], []
+    for start in range(0, len(texts), CHUNK_DOCS):
+        chunk = [t.replace(_MARK, " ") if isinstance(t, str) else "" for t in texts[start:start + CHUNK_DOCS]]
+        tokens = f" {_MARK} ".join(chunk).lower().encode("utf-8").translate(_BYTE_TABLE).split()
+        codes, uniques = pd.factorize(np.array(tokens, dtype=object))
+        words = [u.decode("ascii") for u in uniques]
+        ids = np.array([vocabulary.setdefault(w, len(vocabulary))
+                        if len(w) >= MIN_TOKEN and w not in stop else -1 for w in words], dtype=np.int64)
+        is_mark = np.array([w == _MARK for w in words], dtype=bool)[codes]
+        doc = start + np.cumsum(is_mark)
+        term = ids[codes]
+        valid = term >= 0
+        pairs = np.sort(term[valid] * len(texts) + doc[valid])
+        pairs = pairs[np.diff(pairs, prepend=-1) != 0]
+        term_parts.append(pairs // len(texts))
+        doc_parts.append(pairs % len(texts))
+
+    terms = np.array(sorted(vocabulary), dtype=object)
+    rank = np.empty(len(vocabulary), dtype=np.int64)
+    rank[[vocabulary[t] for t in terms]] = np.arange(len(terms))
+    term = rank[np.concatenate(term_parts)] if term_parts else np.empty(0, dtype=np.int64)
+    doc = np.concatenate(doc_parts) if doc_parts else np.empty(0, dtype=np.int64)
+    # Chunks are in document order, so a stable sort on the term keeps each term's ids ascending
+    order = np.argsort(term, kind="stable")
+    counts = np.bincount(term, minlength=len(terms))
+    return terms.tolist(), counts, doc[order]
+
+
+def delta_encode(counts, docs):
+    """Gaps between consecutive ids of each term; each term's first id stays absolute."""
+    deltas = np.diff(docs, prepend=0)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+    starts = starts[counts > 0]
+    deltas[starts] = docs[starts]
+    return deltas
+
+
+def shard_bounds(counts, budget=SHARD_POSTINGS):
+    """Term index ranges [(lo, hi)] holding about `budget` ids each (a denser term gets its own)."""
+    bounds, lo, size = [], 0, 0
+    for i, n in enumerate(counts):
+        if size and size + n > budget:
+            bounds.append((lo, i))
+            lo, size = i, 0
+        size += int(n)
+    if lo < len(counts):
+        bounds.append((lo, len(counts)))
+    return bounds
+
+
+def search_files(postings, n_docs, budget=SHARD_POSTINGS):
+    """{relative path: object} of the search artifact, from build_postings() over n_docs texts."""
+    terms, counts, docs = postings
+    deltas = delta_encode(counts, docs)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    shards, files = [], {}
+    for n, (lo, hi) in enumerate(shard_bounds(counts, budget)):
+        shard_id = f"{n:03d}"
+        files[f"search/{shard_id}.json"] = {
+            "terms": terms[lo:hi],
+            "counts": counts[lo:hi].tolist(),
+            "deltas": deltas[offsets[lo]:offsets[hi]].tolist(),
+        }
+        shards.append({"id": shard_id, "first": terms[lo], "last": terms[hi - 1],
+                       "terms": hi - lo, "postings": int(offsets[hi] - offsets[lo])})
+    files = {"search/shards.json": {
+        "docs": n_docs, "pattern": TOKEN_PATTERN, "min_token": MIN_TOKEN,
+        "min_prefix": MIN_PREFIX, "stopwords": STOPWORDS, "shards": shards,
+    }, **files}
+    return files
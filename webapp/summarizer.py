@@ -0,0 +1,358 @@
+"""
+summarizer.py — Flan-T5 summary generation for the Gradio app
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+The tokenizer and model are loaded on the first generation request (or by
+warm_up() in a background thread), not at import time. torch and
+transformers are imported inside the loader, and the summary cache is
+opened on first use, so importing this module, or the app, stays fast and
+touches no files.
+
+GEN_BACKEND picks how the model runs:
+    pytorch        fp32 on CPU, fp16 on GPU (the original setup)
+    pytorch-int8   dynamic int8 quantization of every nn.Linear, CPU only
+    onnx           ONNX Runtime encoder + decoder with KV cache, CPU only;
+                   export it first with `python webapp/export_quantized.py`
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from brief_parser import parse_brief
+from profiling import PROFILER, record_generation, stage
+from summary_cache import SummaryCache, summary_key
+
+# ---------------- Model ----------------
+GEN_MODEL_NAME = "google/flan-t5-base"
+GEN_BACKEND = os.getenv("GEN_BACKEND", "pytorch")
+ARTIFACTS_DIR = Path(__file__).parent / "models"  # exported ONNX + validation report
+GEN_BATCH_SIZE = 8  # prompts per model.generate call when exporting
+MAX_INPUT_TOKENS = 384
+MAX_NEW_TOKENS = 140
+SUMMARY_CACHE_PATH = Path(__file__).parent / ".cache" / "summaries.sqlite"
+SUMMARY_CACHE_MAX_ENTRIES = 5000
+# Streamed generations running at once (each model.generate uses all of torch's
+# threads); more wait for a slot. Cache hits never take one
+GEN_STREAM_CONCURRENCY = int(os.getenv("GEN_STREAM_CONCURRENCY", "1"))
+
+# Named decoding settings; every profile decodes with the KV cache on
+DECODING_PROFILES = {
+    "fast-greedy": {"do_sample": False, "num_beams": 1, "repetition_penalty": 1.15},
+    "cached-sampling": {"do_sample": True, "temperature": 0.6, "top_p": 0.9, "repetition_penalty": 1.15},
+    "beam-4": {"do_sample": False, "num_beams": 4, "early_stopping": True, "repetition_penalty": 1.15},
+}
+DEFAULT_PROFILE = "cached-sampling"
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+_SUMMARY_CACHE = None
+_SUMMARY_CACHE_LOCK = threading.Lock()
+_STREAM_SLOTS = threading.BoundedSemaphore(GEN_STREAM_CONCURRENCY)
+# Set once the model has run here: from then on this process must not fork
+# torch workers (its OpenMP threads would deadlock them, see export_pool.py)
+_INFERENCE_STARTED = False
+
+
+def runtime_device() -> str:
+    import torch
+
+    if GEN_BACKEND != "pytorch":
+        return "cpu"  # quantized and ONNX backends are CPU only
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def runtime_dtype():
+    import torch
+
+    return torch.float16 if runtime_device() == "cuda" else torch.float32
+
+
+def onnx_artifact_dir() -> Path:
+    return ARTIFACTS_DIR / (GEN_MODEL_NAME.replace("/", "--") + "-onnx")
+
+
+def load_pytorch(device):
+    from transformers import AutoModelForSeq2SeqLM
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(
+        GEN_MODEL_NAME,
+        torch_dtype=runtime_dtype()
+    ).to(device)
+    return model.eval()
+
+
+def load_pytorch_int8(device):
+    import torch
+
+    # Weights of every Linear layer become int8; activations are quantized on the fly
+    model = load_pytorch(device)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_onnx(device):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    path = onnx_artifact_dir()
+    if not path.exists():
+        raise FileNotFoundError(
+            f"ONNX export not found at {path}. Run: python webapp/export_quantized.py"
+        )
+    return ORTModelForSeq2SeqLM.from_pretrained(path, use_cache=True, provider="CPUExecutionProvider")
+
+
+BACKENDS = {
+    "pytorch": load_pytorch,
+    "pytorch-int8": load_pytorch_int8,
+    "onnx": load_onnx,
+}
+
+
+def get_model():
+    """(tokenizer, model, device), loaded once on first use; safe to call from any thread."""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                if GEN_BACKEND not in BACKENDS:
+                    raise ValueError(f"Unknown GEN_BACKEND: {GEN_BACKEND!r}. Choose from {list(BACKENDS)}")
+                start = time.perf_counter()
+                from transformers import AutoTokenizer
+
+                with stage("summarize.load_model", backend=GEN_BACKEND):
+                    device = runtime_device()
+                    tokenizer = AutoTokenizer.from_pretrained(GEN_MODEL_NAME)
+                    model = BACKENDS[GEN_BACKEND](device)
+                _MODEL = (tokenizer, model, device)
+                print(f"Device: {device}, backend: {GEN_BACKEND} "
+                      f"(model loaded in {time.perf_counter() - start:.1f}s)")
+    return _MODEL
+
+
+def get_summary_cache() -> SummaryCache:
+    """The on-disk summary cache, opened (and created) on first use; safe to call from any thread."""
+    global _SUMMARY_CACHE
+    if _SUMMARY_CACHE is None:
+        with _SUMMARY_CACHE_LOCK:
+            if _SUMMARY_CACHE is None:
+                _SUMMARY_CACHE = SummaryCache(SUMMARY_CACHE_PATH, max_entries=SUMMARY_CACHE_MAX_ENTRIES)
+    return _SUMMARY_CACHE
+
+
+def model_loaded() -> bool:
+    return _MODEL is not None
+
+
+def inference_started() -> bool:
+    return _INFERENCE_STARTED
+
+
+def warm_up(background: bool = True):
+    """Load the model now, in a daemon thread by default so the UI is not blocked."""
+    if not background:
+        get_model()
+        return None
+    thread = threading.Thread(target=get_model, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------------- Summary generation ----------------
+def build_facts_prompt(brief: str) -> str:
+    cat, top3, worst = parse_brief(brief)
+
+    lines = [f"Category: {cat}."]
+    for p in top3:
+        lines.append(
+            f"{p['name']} has rating {p['rating']} from {p['reviews']} reviews."
+        )
+
+    if worst["name"]:
+        lines.append(
+            f"The lowest rated is {worst['name']} with rating {worst['rating']} from {worst['reviews']} reviews."
+        )
+
+    facts = "\n".join(lines)
+
+    prompt = f"""Write 2 short natural paragraphs for shoppers.
+
+Use ONLY the facts below.
+
+FACTS:
+{facts}
+"""
+    return prompt
+
+
+def decoding_kwargs(profile: str = DEFAULT_PROFILE) -> dict:
+    if profile not in DECODING_PROFILES:
+        raise ValueError(f"Unknown decoding profile: {profile!r}. Choose from {list(DECODING_PROFILES)}")
+    return {"max_new_tokens": MAX_NEW_TOKENS, "use_cache": True, **DECODING_PROFILES[profile]}
+
+
+def generate_summary_from_brief(brief: str, profile: str = DEFAULT_PROFILE) -> str:
+    return generate_summaries([brief], batch_size=1, profile=profile)[0]
+
+
+def cache_key(prompt, gen_kwargs):
+    key_params = {**gen_kwargs, "max_input_tokens": MAX_INPUT_TOKENS}
+    return summary_key(prompt, GEN_MODEL_NAME, runtime_dtype(), key_params, backend=GEN_BACKEND)
+
+
+def generate_summaries(briefs, batch_size=GEN_BATCH_SIZE, profile=DEFAULT_PROFILE,
+                       use_summary_cache=True, workers=1):
+    """One summary per brief: cache hits first, then batched generation for the rest.
+
+    Hit and miss counts accumulate in get_summary_cache().stats().
+
+    workers > 1 spreads the batches over forked processes (see export_pool.py).
+    """
+    if not briefs:
+        return []
+    gen_kwargs = decoding_kwargs(profile)
+    prompts = [build_facts_prompt(b) for b in briefs]
+    if not use_summary_cache:
+        return _generate(prompts, batch_size, gen_kwargs, workers)
+
+    # Serve what we can from the cache and only generate the misses
+    keys = [cache_key(p, gen_kwargs) for p in prompts]
+    summary_cache = get_summary_cache()
+    cached = summary_cache.get_many(keys)
+    summaries = [cached.get(k) for k in keys]
+    todo = {}
+    for i, k in enumerate(keys):
+        if summaries[i] is None:
+            todo.setdefault(k, i)  # identical prompts are generated once
+    if todo:
+        texts = _generate([prompts[i] for i in todo.values()], batch_size, gen_kwargs, workers)
+        generated = dict(zip(todo, texts))
+        summary_cache.put_many(generated)
+        summaries = [s if s is not None else generated[k] for s, k in zip(summaries, keys)]
+    return summaries
+
+
+def _generate(prompts, batch_size, gen_kwargs, workers=1):
+    if workers > 1:
+        from export_pool import generate_parallel
+
+        return generate_parallel(prompts, batch_size, gen_kwargs, workers)
+    return _generate_uncached(prompts, batch_size, gen_kwargs)
+
+
+def _generate_uncached(prompts, batch_size, gen_kwargs, loaded=None):
+    """Generate prompts in length-sorted batches, results in input order.
+
+    loaded is an optional (tokenizer, model, device) to use instead of the
+    shared model; export_quantized.py uses it to compare backends.
+    """
+    import torch
+
+    global _INFERENCE_STARTED
+    tokenizer, model, device = loaded or get_model()
+    _INFERENCE_STARTED = True
+    with stage("summarize.tokenize", prompts=len(prompts)):
+        encoded = tokenizer(prompts, truncation=True, max_length=MAX_INPUT_TOKENS)
+
+    # Sort by token length so each batch pads to a similar length,
+    # then write results back in the original order
+    order = sorted(range(len(prompts)), key=lambda i: len(encoded["input_ids"][i]))
+    summaries = [None] * len(prompts)
+
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+        batch = tokenizer.pad(
+            {k: [encoded[k][i] for i in idx] for k in ("input_ids", "attention_mask")},
+            return_tensors="pt",
+        ).to(device)
+
+        with stage("summarize.generate", prompts=len(idx)) as s:
+            with torch.inference_mode():
+                out = model.generate(**batch, **gen_kwargs)
+            if PROFILER is not None:
+                # The first column is the decoder start token; shorter outputs are padded
+                generated = out[:, 1:]
+                record_generation(s, int((generated != tokenizer.pad_token_id).sum()), generated.shape[1])
+
+        with stage("summarize.decode", prompts=len(idx)):
+            texts = tokenizer.batch_decode(out, skip_special_tokens=True)
+        for i, text in zip(idx, texts):
+            summaries[i] = text.strip()
+
+    return summaries
+
+
+def stream_summary_from_brief(brief: str, profile: str = DEFAULT_PROFILE, use_summary_cache=True):
+    """Yield the summary text decoded so far, growing token by token.
+
+    Streaming is per request, so it bypasses the batching worker. A cached
+    summary is yielded whole; a freshly generated one waits for one of the
+    GEN_STREAM_CONCURRENCY slots and is cached at the end.
+    """
+    import torch
+    from transformers import TextIteratorStreamer
+
+    gen_kwargs = decoding_kwargs(profile)
+    prompt = build_facts_prompt(brief)
+    key = cache_key(prompt, gen_kwargs)
+    if use_summary_cache:
+        cached = get_summary_cache().get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    tokenizer, model, device = get_model()
+    with stage("summarize.tokenize", prompts=1):
+        encoded = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=MAX_INPUT_TOKENS)
+    inputs = {k: encoded[k].to(device) for k in ("input_ids", "attention_mask")}
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+
+    errors = []
+    arrivals = []  # when generate() handed each token to the streamer, if profiling
+    if PROFILER is not None:
+        put = streamer.put
+
+        def timed_put(value):
+            arrivals.append(time.perf_counter())
+            put(value)
+
+        streamer.put = timed_put
+
+    def run():
+        global _INFERENCE_STARTED
+        with stage("summarize.stream_wait"):
+            _STREAM_SLOTS.acquire()
+        _INFERENCE_STARTED = True
+        try:
+            # Decoding happens in streamer.put(), so it is timed as part of generation
+            with stage("summarize.stream", prompts=1) as s:
+                with torch.inference_mode():
+                    model.generate(**inputs, **gen_kwargs, streamer=streamer)
+                if len(arrivals) > 1:
+                    # The first put() is the decoder start token
+                    gaps = [b - a for a, b in zip(arrivals[1:], arrivals[2:])]
+                    record_generation(s, len(arrivals) - 1, len(arrivals) - 1, gaps,
+                                      first_token_s=arrivals[1] - s.start)
+        except Exception as exc:
+            errors.append(exc)
+            streamer.end()  # unblock the reader below
+        finally:
+            _STREAM_SLOTS.release()
+
+    # generate() pushes decoded text into the streamer from its own thread
+    thread = threading.Thread(target=run, name="summary-stream", daemon=True)
+    thread.start()
+    text, shown = "", ""
+    for piece in streamer:
+        text += piece
+        if text.strip() != shown:
+            shown = text.strip()
+            yield shown
+    thread.join()
+    if errors:
+        raise errors[0]
+    if not shown:
+        yield ""  # an empty summary still replaces the caller's placeholder
+
+    if use_summary_cache:
+        get_summary_cache().put(key, text.strip())
@@ -0,0 +1,110 @@
+"""
+summary_cache.py — Persistent cache for generated T5 summaries
+Project 3: NLP Business Case | Group 4 | IronHack AI Engineering Bootcamp
+
+Entries are keyed by a SHA-256 of everything that determines the output:
+the facts prompt, the model name, the backend, the dtype and the decoding
+settings.
+Changing any of them produces a new key, so stale summaries are never
+served; they just age out of the LRU order. Backed by SQLite from the
+standard library, safe to share between Gradio worker threads.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+def summary_key(prompt, model_name, dtype, gen_kwargs, backend="pytorch"):
+    """Content address of one summary: hash of the prompt and every generation setting."""
+    payload = json.dumps(
+        {"prompt": prompt, "model": model_name, "backend": backend, "dtype": str(dtype),
+         "generate": gen_kwargs},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """On-disk LRU cache of summaries with a maximum entry count and hit/miss counters."""
+
+    def __init__(self, path, max_entries=5000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY, summary TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON summaries(last_used)")
+        self._db.commit()
+
+    def get_many(self, keys):
+        """Cached summaries for the keys that are present; refreshes their LRU position."""
+        if not keys:
+            return {}
+        with self._lock:
+            found = {}
+            unique = list(dict.fromkeys(keys))
+            for start in range(0, len(unique), 500):  # stay under SQLite's variable limit
+                part = unique[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, summary FROM summaries WHERE key IN ({','.join('?' * len(part))})",
+                    part,
+                ).fetchall()
+                found.update(rows)
+            now = time.time()
+            self._db.executemany(
+                "UPDATE summaries SET last_used = ? WHERE key = ?", [(now, k) for k in found]
+            )
+            self._db.commit()
+            self.hits += sum(k in found for k in keys)
+            self.misses += sum(k not in found for k in keys)
+            return found
+
+    def put_many(self, items):
+        """Store {key: summary} and evict least recently used entries above the cap."""
+        if not items:
+            return
+        with self._lock:
+            now = time.time()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO summaries (key, summary, last_used) VALUES (?, ?, ?)",
+                [(k, v, now) for k, v in items.items()],
+            )
+            self._db.execute(
+                "DELETE FROM summaries WHERE key IN ("
+                " SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def put(self, key, summary):
+        self.put_many({key: summary})
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM summaries")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }